@@ -1,64 +1,119 @@
-import re
 import json
 import argparse
 import pandas as pd
+from modules import vulnerability_scores, vulnerability_levels, compile_filters, FilterPipeline
+from modules.ranking import top_n_positions
+from modules.follow import CaptureFollower
+from modules.merge import merge_captures
+from modules.pcap import index_pcap
+from modules.backends import load_capture, BACKENDS
+from modules.cache import ParseCache, load_capture_cached, DEFAULT_CACHE_DIR
+from modules.geo import estimate_positions, join_positions, SpatialIndex
+from modules.graph import SurveyGraph
+from modules.mackeys import mac_keys, frame_keys, isin_keys, count_keys, without_keys
+from common import tracing
 
 class AirodumpHandler:
-    def __init__(self, csv_path):
+    def __init__(self, csv_path, backend=None, cache=None):
         self.csv_path = csv_path
+        self.backend = backend  # Input backend, detected from the file name when None
+        self.cache = cache  # Optional ParseCache of previously parsed captures
         self.ap_df = None  # Access Points DataFrame
         self.clients_df = None  # Clients DataFrame
 
+    @classmethod
+    def from_captures(cls, pattern, max_workers=None):
+        """
+        Build a handler from many captures merged by BSSID/Station MAC.
+
+        :param pattern: Directory or glob pattern of airodump-ng CSV files.
+        :param max_workers: Number of worker processes used to parse the captures.
+        :return: An AirodumpHandler whose DataFrames hold the merged captures.
+        """
+        handler = cls(pattern)
+        handler.ap_df, handler.clients_df = merge_captures(pattern, max_workers=max_workers)
+        return handler
+
     def process_csv(self):
-        with open(self.csv_path, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
+        # airodump-ng CSVs are split in a single streaming pass, kismet/log files use their own backend
+        with tracing.span("process_csv", path=self.csv_path, cached=self.cache is not None):
+            if self.cache is not None:
+                self.ap_df, self.clients_df = load_capture_cached(self.csv_path, load_capture, self.cache, backend=self.backend)
+            else:
+                self.ap_df, self.clients_df = load_capture(self.csv_path, backend=self.backend)
+        tracing.count("access_points", len(self.ap_df))
+        tracing.count("clients", len(self.clients_df))
 
-        # Find start indexes for each section
-        start_index_clients_df = None
-        for i, line in enumerate(lines):
-            if 'Station MAC, First time seen, Last time seen, Power, # packets, BSSID, Probed ESSIDs' in line:
-                start_index_clients_df = i
-                break
+    def add_handshakes(self, pcap_path):
+        """
+        Flag the access points with a captured WPA 4-way handshake.
 
-        if start_index_clients_df is None:
-            raise ValueError("Section for the clients dataframe not found.")
+        :param pcap_path: Path to the .cap file written by airodump-ng for the same capture.
+        :return: The set of BSSIDs with a crackable handshake.
+        """
+        if self.ap_df is None:
+            raise ValueError("You must process the CSV file first.")
+        handshakes = index_pcap(pcap_path).handshake_bssids()
+        self.ap_df['Handshake_Captured'] = isin_keys(frame_keys(self.ap_df, 'BSSID'), mac_keys(list(handshakes)))
+        return handshakes
 
-        self.ap_df = pd.read_csv(self.csv_path, skiprows=1, nrows=start_index_clients_df - 2, on_bad_lines='skip')
-        self.ap_df.columns = [col.strip() for col in self.ap_df.columns]
-        self.ap_df['BSSID'] = self.ap_df['BSSID'].apply(lambda x: x.strip())
+    def add_positions(self, log_path):
+        """
+        Add the estimated position of the access points from a GPS survey.
 
-        self.clients_df = pd.read_csv(self.csv_path, skiprows=start_index_clients_df, on_bad_lines='skip')
-        self.clients_df.columns = [col.strip() for col in self.clients_df.columns]
-        self.clients_df['BSSID'] = self.clients_df['BSSID'].apply(lambda x: x.strip())
-        # print(self.ap_df['BSSID'].to_list())
-        # print(self.clients_df['BSSID'].to_list())
+        The Latitude, Longitude, Position_Error_m and GPS_Sightings columns are
+        carried over to the top_n_vulnerables output, which can then be indexed
+        with modules.geo.SpatialIndex for area queries.
 
+        :param log_path: Path to the .log.csv file written by airodump-ng with --gpsd.
+        :return: The DataFrame of estimated positions, one row per located BSSID.
+        """
+        if self.ap_df is None:
+            raise ValueError("You must process the CSV file first.")
+        positions = estimate_positions(log_path)
+        self.ap_df = join_positions(self.ap_df, positions)
+        return positions
+
+    def survey_graph(self):
+        """
+        Client/AP graph of the processed capture: inverted index of the Probed
+        ESSIDs and station/AP adjacency with integer IDs (see modules.graph).
+
+        :return: A SurveyGraph.
+        """
+        if self.ap_df is None or self.clients_df is None:
+            raise ValueError("You must process the CSV file first.")
+        return SurveyGraph(self.ap_df, self.clients_df)
+
+    @tracing.traced("save_as_csv")
     def save_as_csv(self, path_ap_df="./output/airo-access_points.csv", path_clients_df="./output/airo-clients.csv"):
         if self.ap_df is not None and self.clients_df is not None:
-            self.ap_df.to_csv(path_ap_df, index=False)
-            self.clients_df.to_csv(path_clients_df, index=False)
+            without_keys(self.ap_df).to_csv(path_ap_df, index=False)
+            without_keys(self.clients_df).to_csv(path_clients_df, index=False)
         else:
             raise ValueError("You must process the CSV file first.")
 
+    @tracing.traced("save_as_json")
     def save_as_json(self, path_ap_df, path_clients_df):
         if self.ap_df is not None and self.clients_df is not None:
-            self.ap_df.to_json(path_ap_df, orient='records', lines=True)
-            self.clients_df.to_json(path_clients_df, orient='records', lines=True)
+            without_keys(self.ap_df).to_json(path_ap_df, orient='records', lines=True)
+            without_keys(self.clients_df).to_json(path_clients_df, orient='records', lines=True)
         else:
             raise ValueError("You must process the CSV file first.")
 
     def display_dataframes(self):
         if self.ap_df is not None:
-            print("Access Points DataFrame:\n", self.ap_df.head())
+            print("Access Points DataFrame:\n", without_keys(self.ap_df.head()))
         else:
             print("Access Points DataFrame is not available.")
         
         if self.clients_df is not None:
-            print("Clients DataFrame:\n", self.clients_df.head())
+            print("Clients DataFrame:\n", without_keys(self.clients_df.head()))
         else:
             print("Clients DataFrame is not available.")
 
-    def top_n_vulnerables(self, top_n=5, save_to_csv=False, exclude_protocol=[], essid_key=False, exclude_bssid=[], exclude_essid=[], client_n=None):
+    @tracing.traced("top_n_vulnerables")
+    def top_n_vulnerables(self, top_n=5, save_to_csv=False, exclude_protocol=[], essid_key=False, exclude_bssid=[], exclude_essid=[], client_n=None, filters=None):
         """
         Identify the top 'n' most vulnerable access points based on various criteria.
 
@@ -78,6 +133,8 @@ class AirodumpHandler:
             List of regular expressions to exclude specific ESSIDs.
         client_n : int or None
             Minimum number of clients required for an access point to be considered.
+        filters : FilterPipeline or None
+            Precompiled filters (e.g. FilterPipeline.from_config). Overrides the exclude_* and essid_key arguments.
 
         Returns
         -------
@@ -87,57 +144,30 @@ class AirodumpHandler:
         if self.ap_df is None or self.clients_df is None:
             raise ValueError("DataFrames are not available. Process the CSV file first.")
 
-        # Filter by common BSSIDs
-        df_ap_filtered, df_cli_filtered = self.filter_by_common_bssid()
-
-        # Count the number of clients associated with each BSSID
-        client_count = df_cli_filtered['BSSID'].value_counts()
-        df_ap_filtered['Client_Count'] = df_ap_filtered['BSSID'].map(client_count).fillna(0)
+        # Count the number of clients associated with each BSSID, merging the integer MAC keys
+        counts = pd.Series(count_keys(frame_keys(self.ap_df, 'BSSID'), frame_keys(self.clients_df, 'BSSID')), index=self.ap_df.index)
 
-        # Filter APs with at least client_n clients if client_n is not None
-        if client_n is not None:
-            df_ap_filtered = df_ap_filtered[df_ap_filtered['Client_Count'] >= client_n]
+        # Keep APs with associated clients (common BSSIDs), at least client_n of them, that pass the compiled filters
+        with tracing.span("filters"):
+            if filters is None:
+                filters = compile_filters(exclude_protocol, essid_key, exclude_bssid, exclude_essid)
+            mask = counts > 0
+            if client_n is not None:
+                mask &= counts >= client_n
+            mask &= filters.mask(self.ap_df)
 
-        # Apply additional filters to the filtered AP DataFrame
-        vulnerables = df_ap_filtered.copy()
+        vulnerables = without_keys(self.ap_df[mask]).assign(Client_Count=counts[mask])
 
-        # Exclude specific protocols using exact match
-        for protocol in exclude_protocol:
-            regex_pattern = r'\b' + protocol + r'\b'  # Using word boundaries to match the whole word
-            vulnerables = vulnerables[~vulnerables['Privacy'].str.contains(regex_pattern, regex=True)]
-
-        # Include only networks with ESSID if essid_key is True
-        if essid_key:
-            vulnerables = vulnerables[vulnerables['ESSID'].str.strip() != '']
+        # Assign a vulnerability score
+        # Columnar equivalent of the score_* static methods below
+        vulnerables['Vulnerability_Score'] = vulnerability_scores(vulnerables)
 
-        # Exclude specific BSSIDs
-        vulnerables = vulnerables[~vulnerables['BSSID'].isin(exclude_bssid)]
+        # Select the top N by partial selection instead of sorting the whole table
+        scores = vulnerables['Vulnerability_Score']
+        top_vulnerables = vulnerables.iloc[top_n_positions(scores.to_numpy(), top_n or None)].copy()
 
-        # Ensure ESSID is a string and Exclude ESSIDs based on regular expressions
-        vulnerables['ESSID'] = vulnerables['ESSID'].astype(str)
-        for pattern in exclude_essid:
-            vulnerables = vulnerables[~vulnerables['ESSID'].str.contains(pattern, flags=re.IGNORECASE, regex=True, na=False)]
-
-        # Assign a vulnerability score
-        vulnerables['Vulnerability_Score'] = 0
-        vulnerables['Vulnerability_Score'] += vulnerables.apply(self.score_privacy_cipher, axis=1)
-        vulnerables['Vulnerability_Score'] += vulnerables['Power'].apply(self.score_power)
-        vulnerables['Vulnerability_Score'] += vulnerables.apply(self.score_visibility_duration, axis=1)
-        vulnerables['Vulnerability_Score'] += vulnerables['Speed'].apply(self.score_speed)
-        vulnerables['Vulnerability_Score'] += vulnerables.apply(self.score_iv_beacons, axis=1)
-        vulnerables['Vulnerability_Score'] += vulnerables.apply(self.score_essid_key, axis=1)
-
-        # Assign vulnerability level based on Vulnerability_Score
-        max_score = vulnerables['Vulnerability_Score'].max()
-        bins = [0, max_score*0.1, max_score*0.2, max_score*0.4, max_score*0.6, max_score*0.8, max_score, max_score*1.2]
-        labels = ['Zero', 'Very Low', 'Low', 'Medium', 'High', 'Very High', 'Critical']
-        vulnerables['Vulnerability_level'] = pd.cut(vulnerables['Vulnerability_Score'], bins=bins, labels=labels, include_lowest=True)
-
-        # Sort by vulnerability score from highest to lowest
-        top_vulnerables = vulnerables.sort_values(by='Vulnerability_Score', ascending=False)
-
-        if top_n:
-            top_vulnerables = top_vulnerables.head(top_n)
+        # Assign vulnerability level based on Vulnerability_Score, relative to the highest score of all candidates
+        top_vulnerables['Vulnerability_level'] = vulnerability_levels(top_vulnerables['Vulnerability_Score'], max_score=scores.max())
 
         # Save to CSV if required
         if save_to_csv:
@@ -145,26 +175,43 @@ class AirodumpHandler:
 
         return top_vulnerables
 
+    def top_n_vulnerables_in_area(self, top_n=5, near=None, bbox=None, **kwargs):
+        """
+        The top 'n' most vulnerable access points of an area, after add_positions.
+
+        Every candidate of top_n_vulnerables is put in a SpatialIndex, so the
+        levels stay relative to the whole capture. Access points without a
+        GPS position are left out.
+
+        :param top_n: Number of access points to return.
+        :param near: (latitude, longitude, radius in metres). Adds a Distance_m column.
+        :param bbox: (south, west, north, east) in degrees. Used when `near` is None.
+        :param kwargs: Filters passed to top_n_vulnerables (client_n, exclude_*, essid_key, filters).
+        :return: A DataFrame like the top_n_vulnerables output, most vulnerable first.
+        """
+        if self.ap_df is None or 'Latitude' not in self.ap_df.columns:
+            raise ValueError("Access point positions are not available. Call add_positions first.")
+        if near is None and bbox is None:
+            raise ValueError("Either near or bbox is required.")
+        index = SpatialIndex(self.top_n_vulnerables(top_n=None, **kwargs))
+        if near is not None:
+            return index.top_n_within_radius(*near, top_n=top_n)
+        return index.top_n_in_bbox(*bbox, top_n=top_n)
+
     def filter_by_common_bssid(self):
         """
         Filters the access point and client dataframes based on common BSSIDs.
 
         :return: Two filtered DataFrames, one for access points and one for clients.
         """
-        df_ap = self.ap_df
-        df_cli = self.clients_df
-
-        # Filter the client dataframe to exclude those not associated with a BSSID
-        df_cli_filtered = df_cli[df_cli['BSSID'] != '(not associated)']
+        ap_keys = frame_keys(self.ap_df, 'BSSID')
+        client_keys = frame_keys(self.clients_df, 'BSSID')
 
-        # Find common BSSIDs between access points and clients
-        common_bssids = set(df_ap['BSSID']).intersection(set(df_cli_filtered['BSSID']))
+        # Sort-merge the integer BSSID keys; '(not associated)' clients have no key and never match
+        df_ap_filtered = self.ap_df[isin_keys(ap_keys, client_keys)]
+        df_cli_filtered = self.clients_df[isin_keys(client_keys, ap_keys)]
 
-        # Filter the dataframes based on common BSSIDs
-        df_ap_filtered = df_ap[df_ap['BSSID'].isin(common_bssids)]
-        df_cli_filtered = df_cli_filtered[df_cli_filtered['BSSID'].isin(common_bssids)]
-
-        return df_ap_filtered, df_cli_filtered
+        return without_keys(df_ap_filtered), without_keys(df_cli_filtered)
 
     @staticmethod
     def score_privacy_cipher(row):
@@ -241,6 +288,21 @@ class AirodumpHandler:
         parser.add_argument("-ee", "--exclude_essid", nargs='*', default=[], help="List of regular expressions to exclude specific ESSIDs.")
         parser.add_argument("-cn", "--client_n", type=int, help="Minimum number of clients required for an access point to be considered.")
         parser.add_argument("--start", action="store_true", help="Start AirodumpHandler from config.json configuration file.")
+        parser.add_argument("-b", "--backend", choices=list(BACKENDS), default=None, help="Input format of --csv_path. Default: detected from the file name (.csv, .kismet.netxml, .kismet.csv, .log.csv).")
+        parser.add_argument("--cache", nargs='?', const=DEFAULT_CACHE_DIR, default=None, help=f"Reuse parsed captures from a columnar on-disk cache. Optional directory, default: '{DEFAULT_CACHE_DIR}'.")
+        parser.add_argument("--cache_size", type=int, default=512, help="Maximum size of the parse cache in MB, least recently used entries are evicted. Default: 512")
+        parser.add_argument("-c", "--captures", help="Directory or glob pattern of several captures to merge by BSSID/Station MAC before ranking. Replaces --csv_path.")
+        parser.add_argument("-w", "--workers", type=int, default=None, help="Number of processes used to parse --captures. Default: number of CPUs.")
+        parser.add_argument("--pcap", help="Path to the .cap file of the capture. Adds a Handshake_Captured column to the access points.")
+        parser.add_argument("--gps", help="Path to the .log.csv GPS survey of the capture. Adds the estimated Latitude/Longitude of the access points (power-weighted centroid of their sightings).")
+        parser.add_argument("--near", nargs=3, type=float, metavar=("LAT", "LON", "RADIUS_M"), help="With --gps, rank only the access points within RADIUS_M metres of LAT, LON.")
+        parser.add_argument("--bbox", nargs=4, type=float, metavar=("SOUTH", "WEST", "NORTH", "EAST"), help="With --gps, rank only the access points inside this bounding box (degrees).")
+        parser.add_argument("--probing", nargs='+', metavar="ESSID", help="List the clients that probed for these ESSIDs.")
+        parser.add_argument("--shared_clients", type=int, nargs='?', const=1, default=None, metavar="N", help="List the pairs of access points with at least N clients in common. Default N: 1.")
+        parser.add_argument("--seen_in", type=int, default=None, metavar="N", help="With --captures, list the clients seen in at least N of the captures.")
+        parser.add_argument("-f", "--follow", action="store_true", help="Follow a capture that airodump-ng is still writing and print the top N leaderboard on every change.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls of the CSV file in --follow mode. Default: 2.0")
+        parser.add_argument("--profile", nargs='?', const="./output/profile.json", default=None, help="Trace the run stages (time, allocations, counters) to a Chrome trace JSON file and print a summary. Optional path, default: './output/profile.json'.")
 
         return parser.parse_args()
 
@@ -248,6 +310,9 @@ class AirodumpHandler:
 if __name__ == "__main__":
     args = AirodumpHandler.parse_arguments()
 
+    if args.profile:
+        tracing.enable()
+
     if args.start:
         with open("./config.json", 'r') as file:
             config = json.load(file)
@@ -256,33 +321,78 @@ if __name__ == "__main__":
     else:
         csv_path = args.csv_path
 
+    if args.follow:
+        filters = config if args.start else vars(args)
+        follower = CaptureFollower(csv_path,
+                                   top_n=filters.get('top_n', 5),
+                                   client_n=filters.get('client_n', None),
+                                   exclude_protocol=filters.get('exclude_protocol', []),
+                                   essid_key=filters.get('essid_key', False),
+                                   exclude_bssid=filters.get('exclude_bssid', []),
+                                   exclude_essid=filters.get('exclude_essid', []))
+        follower.follow(interval=args.interval)
+        raise SystemExit(0)
+
+    if args.captures:
+        handler = AirodumpHandler.from_captures(args.captures, max_workers=args.workers)
+    else:
+        cache = ParseCache(args.cache, max_bytes=args.cache_size * 1024 * 1024) if args.cache else None
+        handler = AirodumpHandler(csv_path, backend=args.backend, cache=cache)
+        handler.process_csv()
 
-    handler = AirodumpHandler(csv_path)
-    handler.process_csv()
+    if args.pcap:
+        handler.add_handshakes(args.pcap)
+
+    if args.gps:
+        handler.add_positions(args.gps)
+    elif args.near or args.bbox:
+        raise SystemExit("--near and --bbox need the GPS survey of the capture (--gps).")
 
     if args.show:
         handler.display_dataframes()
 
+    if args.probing or args.shared_clients or args.seen_in:
+        # Per-capture graph with --captures, so stations keep track of the captures they were seen in
+        graph = SurveyGraph.from_captures(args.captures) if args.captures else handler.survey_graph()
+        print(graph)
+        for essid in args.probing or []:
+            clients = graph.clients_probing(essid)
+            print(f"\n{len(clients)} clients probing for '{essid}':", *clients, sep='\n  ')
+        if args.shared_clients:
+            print(f'\nAccess points sharing at least {args.shared_clients} clients:\n', graph.shared_client_pairs(min_shared=args.shared_clients).to_string(index=False))
+        if args.seen_in:
+            if not args.captures:
+                raise SystemExit("--seen_in needs several captures (--captures).")
+            print(f'\nClients seen in at least {args.seen_in} captures:\n', graph.stations_in_captures(min_captures=args.seen_in).to_string(index=False))
+
     if args.save == 'csv':
         handler.save_as_csv()
     elif args.save == 'json':
         handler.save_as_json()
 
     if args.top_n:
-        top_vulnerables = handler.top_n_vulnerables(top_n=args.top_n,
-                                                    client_n=args.client_n,
-                                                    exclude_protocol=args.exclude_protocol,
-                                                    essid_key=args.essid_key,
-                                                    exclude_bssid=args.exclude_bssid,
-                                                    exclude_essid=args.exclude_essid)
+        filters = dict(client_n=args.client_n,
+                       exclude_protocol=args.exclude_protocol,
+                       essid_key=args.essid_key,
+                       exclude_bssid=args.exclude_bssid,
+                       exclude_essid=args.exclude_essid)
+        if args.near or args.bbox:
+            top_vulnerables = handler.top_n_vulnerables_in_area(top_n=args.top_n, near=args.near, bbox=args.bbox, **filters)
+        else:
+            top_vulnerables = handler.top_n_vulnerables(top_n=args.top_n, **filters)
         print(f'\nTop {args.top_n} Vulnerable Access Points:\n', top_vulnerables)
     
     if args.start:
-        top_vulnerables = handler.top_n_vulnerables(top_n=config.get('top_n', 5),
-                        save_to_csv=config.get('save_to_csv', False),
-                        exclude_protocol=config.get('exclude_protocol', []),
-                        essid_key=config.get('essid_key', False),
-                        exclude_bssid=config.get('exclude_bssid', []),
-                        exclude_essid=config.get('exclude_essid', []),
-                        client_n=config.get('client_n', None))
-        print(f'\nTop {args.top_n} Vulnerable Access Points:\n', top_vulnerables)
\ No newline at end of file
+        if args.near or args.bbox:
+            top_vulnerables = handler.top_n_vulnerables_in_area(top_n=config.get('top_n', 5), near=args.near, bbox=args.bbox,
+                            client_n=config.get('client_n', None),
+                            filters=FilterPipeline.from_config(config))
+        else:
+            top_vulnerables = handler.top_n_vulnerables(top_n=config.get('top_n', 5),
+                            save_to_csv=config.get('save_to_csv', False),
+                            client_n=config.get('client_n', None),
+                            filters=FilterPipeline.from_config(config))
+        print(f'\nTop {args.top_n} Vulnerable Access Points:\n', top_vulnerables)
+
+    if args.profile:
+        tracing.dump(args.profile)
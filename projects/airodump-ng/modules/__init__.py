@@ -0,0 +1,25 @@
+import os
+import sys
+from importlib import import_module
+
+# projects/ holds the `common` package shared by the three tools (see common/__init__.py)
+PROJECTS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECTS_DIR not in sys.path:
+    sys.path.append(PROJECTS_DIR)
+
+
+# Re-exported on first access, so `python -m modules.<name>` runs a module that is not imported yet
+_EXPORTS = {
+    'parse_airodump_csv': 'parser',
+    'vulnerability_scores': 'scoring',
+    'vulnerability_levels': 'scoring',
+    'keep_mask': 'filters',
+    'compile_filters': 'filters',
+    'FilterPipeline': 'filters',
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(import_module(f'.{_EXPORTS[name]}', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
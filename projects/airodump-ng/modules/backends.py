@@ -0,0 +1,283 @@
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime
+import pandas as pd
+
+from .parser import (parse_airodump_csv, rows_to_frame, AP_COLUMNS, AP_INT_COLUMNS,
+                     CLIENT_COLUMNS, CLIENT_INT_COLUMNS, DATETIME_COLUMNS, DATETIME_FORMAT, NO_KEY)
+from .mackeys import add_mac_keys
+
+NOT_ASSOCIATED = '(not associated)'
+KISMET_TIME_FORMAT = '%a %b %d %H:%M:%S %Y'
+
+
+def _kismet_time(value):
+    try:
+        return datetime.strptime(value.strip(), KISMET_TIME_FORMAT).strftime(DATETIME_FORMAT)
+    except (AttributeError, ValueError):
+        return ''
+
+
+def _encryption_fields(encryption):
+    """
+    Translate kismet encryption tokens into airodump-ng Privacy/Cipher/Authentication.
+
+    airodump-ng writes 'WPA+PSK', 'WPA+AES-CCM', 'WPA+TKIP', 'WEP' or 'None' in
+    the netxml and 'WPA2,AES-CCM' in the kismet CSV.
+    """
+    tokens = set()
+    for value in encryption:
+        tokens.update(token.strip() for token in value.replace('+', ',').split(','))
+
+    if 'WEP' in tokens:
+        privacy = 'WEP'
+    elif 'WPA2' in tokens or ('WPA' in tokens and 'AES-CCM' in tokens):
+        privacy = 'WPA2'
+    elif 'WPA' in tokens:
+        privacy = 'WPA'
+    else:
+        privacy = 'OPN'
+    cipher = ' '.join(name for token, name in (('AES-CCM', 'CCMP'), ('TKIP', 'TKIP'), ('WEP', 'WEP')) if token in tokens)
+    authentication = ' '.join(token for token in ('PSK', 'MGT') if token in tokens)
+    return privacy, cipher, authentication
+
+
+def conform_frame(df, columns, int_columns):
+    """
+    Reorder and cast an aggregated frame to the ap_df/clients_df schema, MAC keys included.
+
+    A missing Key gets NO_KEY, as in the airodump-ng CSV, so an AP scores the same from every backend.
+    """
+    df = df.reindex(columns=columns)
+    for col in columns:
+        if col in DATETIME_COLUMNS:
+            df[col] = pd.to_datetime(df[col])
+        elif col in int_columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(int_columns[col]).astype('int64')
+        else:
+            df[col] = df[col].fillna(NO_KEY if col == 'Key' else '').astype(str)
+    return add_mac_keys(df.reset_index(drop=True))
+
+
+def parse_kismet_netxml(path):
+    """
+    Parse a .kismet.netxml file with an incremental iterparse.
+
+    Each <wireless-network> is converted as soon as its closing tag is read and
+    then cleared from the tree, so memory stays constant whatever the size of
+    the file.
+
+    :param path: Path to the .kismet.netxml file.
+    :return: The access points and clients DataFrames.
+    """
+    ap_rows, client_rows = [], []
+    context = ET.iterparse(path, events=('start', 'end'))
+    _, root = next(context)
+
+    for event, element in context:
+        if event != 'end' or element.tag != 'wireless-network':
+            continue
+
+        network_type = element.get('type')
+        bssid = element.findtext('BSSID', default='').strip()
+        ssid = element.find('SSID')
+        essids = [essid.text or '' for essid in element.iter('essid')]
+
+        if network_type == 'probe':
+            bssid = NOT_ASSOCIATED
+        else:
+            encryption = [enc.text or '' for enc in ssid.iter('encryption')] if ssid is not None else []
+            privacy, cipher, authentication = _encryption_fields(encryption)
+            essid = ssid.find('essid') if ssid is not None else None
+            essid_text = '' if essid is None or essid.get('cloaked') == 'true' else (essid.text or '')
+            ap_rows.append([
+                bssid,
+                _kismet_time(element.get('first-time')),
+                _kismet_time(element.get('last-time')),
+                element.findtext('channel', default=''),
+                (ssid.findtext('max-rate', default='') if ssid is not None else '').split('.')[0],
+                privacy,
+                cipher,
+                authentication,
+                element.findtext('snr-info/last_signal_dbm', default=''),
+                ssid.findtext('packets', default='') if ssid is not None else '',
+                element.findtext('packets/data', default=''),
+                '0.0.0.0',
+                str(len(essid_text)),
+                essid_text,
+                NO_KEY,
+            ])
+
+        for client in element.iter('wireless-client'):
+            client_rows.append([
+                client.findtext('client-mac', default=''),
+                _kismet_time(client.get('first-time')),
+                _kismet_time(client.get('last-time')),
+                client.findtext('snr-info/last_signal_dbm', default=''),
+                client.findtext('packets/total', default=''),
+                bssid,
+                ','.join(essids) if network_type == 'probe' else '',
+            ])
+
+        element.clear()
+        root.clear()
+
+    return rows_to_frame(ap_rows, AP_COLUMNS, AP_INT_COLUMNS), rows_to_frame(client_rows, CLIENT_COLUMNS, CLIENT_INT_COLUMNS)
+
+
+def parse_kismet_csv(path):
+    """
+    Parse a .kismet.csv file (one semicolon separated row per network, no clients).
+
+    :param path: Path to the .kismet.csv file.
+    :return: The access points and an empty clients DataFrame.
+    """
+    df = pd.read_csv(path, sep=';', dtype=str, keep_default_na=False, index_col=False)
+    encryption = df['Encryption'].map(lambda value: _encryption_fields([value]))
+    ap_df = pd.DataFrame({
+        'BSSID': df['BSSID'],
+        'First time seen': df['FirstTime'].map(_kismet_time),
+        'Last time seen': df['LastTime'].map(_kismet_time),
+        'channel': df['Channel'],
+        'Speed': df['MaxRate'].str.split('.').str[0],
+        'Privacy': encryption.str[0],
+        'Cipher': encryption.str[1],
+        'Authentication': encryption.str[2],
+        'Power': df['BestQuality'],
+        '# beacons': df['Beacon'],
+        '# IV': df['Data'],
+        'LAN IP': df['IP'],
+        'ID-length': df['ESSID'].str.len(),
+        'ESSID': df['ESSID'],
+        'Key': NO_KEY,
+    })
+    return conform_frame(ap_df, AP_COLUMNS, AP_INT_COLUMNS), conform_frame(pd.DataFrame(), CLIENT_COLUMNS, CLIENT_INT_COLUMNS)
+
+
+def _log_power(values):
+    # 0 means no reading in the log, keep only real dBm values
+    power = pd.to_numeric(values, errors='coerce')
+    return power.where(power < 0)
+
+
+def _read_log_chunks(path, chunksize):
+    return pd.read_csv(path, skipinitialspace=True, chunksize=chunksize, dtype=str, keep_default_na=False,
+                       usecols=['LocalTime', 'ESSID', 'BSSID', 'Power', 'Security', 'Type'])
+
+
+def parse_log_csv(path, chunksize=100000):
+    """
+    Parse a .log.csv file (one row per sighting) by aggregating it in chunks.
+
+    Each chunk is reduced per (Type, BSSID) to first/last time, best power and
+    number of sightings; the partial results are then combined, so only one
+    chunk of raw sightings is in memory at a time. The number of sightings is
+    reported as '# beacons' for access points and '# packets' for clients. The
+    log does not record associations, so clients are '(not associated)'.
+
+    :param path: Path to the .log.csv file.
+    :param chunksize: Number of sightings read at once.
+    :return: The access points and clients DataFrames.
+    """
+    partials = []
+    for chunk in _read_log_chunks(path, chunksize):
+        chunk['Power'] = _log_power(chunk['Power'])
+        chunk['LocalTime'] = pd.to_datetime(chunk['LocalTime'], errors='coerce')
+        chunk['ESSID'] = chunk['ESSID'].str.strip().replace('', None)
+        chunk['Security'] = chunk['Security'].str.strip().replace('', None)
+        partials.append(chunk.groupby(['Type', 'BSSID'], sort=False).agg(
+            first=('LocalTime', 'min'),
+            last=('LocalTime', 'max'),
+            power=('Power', 'max'),
+            sightings=('Power', 'size'),
+            essid=('ESSID', 'last'),
+            security=('Security', 'last'),
+        ))
+
+    if partials:
+        merged = pd.concat(partials).groupby(level=['Type', 'BSSID'], sort=False).agg(
+            {'first': 'min', 'last': 'max', 'power': 'max', 'sightings': 'sum', 'essid': 'last', 'security': 'last'}
+        ).reset_index()
+    else:
+        merged = pd.DataFrame(columns=['Type', 'BSSID', 'first', 'last', 'power', 'sightings', 'essid', 'security'])
+
+    aps = merged[merged['Type'] == 'AP']
+    essid = aps['essid'].fillna('')
+    ap_df = pd.DataFrame({
+        'BSSID': aps['BSSID'],
+        'First time seen': aps['first'],
+        'Last time seen': aps['last'],
+        'Privacy': aps['security'].fillna('OPN'),
+        'Power': aps['power'],
+        '# beacons': aps['sightings'],
+        'LAN IP': '0.0.0.0',
+        'ID-length': essid.str.len(),
+        'ESSID': essid,
+    })
+
+    clients = merged[merged['Type'] == 'Client']
+    clients_df = pd.DataFrame({
+        'Station MAC': clients['BSSID'],
+        'First time seen': clients['first'],
+        'Last time seen': clients['last'],
+        'Power': clients['power'],
+        '# packets': clients['sightings'],
+        'BSSID': NOT_ASSOCIATED,
+    })
+    return conform_frame(ap_df, AP_COLUMNS, AP_INT_COLUMNS), conform_frame(clients_df, CLIENT_COLUMNS, CLIENT_INT_COLUMNS)
+
+
+def power_over_time(path, freq='1min', chunksize=100000):
+    """
+    Mean power per BSSID and time bucket from a .log.csv, computed chunk by chunk.
+
+    :param path: Path to the .log.csv file.
+    :param freq: Pandas offset alias of the time buckets.
+    :param chunksize: Number of sightings read at once.
+    :return: A DataFrame with BSSID, LocalTime (bucket start), mean_power and sightings.
+    """
+    partials = []
+    for chunk in _read_log_chunks(path, chunksize):
+        chunk['Power'] = _log_power(chunk['Power'])
+        chunk['LocalTime'] = pd.to_datetime(chunk['LocalTime'], errors='coerce').dt.floor(freq)
+        partials.append(chunk.groupby(['BSSID', 'LocalTime'])['Power'].agg(['sum', 'count']))
+
+    if not partials:
+        return pd.DataFrame(columns=['BSSID', 'LocalTime', 'mean_power', 'sightings'])
+    totals = pd.concat(partials).groupby(level=['BSSID', 'LocalTime']).sum()
+    totals['mean_power'] = totals['sum'] / totals['count']
+    return totals.rename(columns={'count': 'sightings'})[['mean_power', 'sightings']].reset_index()
+
+
+BACKENDS = {
+    'csv': parse_airodump_csv,
+    'netxml': parse_kismet_netxml,
+    'kismet_csv': parse_kismet_csv,
+    'log_csv': parse_log_csv,
+}
+
+
+def detect_backend(path):
+    """Guess the input backend from the file name written by airodump-ng."""
+    name = os.path.basename(path).lower()
+    if name.endswith('.kismet.netxml') or name.endswith('.netxml'):
+        return 'netxml'
+    if name.endswith('.kismet.csv'):
+        return 'kismet_csv'
+    if name.endswith('.log.csv'):
+        return 'log_csv'
+    return 'csv'
+
+
+def load_capture(path, backend=None):
+    """
+    Load any supported capture file into the ap_df/clients_df schema.
+
+    :param path: Path to the capture file.
+    :param backend: One of BACKENDS, or None to detect it from the file name.
+    :return: The access points and clients DataFrames.
+    """
+    backend = backend or detect_backend(path)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown input backend '{backend}'. Options: {', '.join(BACKENDS)}.")
+    return BACKENDS[backend](path)
@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+from common import tracing
+
+CACHE_VERSION = 3  # 2: MAC key columns, 3: unstripped Key
+DEFAULT_CACHE_DIR = './cache'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _dir_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed captures in a columnar NumPy layout.
+
+    Every entry is a directory with one .npy file per column plus a meta.json.
+    Numeric, datetime and fixed-width string columns are loaded with
+    mmap_mode='r', so a cache hit only touches the pages that are actually
+    read. Entries are keyed by absolute path, size, mtime and input backend,
+    therefore any change to the capture invalidates its entry automatically.
+    The least recently used entries are evicted once the cache exceeds
+    `max_bytes`.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _source_signature(path, backend):
+        stat = os.stat(path)
+        return {
+            'path': os.path.abspath(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'backend': backend or '',
+            'version': CACHE_VERSION,
+        }
+
+    def _entry_dir(self, signature):
+        key = hashlib.sha1(json.dumps(signature, sort_keys=True).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key)
+
+    def _entries(self):
+        for entry in os.scandir(self.cache_dir):
+            meta_path = os.path.join(entry.path, 'meta.json')
+            if entry.is_dir() and os.path.exists(meta_path):
+                yield entry.path, meta_path
+
+    @staticmethod
+    def _save_frame(df, directory):
+        os.makedirs(directory)
+        columns = []
+        for i, col in enumerate(df.columns):
+            values = df[col].to_numpy()
+            if values.dtype == object:
+                # Fixed-width unicode can be memory mapped, object arrays cannot
+                values = values.astype(str) if len(values) else np.array([], dtype='<U1')
+            np.save(os.path.join(directory, f'{i}.npy'), values, allow_pickle=False)
+            columns.append({'name': col, 'dtype': str(df[col].dtype)})
+        return columns
+
+    @staticmethod
+    def _load_frame(directory, columns):
+        data = {}
+        for i, column in enumerate(columns):
+            values = np.load(os.path.join(directory, f'{i}.npy'), mmap_mode='r', allow_pickle=False)
+            if column['dtype'] == 'object':
+                values = np.array(values.tolist(), dtype=object)
+            data[column['name']] = values
+        return pd.DataFrame(data, copy=False)
+
+    def load(self, path, backend=None):
+        """
+        Return the cached (ap_df, clients_df) of `path`, or None on a miss.
+
+        :param path: Path of the capture file.
+        :param backend: Input backend used to parse the capture.
+        """
+        entry = self._entry_dir(self._source_signature(path, backend))
+        meta_path = os.path.join(entry, 'meta.json')
+        try:
+            with open(meta_path, 'r') as file:
+                meta = json.load(file)
+            frames = (self._load_frame(os.path.join(entry, 'ap'), meta['ap']),
+                      self._load_frame(os.path.join(entry, 'clients'), meta['clients']))
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+        os.utime(meta_path)  # Mark as recently used for the LRU eviction
+        return frames
+
+    def store(self, path, ap_df, clients_df, backend=None):
+        """
+        Store the parsed DataFrames of `path`, replacing stale entries of the same file.
+
+        :param path: Path of the capture file.
+        :param ap_df: Access points DataFrame.
+        :param clients_df: Clients DataFrame.
+        :param backend: Input backend used to parse the capture.
+        """
+        signature = self._source_signature(path, backend)
+        entry = self._entry_dir(signature)
+        tmp_entry = f"{entry}.tmp-{os.getpid()}"
+
+        # Older versions of the same capture can never be hit again
+        for entry_path, meta_path in list(self._entries()):
+            try:
+                with open(meta_path, 'r') as file:
+                    old = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if old.get('path') == signature['path'] and old.get('backend') == signature['backend']:
+                shutil.rmtree(entry_path, ignore_errors=True)
+
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+
+        meta = dict(signature)
+        meta['ap'] = self._save_frame(ap_df, os.path.join(tmp_entry, 'ap'))
+        meta['clients'] = self._save_frame(clients_df, os.path.join(tmp_entry, 'clients'))
+        with open(os.path.join(tmp_entry, 'meta.json'), 'w') as file:
+            json.dump(meta, file)
+
+        os.replace(tmp_entry, entry)
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry_path, meta_path in self._entries():
+            size = _dir_size(os.path.join(entry_path, 'ap')) + _dir_size(os.path.join(entry_path, 'clients'))
+            entries.append((os.path.getmtime(meta_path), size, entry_path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        for entry_path, _ in list(self._entries()):
+            shutil.rmtree(entry_path, ignore_errors=True)
+
+
+def load_capture_cached(path, loader, cache, backend=None):
+    """
+    Load a capture through the cache, parsing it with `loader` on a miss.
+
+    :param path: Path of the capture file.
+    :param loader: Function (path, backend) -> (ap_df, clients_df).
+    :param cache: A ParseCache instance.
+    :param backend: Input backend used to parse the capture.
+    :return: The access points and clients DataFrames.
+    """
+    with tracing.span("cache.load"):
+        frames = cache.load(path, backend)
+    tracing.count("cache.hits" if frames is not None else "cache.misses")
+    if frames is None:
+        with tracing.span("parse"):
+            frames = loader(path, backend=backend)
+        with tracing.span("cache.store"):
+            cache.store(path, *frames, backend=backend)
+    return frames
+
+
+if __name__ == "__main__":
+    # Parsing vs a cache hit. Run as `python -m modules.cache [CAPTURE]`
+    import sys
+    import tempfile
+
+    from .backends import load_capture
+
+    path = sys.argv[1] if len(sys.argv) > 1 else './data/airodump_sample-01.csv'
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ParseCache(cache_dir)
+
+        start = time.perf_counter()
+        load_capture_cached(path, load_capture, cache)
+        miss = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ap_df, clients_df = load_capture_cached(path, load_capture, cache)
+        hit = time.perf_counter() - start
+
+        print(f"{path}: parse + store {miss * 1000:.1f} ms, cached load {hit * 1000:.1f} ms ({len(ap_df)} APs, {len(clients_df)} clients)")
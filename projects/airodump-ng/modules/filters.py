@@ -0,0 +1,180 @@
+import re
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+from .mackeys import NO_KEY, mac_keys, frame_keys, isin_keys
+
+# Backreferences, conditional groups, named groups (duplicate names) and global inline flags
+# change meaning or fail inside an alternation
+UNCOMBINABLE = re.compile(r'\\[1-9]|\(\?P[=<]|\(\?\(|\(\?[aiLmsux]+\)')
+
+
+def _combine(patterns, template, flags=0):
+    """
+    Compile a list of regular expressions into a single alternation.
+
+    Patterns that cannot be combined (e.g. backreferences, named groups or
+    inline flags, whose meaning changes inside a bigger expression) are
+    compiled on their own and returned separately, and so is every pattern
+    when the alternation still fails to compile.
+    """
+    combinable, separate = [], []
+    for pattern in patterns:
+        if UNCOMBINABLE.search(pattern):
+            separate.append(re.compile(template.format(pattern), flags))
+        else:
+            combinable.append(pattern)
+
+    combined = None
+    if combinable:
+        try:
+            combined = re.compile(template.format('|'.join(f'(?:{pattern})' for pattern in combinable)), flags)
+        except re.error:
+            separate += [re.compile(template.format(pattern), flags) for pattern in combinable]
+    return combined, separate
+
+
+def _matches_any(values, regexes, candidates):
+    """
+    Boolean array, True where one of `regexes` matches.
+
+    Only the rows still kept are searched, and each distinct value is searched
+    once: ESSIDs and privacy strings repeat a lot across a survey.
+    """
+    hits = np.zeros(len(values), dtype=bool)
+    positions = np.flatnonzero(candidates)
+    if not len(positions):
+        return hits
+    codes, uniques = pd.factorize(values.iloc[positions].astype(str))
+    unique_hits = np.zeros(len(uniques), dtype=bool)
+    for regex in regexes:
+        unique_hits |= np.fromiter((regex.search(value) is not None for value in uniques), dtype=bool, count=len(uniques))
+    hits[positions] = unique_hits[codes]
+    return hits
+
+
+class FilterPipeline:
+    """
+    The exclusion filters of top_n_vulnerables compiled once.
+
+    exclude_protocol and exclude_essid become one combined regex each and
+    exclude_bssid an array of integer MAC keys matched against the BSSID keys
+    of the frame, so a DataFrame is filtered with a single boolean mask
+    instead of one filtered copy per pattern. Entries that are not valid MACs
+    are still compared as strings.
+    """
+
+    def __init__(self, exclude_protocol=(), essid_key=False, exclude_bssid=(), exclude_essid=()):
+        # Using word boundaries to match the whole protocol name
+        self.protocol_regex, self.protocol_extra = _combine(exclude_protocol, r'\b(?:{})\b')
+        self.essid_regex, self.essid_extra = _combine(exclude_essid, '{}', re.IGNORECASE)
+        self.essid_key = essid_key
+        keys = mac_keys(list(exclude_bssid))
+        self.exclude_bssid_keys = np.unique(keys[keys != NO_KEY])
+        self.exclude_bssid = frozenset(bssid.strip().upper() for bssid, key in zip(exclude_bssid, keys) if key == NO_KEY)
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the pipeline from a config.json dictionary."""
+        return compile_filters(config.get('exclude_protocol', []), config.get('essid_key', False),
+                               config.get('exclude_bssid', []), config.get('exclude_essid', []))
+
+    def mask(self, df):
+        """
+        Boolean mask of the access points that pass the filters.
+
+        :param df: Access points DataFrame.
+        :return: A boolean Series aligned with df.index.
+        """
+        keep = np.ones(len(df), dtype=bool)
+
+        if len(self.exclude_bssid_keys):
+            keep &= ~isin_keys(frame_keys(df, 'BSSID'), self.exclude_bssid_keys)
+        if self.exclude_bssid:
+            keep &= ~df['BSSID'].str.upper().isin(self.exclude_bssid).to_numpy()
+
+        if self.essid_key:
+            keep &= (df['ESSID'].astype(str).str.strip() != '').to_numpy()
+
+        for col, regexes in (('Privacy', [self.protocol_regex] + self.protocol_extra),
+                             ('ESSID', [self.essid_regex] + self.essid_extra)):
+            regexes = [regex for regex in regexes if regex is not None]
+            if regexes:
+                keep &= ~_matches_any(df[col], regexes, keep)
+
+        return pd.Series(keep, index=df.index)
+
+
+@lru_cache(maxsize=32)
+def _compile_filters(exclude_protocol, essid_key, exclude_bssid, exclude_essid):
+    return FilterPipeline(exclude_protocol, essid_key, exclude_bssid, exclude_essid)
+
+
+def compile_filters(exclude_protocol=[], essid_key=False, exclude_bssid=[], exclude_essid=[]):
+    """Return the (memoized) FilterPipeline for the given filter arguments."""
+    return _compile_filters(tuple(exclude_protocol), bool(essid_key), tuple(exclude_bssid), tuple(exclude_essid))
+
+
+def keep_mask(df, exclude_protocol=[], essid_key=False, exclude_bssid=[], exclude_essid=[]):
+    """
+    Boolean mask of the access points that pass the user filters.
+
+    Parameters
+    ----------
+    df : DataFrame
+        Access points DataFrame.
+    exclude_protocol : list
+        List of encryption protocols to exclude.
+    essid_key : bool
+        If True, only includes networks with a non-empty ESSID.
+    exclude_bssid : list
+        List of BSSIDs to exclude.
+    exclude_essid : list
+        List of regular expressions to exclude specific ESSIDs.
+
+    Returns
+    -------
+    Series
+        True for the rows to keep, aligned with df.index.
+    """
+    return compile_filters(exclude_protocol, essid_key, exclude_bssid, exclude_essid).mask(df)
+
+
+def reference_mask(df, exclude_protocol=[], essid_key=False, exclude_bssid=[], exclude_essid=[]):
+    """One str.contains pass per pattern, as top_n_vulnerables used to filter."""
+    vulnerables = df.copy()
+    for protocol in exclude_protocol:
+        vulnerables = vulnerables[~vulnerables['Privacy'].str.contains(r'\b' + protocol + r'\b', regex=True)]
+    if essid_key:
+        vulnerables = vulnerables[vulnerables['ESSID'].str.strip() != '']
+    vulnerables = vulnerables[~vulnerables['BSSID'].isin(exclude_bssid)]
+    vulnerables['ESSID'] = vulnerables['ESSID'].astype(str)
+    for pattern in exclude_essid:
+        vulnerables = vulnerables[~vulnerables['ESSID'].str.contains(pattern, flags=re.IGNORECASE, regex=True, na=False)]
+    return df.index.isin(vulnerables.index)
+
+
+if __name__ == "__main__":
+    # Per-pattern passes vs the compiled pipeline. Run as `python -m modules.filters`
+    import time
+
+    from .parser import parse_airodump_csv
+
+    ap_df, _ = parse_airodump_csv('./data/airodump_sample-01.csv')
+    ap_df = pd.concat([ap_df] * 200, ignore_index=True)
+    # Distinct ESSIDs, so the benchmark does not benefit from repeated values
+    ap_df['ESSID'] = ap_df['ESSID'] + '-' + ap_df.index.astype(str)
+    patterns = [f'^corp-{i:04d}(-guest)?$' for i in range(1000)] + ['iphone']
+    kwargs = {'exclude_protocol': ['OPN', 'WEP'], 'essid_key': True, 'exclude_bssid': ['B0:EC:DD:71:BB:48'], 'exclude_essid': patterns}
+
+    start = time.perf_counter()
+    expected = reference_mask(ap_df, **kwargs)
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mask = keep_mask(ap_df, **kwargs)
+    compiled_time = time.perf_counter() - start
+
+    assert (mask.to_numpy() == expected).all()
+    print(f"{len(ap_df)} APs, {len(patterns)} ESSID patterns: per-pattern passes {reference_time:.2f} s, compiled pipeline {compiled_time:.2f} s")
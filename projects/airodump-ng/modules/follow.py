@@ -0,0 +1,266 @@
+import os
+import time
+import pandas as pd
+
+from .parser import (iter_section_lines, rows_to_frame, split_ap_line, split_client_line,
+                     AP_COLUMNS, AP_INT_COLUMNS, CLIENT_COLUMNS, CLIENT_INT_COLUMNS)
+from .scoring import vulnerability_scores, LEVEL_LABELS
+from .ranking import VulnerabilityRanking
+from .filters import keep_mask
+from .mackeys import without_keys
+
+NOT_ASSOCIATED = '(not associated)'
+
+
+def _keyed_frame(rows, columns, int_columns, key):
+    df = rows_to_frame(rows, columns, int_columns)
+    df.index = pd.Index(df[key].to_numpy())
+    return df
+
+
+def _upsert(table, frame):
+    """Update the rows of `table` present in `frame` in place and append the new ones."""
+    if table is None:
+        return frame
+    existing = frame.index.intersection(table.index)
+    if len(existing):
+        table.loc[existing, frame.columns] = frame.loc[existing]
+    new = frame.index.difference(table.index)
+    if len(new):
+        table = pd.concat([table, frame.loc[new]])
+    return table
+
+
+class CaptureFollower:
+    """
+    Follow an airodump-ng CSV that is being rewritten during a live capture.
+
+    Every refresh streams the file once and compares each raw line with the one
+    seen before for the same BSSID/Station MAC. Only new or changed lines are
+    typed, scored and filtered; the AP/client tables, client counts, scores and
+    the VulnerabilityRanking are updated in place, so the cost of a refresh
+    depends on how many rows changed rather than on how big the capture has
+    grown.
+    """
+
+    def __init__(self, csv_path, top_n=5, client_n=None, exclude_protocol=[], essid_key=False, exclude_bssid=[], exclude_essid=[]):
+        self.csv_path = csv_path
+        self.top_n = top_n
+        self.client_n = client_n
+        self.filters = {
+            'exclude_protocol': exclude_protocol,
+            'essid_key': essid_key,
+            'exclude_bssid': exclude_bssid,
+            'exclude_essid': exclude_essid,
+        }
+
+        self.ap_lines = {}  # BSSID -> raw line
+        self.client_lines = {}  # Station MAC -> raw line
+        self.ap_df = None  # Access Points DataFrame indexed by BSSID
+        self.clients_df = None  # Clients DataFrame indexed by Station MAC
+        self.scores = pd.Series(dtype=float)
+        self.eligible = pd.Series(dtype=bool)
+        self.client_count = pd.Series(dtype='int64')
+        self.ranking = VulnerabilityRanking()  # Only the APs that currently pass every filter
+        self._last_stat = None
+
+    def _read_lines(self):
+        ap_lines, client_lines = {}, {}
+        found_clients = False
+        for section, line in iter_section_lines(self.csv_path):
+            if section is None:
+                found_clients = True
+                continue
+            key = line.split(',', 1)[0].strip()
+            (ap_lines if section == 'ap' else client_lines)[key] = line
+        return ap_lines, client_lines, found_clients
+
+    def _file_changed(self):
+        try:
+            stat = os.stat(self.csv_path)
+        except FileNotFoundError:
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._last_stat:
+            return False
+        self._last_stat = signature
+        return True
+
+    def _update_access_points(self, ap_lines):
+        changed = {key: line for key, line in ap_lines.items() if self.ap_lines.get(key) != line}
+        removed = self.ap_lines.keys() - ap_lines.keys()
+        self.ap_lines = ap_lines
+
+        if removed and self.ap_df is not None:
+            removed = list(removed)
+            self.ap_df = self.ap_df.drop(removed, errors='ignore')
+            self.scores = self.scores.drop(removed, errors='ignore')
+            self.eligible = self.eligible.drop(removed, errors='ignore')
+        for bssid in removed:
+            self.ranking.remove(bssid)
+
+        rows = [fields for fields in map(split_ap_line, changed.values()) if fields is not None]
+        if not rows:
+            return []
+
+        # Score and filter only the changed access points
+        frame = _keyed_frame(rows, AP_COLUMNS, AP_INT_COLUMNS, 'BSSID')
+        self.ap_df = _upsert(self.ap_df, frame)
+        self.scores = _upsert(self.scores.to_frame('score'), vulnerability_scores(frame).to_frame('score'))['score']
+        self.eligible = _upsert(self.eligible.to_frame('eligible'), keep_mask(frame, **self.filters).to_frame('eligible'))['eligible']
+        return list(frame.index)
+
+    def _update_clients(self, client_lines):
+        changed = {key: line for key, line in client_lines.items() if self.client_lines.get(key) != line}
+        removed = list(self.client_lines.keys() - client_lines.keys())
+        self.client_lines = client_lines
+
+        rows = [fields for fields in map(split_client_line, changed.values()) if fields is not None]
+        frame = _keyed_frame(rows, CLIENT_COLUMNS, CLIENT_INT_COLUMNS, 'Station MAC') if rows else None
+
+        # Undo the association of every changed/removed station, then apply the new one
+        old_bssids = pd.Series(dtype=object)
+        if self.clients_df is not None:
+            touched = self.clients_df.index.intersection(list(changed.keys()) + removed)
+            old_bssids = self.clients_df.loc[touched, 'BSSID']
+            if removed:
+                self.clients_df = self.clients_df.drop(removed, errors='ignore')
+        new_bssids = frame['BSSID'] if frame is not None else pd.Series(dtype=object)
+
+        delta = new_bssids[new_bssids != NOT_ASSOCIATED].value_counts().sub(
+            old_bssids[old_bssids != NOT_ASSOCIATED].value_counts(), fill_value=0)
+        if len(delta):
+            counts = self.client_count.add(delta, fill_value=0).astype('int64')
+            self.client_count = counts[counts > 0]
+
+        if frame is not None:
+            self.clients_df = _upsert(self.clients_df, frame)
+        return (0 if frame is None else len(frame)), list(delta.index)
+
+    def _sync_ranking(self, bssids):
+        """Insert, move or drop the given BSSIDs in the ranking after their score, filters or clients changed."""
+        if self.ap_df is None or not len(bssids):
+            return
+        bssids = self.ap_df.index.intersection(pd.Index(bssids).unique())
+        counts = self.client_count.reindex(bssids, fill_value=0)
+        passing = self.eligible.reindex(bssids, fill_value=False) & (counts > 0)
+        if self.client_n is not None:
+            passing &= counts >= self.client_n
+        scores = self.scores.reindex(bssids)
+        for bssid, keep in passing.items():
+            if keep:
+                self.ranking.upsert(bssid, float(scores[bssid]))
+            else:
+                self.ranking.remove(bssid)
+
+    def refresh(self):
+        """
+        Re-read the capture and apply the changed rows.
+
+        :return: A tuple (changed_aps, changed_clients), or None if the file did not change or is mid-rewrite.
+        """
+        if not self._file_changed():
+            return None
+        ap_lines, client_lines, found_clients = self._read_lines()
+        if not found_clients:
+            # airodump-ng is rewriting the file, wait for the next refresh
+            self._last_stat = None
+            return None
+        changed_aps = self._update_access_points(ap_lines)
+        changed_clients, touched_bssids = self._update_clients(client_lines)
+        self._sync_ranking(changed_aps + touched_bssids)
+        return len(changed_aps), changed_clients
+
+    def leaderboard(self, top_n=None):
+        """
+        Current top-N vulnerable access points, with the same filters and columns as top_n_vulnerables.
+
+        :param top_n: Number of access points to return. Defaults to the follower top_n.
+        :return: A DataFrame sorted by Vulnerability_Score.
+        """
+        top_n = top_n or self.top_n
+        if self.ap_df is None:
+            return pd.DataFrame(columns=AP_COLUMNS + ['Client_Count', 'Vulnerability_Score', 'Vulnerability_level'])
+
+        # The ranking already holds only the APs that pass the filters, so no full scan or sort is needed
+        ranked = self.ranking.top(top_n or None)
+        bssids = [bssid for bssid, _, _ in ranked]
+        top = without_keys(self.ap_df.loc[bssids])
+        top['Client_Count'] = self.client_count.reindex(bssids, fill_value=0).to_numpy()
+        top['Vulnerability_Score'] = [score for _, score, _ in ranked]
+        top['Vulnerability_level'] = pd.Categorical([level for _, _, level in ranked], categories=LEVEL_LABELS, ordered=True)
+        return top.reset_index(drop=True)
+
+    def follow(self, interval=2.0, max_refreshes=None, callback=None):
+        """
+        Poll the capture every `interval` seconds and print the leaderboard whenever it changes.
+
+        :param interval: Seconds between polls.
+        :param max_refreshes: Stop after this many applied refreshes. None runs until interrupted.
+        :param callback: Function called with (leaderboard, latency_seconds, changes). Defaults to printing.
+        """
+        callback = callback or print_leaderboard
+        refreshes = 0
+        try:
+            while max_refreshes is None or refreshes < max_refreshes:
+                start = time.perf_counter()
+                changes = self.refresh()
+                if changes is not None:
+                    board = self.leaderboard()
+                    callback(board, time.perf_counter() - start, changes)
+                    refreshes += 1
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def print_leaderboard(board, latency, changes):
+    changed_aps, changed_clients = changes
+    print(f"\n[{time.strftime('%H:%M:%S')}] {changed_aps} APs / {changed_clients} clients changed, refresh took {latency * 1000:.1f} ms")
+    print(board[['BSSID', 'ESSID', 'Privacy', 'Power', 'Client_Count', 'Vulnerability_Score', 'Vulnerability_level']].to_string(index=False))
+
+
+def simulate_capture(source_csv, target_csv, steps=20, interval=1.0):
+    """
+    Rewrite `target_csv` over and over the way airodump-ng does during a capture.
+
+    Each step writes a larger prefix of the AP and client sections of
+    `source_csv`, so rows appear progressively and the file keeps growing.
+    Handy to try --follow without a wireless card.
+    """
+    ap_lines, client_lines = [], []
+    for section, line in iter_section_lines(source_csv):
+        if section == 'ap':
+            ap_lines.append(line)
+        elif section == 'clients':
+            client_lines.append(line)
+
+    for step in range(1, steps + 1):
+        n_ap = max(1, len(ap_lines) * step // steps)
+        n_clients = max(1, len(client_lines) * step // steps)
+        tmp_path = f"{target_csv}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write('\r\n' + ', '.join(AP_COLUMNS) + '\r\n')
+            file.writelines(line + '\r\n' for line in ap_lines[:n_ap])
+            file.write('\r\n' + ', '.join(CLIENT_COLUMNS) + '\r\n')
+            file.writelines(line + '\r\n' for line in client_lines[:n_clients])
+            file.write('\r\n')
+        os.replace(tmp_path, target_csv)
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    # Follow a simulated capture. Run as `python -m modules.follow [CAPTURE]`
+    import sys
+    import threading
+
+    source = sys.argv[1] if len(sys.argv) > 1 else './data/airodump_sample-01.csv'
+    target = './output/follow-simulation.csv'
+    steps = 10
+
+    writer = threading.Thread(target=simulate_capture, args=(source, target, steps, 0.5), daemon=True)
+    writer.start()
+    time.sleep(0.1)
+    CaptureFollower(target, top_n=5).follow(interval=0.25, max_refreshes=steps)
+    writer.join()
+    os.remove(target)
@@ -0,0 +1,291 @@
+import math
+import numpy as np
+import pandas as pd
+
+from common import tracing
+from .ranking import top_n_positions
+
+EARTH_RADIUS_M = 6371008.8
+METRES_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+DEFAULT_CELL_M = 250
+# Sightings without a power reading weigh as much as the weakest signal airodump-ng reports
+MIN_POWER_DBM = -100
+POSITION_COLUMNS = ['Latitude', 'Longitude', 'Position_Error_m', 'GPS_Sightings']
+_SUMS = ['weight', 'lat', 'lon', 'lat2', 'lon2', 'sightings']
+
+
+def _read_gps_chunks(path, chunksize):
+    return pd.read_csv(path, skipinitialspace=True, chunksize=chunksize, keep_default_na=False, na_values=[''],
+                       usecols=['BSSID', 'Power', 'Latitude', 'Longitude', 'Type'],
+                       dtype={'BSSID': str, 'Type': str, 'Power': float, 'Latitude': float, 'Longitude': float})
+
+
+def _position_sums(chunk, types):
+    """Per-BSSID weighted sums of one chunk of sightings, the ones without a GPS fix dropped."""
+    lat = chunk['Latitude'].to_numpy()
+    lon = chunk['Longitude'].to_numpy()
+    # airodump-ng writes 0.000000 for both when there is no fix
+    mask = np.isfinite(lat) & np.isfinite(lon) & ((lat != 0) | (lon != 0))
+    if types is not None:
+        mask &= chunk['Type'].isin(types).to_numpy()
+    lat, lon = lat[mask], lon[mask]
+    # Received power in mW: a reading 10 dB stronger counts ten times more
+    weight = 10 ** (np.nan_to_num(chunk['Power'].to_numpy()[mask], nan=MIN_POWER_DBM) / 10)
+    weighted_lat, weighted_lon = weight * lat, weight * lon
+    sums = pd.DataFrame({
+        'weight': weight, 'lat': weighted_lat, 'lon': weighted_lon,
+        'lat2': weighted_lat * lat, 'lon2': weighted_lon * lon, 'sightings': 1,
+    }, index=chunk['BSSID'].to_numpy()[mask])
+    return sums.groupby(level=0, sort=False).sum()
+
+
+def estimate_positions(path, types=('AP',), chunksize=500000):
+    """
+    Estimate the position of every access point of a .log.csv GPS survey.
+
+    Each position is the centroid of the sightings weighted by their received
+    power in mW, so the readings taken closest to the transmitter dominate.
+    The file is reduced chunk by chunk to per-BSSID sums, so millions of
+    sightings are aggregated with vectorized operations in constant memory.
+
+    Parameters
+    ----------
+    path : str
+        Path to the .log.csv file written by airodump-ng with --gpsd.
+    types : tuple or None
+        Sighting types to keep ('AP', 'Client'). None keeps every type.
+    chunksize : int
+        Number of sightings read at once.
+
+    Returns
+    -------
+    DataFrame
+        BSSID, Latitude, Longitude, Position_Error_m (weighted RMS distance of
+        the sightings to the estimate) and GPS_Sightings. BSSIDs never seen
+        with a GPS fix are left out.
+    """
+    with tracing.span("geo.estimate_positions", path=path):
+        partials = [_position_sums(chunk, types) for chunk in _read_gps_chunks(path, chunksize)]
+        sums = pd.concat(partials).groupby(level=0, sort=False).sum() if partials else pd.DataFrame(columns=_SUMS)
+
+    weight = sums['weight'].to_numpy(dtype=float)
+    latitude = sums['lat'].to_numpy(dtype=float) / weight
+    longitude = sums['lon'].to_numpy(dtype=float) / weight
+    lat_variance = np.maximum(sums['lat2'].to_numpy(dtype=float) / weight - latitude ** 2, 0)
+    lon_variance = np.maximum(sums['lon2'].to_numpy(dtype=float) / weight - longitude ** 2, 0)
+    error = METRES_PER_DEGREE * np.sqrt(lat_variance + lon_variance * np.cos(np.radians(latitude)) ** 2)
+    positions = pd.DataFrame({
+        'BSSID': sums.index.astype(str),
+        'Latitude': latitude,
+        'Longitude': longitude,
+        'Position_Error_m': error,
+        'GPS_Sightings': sums['sightings'].to_numpy(dtype='int64'),
+    })
+    tracing.count("geo.positions", len(positions))
+    return positions
+
+
+def join_positions(df, positions):
+    """
+    Add the estimated positions to a frame with a BSSID column (ap_df, top_n_vulnerables output...).
+
+    Rows without an estimate get NaN coordinates. Position columns already in `df` are replaced.
+    """
+    df = df.drop(columns=[col for col in POSITION_COLUMNS if col in df.columns])
+    located = positions.set_index('BSSID')[POSITION_COLUMNS]
+    joined = located.reindex(df['BSSID'].to_numpy())
+    for col in POSITION_COLUMNS:
+        df[col] = joined[col].to_numpy()
+    return df
+
+
+def haversine_m(lat, lon, lat2, lon2):
+    """Great-circle distance in metres, vectorized over numpy arrays."""
+    lat, lon, lat2, lon2 = (np.radians(value) for value in (lat, lon, lat2, lon2))
+    a = np.sin((lat2 - lat) / 2) ** 2 + np.cos(lat) * np.cos(lat2) * np.sin((lon2 - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+
+class SpatialIndex:
+    """
+    Uniform grid over the located rows of a frame, for radius and bounding box queries.
+
+    Rows are sorted by cell key (row * columns + column), so the cells of one
+    grid row inside a query are a contiguous key range found with
+    np.searchsorted. Only those candidates are then checked exactly. Cells are
+    `cell_m` metres high; their width in degrees is set at the median latitude
+    of the data so they stay roughly square over a survey area.
+
+    Build it on the top_n_vulnerables output (with every candidate, top_n=None)
+    after AirodumpHandler.add_positions to get the most vulnerable access
+    points of an area in milliseconds.
+    """
+
+    def __init__(self, df, cell_m=DEFAULT_CELL_M):
+        if 'Latitude' not in df.columns or 'Longitude' not in df.columns:
+            raise ValueError("The frame has no Latitude/Longitude columns. Add the positions first (join_positions).")
+        located = df[df['Latitude'].notna() & df['Longitude'].notna()]
+        lat = located['Latitude'].to_numpy(dtype=float)
+        lon = located['Longitude'].to_numpy(dtype=float)
+        reference = float(np.median(lat)) if len(lat) else 0.0
+        self.cell_lat = cell_m / METRES_PER_DEGREE
+        self.cell_lon = self.cell_lat / max(math.cos(math.radians(min(abs(reference), 85.0))), 1e-6)
+        self.n_columns = math.ceil(360 / self.cell_lon) + 1
+        with tracing.span("geo.index", rows=len(located)):
+            keys = self._row(lat) * self.n_columns + self._column(lon)
+            order = np.argsort(keys, kind='stable')
+            self.keys = keys[order]
+            self.lat = lat[order]
+            self.lon = lon[order]
+            self.df = located.iloc[order].reset_index(drop=True)
+
+    def __len__(self):
+        return len(self.df)
+
+    def _row(self, lat):
+        return np.floor((np.asarray(lat, dtype=float) + 90) / self.cell_lat).astype('int64')
+
+    def _column(self, lon):
+        return np.floor((np.asarray(lon, dtype=float) + 180) / self.cell_lon).astype('int64')
+
+    def _candidates(self, south, west, north, east):
+        """Positions of the rows in the grid cells covering a box that does not cross the antimeridian."""
+        rows = np.arange(self._row(south), self._row(north) + 1)
+        starts = np.searchsorted(self.keys, rows * self.n_columns + self._column(west), side='left')
+        ends = np.searchsorted(self.keys, rows * self.n_columns + self._column(east), side='right')
+        lengths = ends - starts
+        if not lengths.sum():
+            return np.array([], dtype=np.intp)
+        # Concatenation of the ranges starts[i]:ends[i]
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return offsets + np.arange(lengths.sum())
+
+    def bbox_positions(self, south, west, north, east):
+        """
+        Positions (into self.df) of the rows inside a bounding box, in degrees.
+
+        A box with west > east crosses the antimeridian.
+        """
+        if south > north:
+            raise ValueError("The south edge of the bounding box must not be above the north edge.")
+        south, north = max(south, -90.0), min(north, 90.0)
+        spans = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+        found = []
+        for span_west, span_east in spans:
+            candidates = self._candidates(south, span_west, north, span_east)
+            lat, lon = self.lat[candidates], self.lon[candidates]
+            found.append(candidates[(lat >= south) & (lat <= north) & (lon >= span_west) & (lon <= span_east)])
+        return np.concatenate(found)
+
+    def within_bbox(self, south, west, north, east):
+        """Rows inside a bounding box (south, west, north, east in degrees)."""
+        return self.df.iloc[self.bbox_positions(south, west, north, east)]
+
+    def radius_positions(self, lat, lon, radius_m):
+        """
+        Positions (into self.df) and distances of the rows within `radius_m` metres of a point, nearest first.
+
+        :return: (positions, distances in metres)
+        """
+        if radius_m < 0:
+            raise ValueError("The radius must be positive.")
+        delta_lat = radius_m / METRES_PER_DEGREE
+        south, north = lat - delta_lat, lat + delta_lat
+        widest = max(abs(south), abs(north))
+        if widest >= 90:
+            west, east = -180.0, 180.0
+        else:
+            delta_lon = min(delta_lat / math.cos(math.radians(widest)), 180.0)
+            west, east = (lon - delta_lon + 180) % 360 - 180, (lon + delta_lon + 180) % 360 - 180
+            if delta_lon >= 180:
+                west, east = -180.0, 180.0
+        candidates = self.bbox_positions(south, west, north, east)
+        distances = haversine_m(lat, lon, self.lat[candidates], self.lon[candidates])
+        inside = distances <= radius_m
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind='stable')
+        return candidates[order], distances[order]
+
+    def within_radius(self, lat, lon, radius_m):
+        """Rows within `radius_m` metres of (lat, lon), nearest first, with a Distance_m column."""
+        positions, distances = self.radius_positions(lat, lon, radius_m)
+        return self.df.iloc[positions].assign(Distance_m=distances)
+
+    def _top(self, positions, top_n, by):
+        scores = self.df[by].to_numpy(dtype=float)[positions]
+        return positions[top_n_positions(scores, top_n or None)]
+
+    def top_n_in_bbox(self, south, west, north, east, top_n=5, by='Vulnerability_Score'):
+        """The `top_n` rows with the highest `by` inside a bounding box."""
+        return self.df.iloc[self._top(self.bbox_positions(south, west, north, east), top_n, by)]
+
+    def top_n_within_radius(self, lat, lon, radius_m, top_n=5, by='Vulnerability_Score'):
+        """The `top_n` rows with the highest `by` within `radius_m` metres of (lat, lon), with a Distance_m column."""
+        positions, distances = self.radius_positions(lat, lon, radius_m)
+        selected = self._top(positions, top_n, by)
+        distance = pd.Series(distances, index=positions)
+        return self.df.iloc[selected].assign(Distance_m=distance.loc[selected].to_numpy())
+
+
+if __name__ == "__main__":
+    # Position estimation and area queries on a synthetic wardriving survey.
+    # Run as `python -m modules.geo`
+    import os
+    import time
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    n_aps, sightings_per_ap, survey_m = 20000, 50, 20000
+    center_lat, center_lon = -33.45, -70.66
+    ap_lat = center_lat + rng.uniform(-0.5, 0.5, n_aps) * survey_m / METRES_PER_DEGREE
+    ap_lon = center_lon + rng.uniform(-0.5, 0.5, n_aps) * survey_m / METRES_PER_DEGREE / math.cos(math.radians(center_lat))
+    bssids = np.array([f"02:00:{i >> 24 & 255:02X}:{i >> 16 & 255:02X}:{i >> 8 & 255:02X}:{i & 255:02X}" for i in range(n_aps)])
+
+    # Sightings within 150 m of each AP, power from a log-distance path loss model
+    owner = np.repeat(np.arange(n_aps), sightings_per_ap)
+    distance = rng.uniform(5, 150, len(owner))
+    bearing = rng.uniform(0, 2 * np.pi, len(owner))
+    lat = ap_lat[owner] + distance * np.cos(bearing) / METRES_PER_DEGREE
+    lon = ap_lon[owner] + distance * np.sin(bearing) / METRES_PER_DEGREE / np.cos(np.radians(ap_lat[owner]))
+    power = np.clip(-30 - 30 * np.log10(distance) + rng.normal(0, 4, len(owner)), -99, -1).round()
+    no_fix = rng.random(len(owner)) < 0.05
+    lat[no_fix], lon[no_fix] = 0, 0
+    log = pd.DataFrame({'LocalTime': '2023-11-18 00:11:35', 'GPSTime': '2023-11-18 03:11:35', 'ESSID': 'survey',
+                        'BSSID': bssids[owner], 'Power': power.astype(int), 'Security': 'WPA2',
+                        'Latitude': lat.round(6), 'Longitude': lon.round(6), 'Latitude Error': 3.0, 'Longitude Error': 3.0, 'Type': 'AP'})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'survey-01.log.csv')
+        log.to_csv(path, index=False)
+        start = time.perf_counter()
+        positions = estimate_positions(path)
+        elapsed = time.perf_counter() - start
+    truth = pd.DataFrame({'BSSID': bssids, 'lat': ap_lat, 'lon': ap_lon}).merge(positions, on='BSSID')
+    errors = haversine_m(truth['lat'], truth['lon'], truth['Latitude'], truth['Longitude'])
+    print(f"Estimated {len(positions)} positions from {len(log)} sightings in {elapsed:.2f}s "
+          f"({len(log) / elapsed:,.0f} sightings/s), median error {np.median(errors):.1f} m")
+
+    positions['Vulnerability_Score'] = rng.uniform(0, 30, len(positions))
+    start = time.perf_counter()
+    index = SpatialIndex(positions)
+    print(f"Indexed in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    queries = 1000
+    points = np.column_stack([center_lat + rng.uniform(-0.4, 0.4, queries) * survey_m / METRES_PER_DEGREE,
+                              center_lon + rng.uniform(-0.4, 0.4, queries) * survey_m / METRES_PER_DEGREE / math.cos(math.radians(center_lat))])
+    all_lat, all_lon = positions['Latitude'].to_numpy(), positions['Longitude'].to_numpy()
+    start = time.perf_counter()
+    brute = [np.flatnonzero(haversine_m(p_lat, p_lon, all_lat, all_lon) <= 500) for p_lat, p_lon in points]
+    brute_time = (time.perf_counter() - start) / queries
+    start = time.perf_counter()
+    indexed = [index.radius_positions(p_lat, p_lon, 500)[0] for p_lat, p_lon in points]
+    index_time = (time.perf_counter() - start) / queries
+    assert all(len(a) == len(b) for a, b in zip(brute, indexed))
+    print(f"500 m radius query: full scan {brute_time * 1000:.3f} ms, grid index {index_time * 1000:.3f} ms "
+          f"({np.mean([len(found) for found in indexed]):.1f} APs on average)")
+
+    half = 1000 / METRES_PER_DEGREE
+    start = time.perf_counter()
+    for p_lat, p_lon in points:
+        index.top_n_in_bbox(p_lat - half, p_lon - half, p_lat + half, p_lon + half, top_n=5)
+    print(f"Top 5 in a 2 km box: {(time.perf_counter() - start) / queries * 1000:.3f} ms per query")
@@ -0,0 +1,262 @@
+import numpy as np
+import pandas as pd
+
+from common import tracing
+from .merge import resolve_capture_paths
+from .parser import parse_airodump_csv
+
+NOT_ASSOCIATED = '(not associated)'
+
+
+class Adjacency:
+    """
+    Compressed sparse rows: the neighbours of node i are indices[indptr[i]:indptr[i + 1]].
+
+    Edges are deduplicated and grouped by source node with a stable sort of
+    the integer IDs, so neighbours keep the order in which they were first seen.
+    """
+
+    def __init__(self, sources, targets, n_sources, n_targets):
+        sources = np.asarray(sources, dtype='int64')
+        targets = np.asarray(targets, dtype='int64')
+        # Hash deduplication of the (source, target) pairs on one integer key
+        keys = pd.unique(sources * max(n_targets, 1) + targets)
+        sources, targets = np.divmod(keys, max(n_targets, 1))
+        order = np.argsort(sources, kind='stable')
+        self.indices = targets[order].astype('int32')
+        self.indptr = np.zeros(n_sources + 1, dtype='int64')
+        np.cumsum(np.bincount(sources, minlength=n_sources), out=self.indptr[1:])
+        self.n_targets = n_targets
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def n_edges(self):
+        return len(self.indices)
+
+    def neighbours(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    def sources(self):
+        """Source node of every edge, aligned with `indices`."""
+        return np.repeat(np.arange(len(self), dtype='int32'), self.degrees())
+
+    def transpose(self):
+        return Adjacency(self.indices, self.sources(), self.n_targets, len(self))
+
+
+class SurveyGraph:
+    """
+    Client/AP graph of one or more captures with compact integer IDs.
+
+    Stations, access points and probed ESSIDs are factorized once into
+    integer IDs (their position in `stations`, `aps` and `essids`). The
+    relations are Adjacency (CSR) arrays in both directions:
+
+    - station_aps / ap_stations: associations seen in the client section
+    - essid_stations / station_essids: inverted index of the Probed ESSIDs
+    - station_captures: in which captures each station was seen
+
+    Building is a hash factorization plus a sort of the integer edge lists,
+    and every query is a slice of an array.
+    """
+
+    def __init__(self, ap_df, clients_df, captures=None):
+        """
+        :param ap_df: Access points DataFrame (BSSID column).
+        :param clients_df: Clients DataFrame (Station MAC, BSSID, Probed ESSIDs), one row per station and capture.
+        :param captures: Optional capture ID per clients_df row (e.g. the position of its file). Default: one capture.
+        """
+        with tracing.span("graph.build", stations=len(clients_df)):
+            station_ids, stations = pd.factorize(clients_df['Station MAC'].to_numpy())
+            self.stations = pd.Index(stations)
+            associated = clients_df['BSSID'].to_numpy()
+            is_associated = associated != NOT_ASSOCIATED
+            # APs that only appear as the BSSID of a client still get an ID
+            self.aps = pd.Index(pd.unique(np.concatenate([ap_df['BSSID'].to_numpy(), associated[is_associated]])))
+            self._ap_ids = pd.Series(np.arange(len(self.aps), dtype='int32'), index=self.aps)
+            self._station_ids = pd.Series(np.arange(len(self.stations), dtype='int32'), index=self.stations)
+
+            self.station_aps = Adjacency(station_ids[is_associated], self.aps.get_indexer(associated[is_associated]),
+                                         len(self.stations), len(self.aps))
+            self.ap_stations = self.station_aps.transpose()
+
+            # One split of all the probe lists joined together instead of one list per station
+            probed = clients_df['Probed ESSIDs'].fillna('').to_numpy(dtype=object)
+            probing = np.flatnonzero(probed != '')
+            essid_values = np.array([essid.strip() for essid in ','.join(probed[probing]).split(',')] if len(probing) else [], dtype=object)
+            probe_stations = np.repeat(station_ids[probing], pd.Series(probed[probing], dtype=object).str.count(',').to_numpy(dtype='int64') + 1)
+            kept = essid_values != ''
+            essid_ids, essids = pd.factorize(essid_values[kept])
+            self.essids = pd.Index(essids)
+            self._essid_ids = pd.Series(np.arange(len(self.essids), dtype='int32'), index=self.essids)
+            self.station_essids = Adjacency(probe_stations[kept], essid_ids, len(self.stations), len(self.essids))
+            self.essid_stations = self.station_essids.transpose()
+
+            captures = np.zeros(len(clients_df), dtype='int64') if captures is None else np.asarray(captures, dtype='int64')
+            self.n_captures = int(captures.max()) + 1 if len(captures) else 0
+            self.station_captures = Adjacency(station_ids, captures, len(self.stations), self.n_captures)
+
+    @classmethod
+    def from_captures(cls, pattern):
+        """
+        Graph of every capture of a directory or glob pattern, keeping track of
+        which captures saw each station.
+
+        :param pattern: Directory or glob pattern of airodump-ng CSV files.
+        :return: A SurveyGraph whose capture IDs are positions in `paths`.
+        """
+        paths = resolve_capture_paths(pattern)
+        ap_frames, client_frames = zip(*(parse_airodump_csv(path) for path in paths))
+        captures = np.repeat(np.arange(len(paths)), [len(frame) for frame in client_frames])
+        graph = cls(pd.concat(ap_frames, ignore_index=True), pd.concat(client_frames, ignore_index=True), captures)
+        graph.paths = paths
+        return graph
+
+    def __repr__(self):
+        return (f"SurveyGraph({len(self.stations)} stations, {len(self.aps)} APs, {len(self.essids)} ESSIDs, "
+                f"{self.station_aps.n_edges} associations, {self.station_essids.n_edges} probes, {self.n_captures} captures)")
+
+    def station_id(self, mac):
+        return self._station_ids.get(mac)
+
+    def ap_id(self, bssid):
+        return self._ap_ids.get(bssid)
+
+    def essid_id(self, essid):
+        return self._essid_ids.get(essid)
+
+    def clients_probing(self, essid):
+        """Station MACs that probed for `essid`."""
+        essid_id = self.essid_id(essid)
+        if essid_id is None:
+            return np.array([], dtype=object)
+        return self.stations[self.essid_stations.neighbours(essid_id)].to_numpy()
+
+    def probed_essids(self, mac):
+        """ESSIDs probed by a station."""
+        station_id = self.station_id(mac)
+        if station_id is None:
+            return np.array([], dtype=object)
+        return self.essids[self.station_essids.neighbours(station_id)].to_numpy()
+
+    def aps_of(self, mac):
+        """BSSIDs a station was associated with (several when it roamed between captures)."""
+        station_id = self.station_id(mac)
+        if station_id is None:
+            return np.array([], dtype=object)
+        return self.aps[self.station_aps.neighbours(station_id)].to_numpy()
+
+    def clients_of(self, bssid):
+        """Station MACs associated with an access point."""
+        ap_id = self.ap_id(bssid)
+        if ap_id is None:
+            return np.array([], dtype=object)
+        return self.stations[self.ap_stations.neighbours(ap_id)].to_numpy()
+
+    def client_counts(self):
+        """Number of distinct associated stations per BSSID, as a Series."""
+        return pd.Series(self.ap_stations.degrees(), index=self.aps, name='Client_Count')
+
+    def aps_sharing_clients(self, bssid):
+        """
+        Access points that share at least one client with `bssid`.
+
+        :return: A Series BSSID -> number of shared clients, most shared first.
+        """
+        ap_id = self.ap_id(bssid)
+        if ap_id is None:
+            return pd.Series(dtype='int64', name='Shared_Clients')
+        stations = self.ap_stations.neighbours(ap_id)
+        starts, ends = self.station_aps.indptr[stations], self.station_aps.indptr[stations + 1]
+        others = np.concatenate([self.station_aps.indices[start:end] for start, end in zip(starts, ends)]) if len(stations) else np.array([], dtype='int32')
+        counts = np.bincount(others[others != ap_id], minlength=len(self.aps))
+        found = np.flatnonzero(counts)
+        order = np.argsort(-counts[found], kind='stable')
+        return pd.Series(counts[found][order], index=self.aps[found[order]], name='Shared_Clients')
+
+    def shared_client_pairs(self, min_shared=1):
+        """
+        Every pair of access points with clients in common.
+
+        Pairs are generated per station from its own APs, so the cost depends
+        on how many stations roam between APs, not on the number of APs squared.
+
+        :return: A DataFrame BSSID_A, BSSID_B, Shared_Clients, most shared first.
+        """
+        degrees = self.station_aps.degrees()
+        roaming = np.flatnonzero(degrees >= 2)
+        pairs = []
+        for station in roaming:
+            aps = np.sort(self.station_aps.neighbours(station)).astype('int64')
+            first, second = np.triu_indices(len(aps), k=1)
+            pairs.append(aps[first] * len(self.aps) + aps[second])
+        if not pairs:
+            return pd.DataFrame({'BSSID_A': [], 'BSSID_B': [], 'Shared_Clients': np.array([], dtype='int64')})
+        keys, counts = np.unique(np.concatenate(pairs), return_counts=True)
+        keep = counts >= min_shared
+        keys, counts = keys[keep], counts[keep]
+        order = np.argsort(-counts, kind='stable')
+        first, second = np.divmod(keys[order], len(self.aps))
+        return pd.DataFrame({'BSSID_A': self.aps[first], 'BSSID_B': self.aps[second], 'Shared_Clients': counts[order]})
+
+    def stations_in_captures(self, min_captures=2):
+        """
+        Stations seen in at least `min_captures` captures.
+
+        :return: A DataFrame Station MAC, Captures (number of captures), most seen first.
+        """
+        degrees = self.station_captures.degrees()
+        found = np.flatnonzero(degrees >= min_captures)
+        order = np.argsort(-degrees[found], kind='stable')
+        return pd.DataFrame({'Station MAC': self.stations[found[order]], 'Captures': degrees[found[order]]})
+
+
+if __name__ == "__main__":
+    # Build time and query latency on a synthetic survey.
+    # Run as `python -m modules.graph`
+    import time
+
+    rng = np.random.default_rng(0)
+    n_aps, n_stations = 50000, 500000
+    bssids = np.array([f"02:AA:{i >> 16 & 255:02X}:{i >> 8 & 255:02X}:{i & 255:02X}:01" for i in range(n_aps)])
+    macs = np.array([f"06:{i >> 24 & 255:02X}:{i >> 16 & 255:02X}:{i >> 8 & 255:02X}:{i & 255:02X}:02" for i in range(n_stations)])
+    essid_pool = np.array([f"net-{i}" for i in range(20000)])
+    associated = np.where(rng.random(n_stations) < 0.6, bssids[rng.integers(0, n_aps, n_stations)], NOT_ASSOCIATED)
+    probes = [','.join(essid_pool[rng.integers(0, len(essid_pool), k)]) for k in rng.choice([0, 0, 1, 2, 3], n_stations)]
+    ap_df = pd.DataFrame({'BSSID': bssids})
+    clients_df = pd.DataFrame({'Station MAC': macs, 'BSSID': associated, 'Probed ESSIDs': probes})
+    # A second capture where a tenth of the stations show up again, some on another AP
+    again = rng.choice(n_stations, n_stations // 10, replace=False)
+    second = clients_df.iloc[again].assign(BSSID=bssids[rng.integers(0, n_aps, len(again))])
+    captures = np.repeat([0, 1], [len(clients_df), len(second)])
+
+    start = time.perf_counter()
+    graph = SurveyGraph(ap_df, pd.concat([clients_df, second], ignore_index=True), captures)
+    print(f"{graph} built in {time.perf_counter() - start:.2f}s")
+
+    queries = 10000
+    targets = essid_pool[rng.integers(0, len(essid_pool), queries)]
+    start = time.perf_counter()
+    for essid in targets:
+        graph.clients_probing(essid)
+    indexed = (time.perf_counter() - start) / queries
+    start = time.perf_counter()
+    for essid in targets[:20]:
+        clients_df.loc[clients_df['Probed ESSIDs'].str.split(',').map(lambda values: essid in values), 'Station MAC']
+    scan = (time.perf_counter() - start) / 20
+    print(f"Clients probing an ESSID: inverted index {indexed * 1e6:.1f} us, string scan {scan * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    for bssid in bssids[rng.integers(0, n_aps, 1000)]:
+        graph.aps_sharing_clients(bssid)
+    print(f"APs sharing clients with an AP: {(time.perf_counter() - start) / 1000 * 1e6:.1f} us")
+    start = time.perf_counter()
+    pairs = graph.shared_client_pairs()
+    roaming = graph.stations_in_captures(2)
+    print(f"{len(pairs)} AP pairs with shared clients, {len(roaming)} stations in both captures, "
+          f"in {time.perf_counter() - start:.2f}s")
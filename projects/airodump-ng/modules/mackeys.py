@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+NOT_ASSOCIATED = '(not associated)'
+# Key of '(not associated)', empty and malformed MACs: above any 48-bit MAC, so it sorts last
+NO_KEY = np.uint64(np.iinfo(np.uint64).max)
+# MAC column -> integer key column added at ingestion
+KEY_COLUMNS = {'BSSID': 'BSSID_key', 'Station MAC': 'Station_key'}
+
+_HEX_VALUES = np.full(256, 255, dtype=np.uint8)
+for _i, _digit in enumerate(b'0123456789abcdef'):
+    _HEX_VALUES[_digit] = _i
+    _HEX_VALUES[ord(chr(_digit).upper())] = _i
+_NIBBLE_WEIGHTS = np.array([1 << (4 * (11 - i)) for i in range(12)], dtype=np.uint64)
+_HEX_DIGITS = np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)
+
+
+def _parse_hex(digits):
+    """(n, 12) array of ASCII hex digits -> (uint64 values, valid mask)."""
+    nibbles = _HEX_VALUES[digits]
+    valid = (nibbles != 255).all(axis=1)
+    nibbles[~valid] = 0
+    return nibbles.astype(np.uint64) @ _NIBBLE_WEIGHTS, valid
+
+
+def mac_keys(macs):
+    """
+    Parse MAC addresses into 48-bit integer keys, vectorized.
+
+    airodump-ng writes 'AA:BB:CC:DD:EE:FF', parsed straight from a fixed-width
+    byte array; other notations ('-' or '.' separators, no separators,
+    surrounding blanks, lowercase) go through pandas string methods.
+
+    :param macs: Iterable, array or Series of MAC strings.
+    :return: A uint64 array. '(not associated)', empty and malformed values are NO_KEY.
+    """
+    text = pd.Series(macs, dtype=object).fillna('').to_numpy()
+    keys = np.full(len(text), NO_KEY, dtype=np.uint64)
+    if not len(text):
+        return keys
+    try:
+        raw = np.array(text, dtype='S18')
+    except (UnicodeEncodeError, ValueError):
+        raw = np.array([str(mac).encode('ascii', errors='replace') for mac in text], dtype='S18')
+    raw = np.frombuffer(raw.tobytes(), dtype=np.uint8).reshape(-1, 18)
+    separators = raw[:, [2, 5, 8, 11, 14]]
+    fast = (raw[:, 17] == 0) & (raw[:, 16] != 0) & ((separators == ord(':')) | (separators == ord('-'))).all(axis=1)
+    values, valid = _parse_hex(raw[fast][:, [0, 1, 3, 4, 6, 7, 9, 10, 12, 13, 15, 16]])
+    keys[np.flatnonzero(fast)[valid]] = values[valid]
+
+    slow = np.flatnonzero(~fast & (text != NOT_ASSOCIATED) & (text != ''))
+    if len(slow):
+        digits = pd.Series(text[slow], dtype=object).astype(str).str.strip().str.replace(r'[:\-.]', '', regex=True)
+        length_ok = (digits.str.len() == 12).to_numpy()
+        digits = np.frombuffer(digits.where(length_ok, '').str.encode('ascii', errors='replace').to_numpy().astype('S12').tobytes(),
+                               dtype=np.uint8).reshape(-1, 12)
+        values, valid = _parse_hex(digits)
+        valid &= length_ok
+        keys[slow[valid]] = values[valid]
+    return keys
+
+
+def key_macs(keys):
+    """
+    Format integer keys back into 'AA:BB:CC:DD:EE:FF' strings, for output only.
+
+    :return: An object array. NO_KEY becomes None.
+    """
+    keys = np.asarray(keys, dtype=np.uint64)
+    shifts = np.arange(44, -1, -4, dtype=np.uint64)
+    nibbles = ((keys[:, None] >> shifts) & np.uint64(15)).astype(np.uint8)
+    chars = np.full((len(keys), 17), ord(':'), dtype=np.uint8)
+    chars[:, [0, 1, 3, 4, 6, 7, 9, 10, 12, 13, 15, 16]] = _HEX_DIGITS[nibbles]
+    macs = chars.view('S17').ravel().astype(str).astype(object)
+    macs[keys == NO_KEY] = None
+    return macs
+
+
+def add_mac_keys(df):
+    """Add the integer key column of every MAC column of `df` (see KEY_COLUMNS), in place."""
+    for col, key_col in KEY_COLUMNS.items():
+        if col in df.columns:
+            df[key_col] = mac_keys(df[col].to_numpy())
+    return df
+
+
+def without_keys(df):
+    """`df` without the integer key columns, for output."""
+    return df.drop(columns=[col for col in KEY_COLUMNS.values() if col in df.columns])
+
+
+def frame_keys(df, col):
+    """Integer keys of a MAC column: the ingestion key column when present, parsed otherwise."""
+    key_col = KEY_COLUMNS[col]
+    return df[key_col].to_numpy(dtype=np.uint64) if key_col in df.columns else mac_keys(df[col].to_numpy())
+
+
+def isin_keys(keys, other):
+    """
+    Boolean mask of the `keys` present in `other` (sort-merge on integers, NO_KEY never matches).
+
+    :param keys: uint64 array.
+    :param other: uint64 array.
+    """
+    other = np.unique(other[other != NO_KEY])
+    if not len(other):
+        return np.zeros(len(keys), dtype=bool)
+    positions = np.minimum(np.searchsorted(other, keys), len(other) - 1)
+    return other[positions] == keys
+
+
+def count_keys(keys, occurrences):
+    """
+    Number of times each of `keys` appears in `occurrences` (sort-merge on integers).
+
+    Used to count the clients associated with each access point without
+    hashing BSSID strings. NO_KEY occurrences ('(not associated)') are ignored.
+
+    :param keys: uint64 array, e.g. the access point keys.
+    :param occurrences: uint64 array, e.g. the BSSID keys of the clients.
+    :return: An int64 array aligned with `keys`.
+    """
+    unique, counts = np.unique(occurrences[occurrences != NO_KEY], return_counts=True)
+    if not len(unique):
+        return np.zeros(len(keys), dtype='int64')
+    positions = np.minimum(np.searchsorted(unique, keys), len(unique) - 1)
+    return np.where(unique[positions] == keys, counts[positions], 0).astype('int64')
+
+
+if __name__ == "__main__":
+    # Client counting and AP/client matching on integer keys vs BSSID strings.
+    # Run as `python -m modules.mackeys`
+    import time
+
+    rng = np.random.default_rng(0)
+    n_aps, n_clients = 200000, 2000000
+    ap_keys = rng.choice(1 << 47, n_aps, replace=False).astype(np.uint64) << np.uint64(1)
+    bssids = pd.Series(key_macs(ap_keys))
+    associated = rng.random(n_clients) < 0.6
+    client_bssids = pd.Series(np.where(associated, bssids.to_numpy()[rng.integers(0, n_aps, n_clients)], NOT_ASSOCIATED))
+    assert (mac_keys(bssids) == ap_keys).all()
+
+    start = time.perf_counter()
+    client_keys = mac_keys(client_bssids.to_numpy())
+    parse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    counts = client_bssids[client_bssids != NOT_ASSOCIATED].value_counts()
+    expected = bssids.map(counts).fillna(0).astype('int64').to_numpy()
+    common = set(bssids).intersection(set(client_bssids[client_bssids != NOT_ASSOCIATED]))
+    expected_ap, expected_clients = bssids.isin(common).to_numpy(), client_bssids.isin(common).to_numpy()
+    strings = time.perf_counter() - start
+
+    start = time.perf_counter()
+    counted = count_keys(ap_keys, client_keys)
+    matched_ap, matched_clients = isin_keys(ap_keys, client_keys), isin_keys(client_keys, ap_keys)
+    integers = time.perf_counter() - start
+
+    assert (counted == expected).all() and (matched_ap == expected_ap).all() and (matched_clients == expected_clients).all()
+    print(f"{n_aps} APs, {n_clients} clients: parsing the client BSSIDs once {parse:.2f}s, "
+          f"counting + matching on strings {strings:.2f}s, on integer keys {integers:.2f}s")
@@ -0,0 +1,149 @@
+import os
+import glob
+import pandas as pd
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from .parser import parse_airodump_csv, AP_COLUMNS, CLIENT_COLUMNS
+from .mackeys import KEY_COLUMNS
+
+# Companion files written next to every capture that are not in the airodump-ng CSV format
+IGNORED_SUFFIXES = ('.kismet.csv', '.log.csv')
+
+AP_AGGREGATIONS = {
+    'First time seen': 'min',
+    'Last time seen': 'max',
+    'Power': 'max',
+    '# beacons': 'sum',
+    '# IV': 'sum',
+}
+CLIENT_AGGREGATIONS = {
+    'First time seen': 'min',
+    'Last time seen': 'max',
+    'Power': 'max',
+    '# packets': 'sum',
+}
+
+
+def resolve_capture_paths(pattern):
+    """
+    Expand a directory or a glob pattern into the list of airodump-ng CSV files.
+
+    :param pattern: Directory (every *.csv inside it is used) or glob pattern.
+    :return: A sorted list of paths.
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.csv')
+    paths = [path for path in glob.glob(pattern, recursive=True) if not path.endswith(IGNORED_SUFFIXES)]
+    if not paths:
+        raise ValueError(f"No capture files found for '{pattern}'.")
+    return sorted(paths)
+
+
+def _union_probes(values):
+    probes = dict.fromkeys(essid for value in values for essid in value.split(',') if essid)
+    return ','.join(probes)
+
+
+def _merge_frames(frames, key, columns, aggregations):
+    """
+    Collapse the rows of several captures into one row per `key`.
+
+    Timestamps take the min/max, counters are summed, Power keeps the best
+    (highest) reading ignoring airodump-ng's -1 placeholder, and every other
+    column takes the value of the most recent sighting. The MAC key columns
+    are carried along, so the merged rows are not parsed again.
+    """
+    df = pd.concat(frames, ignore_index=True).sort_values('Last time seen', kind='stable')
+    columns = columns + [KEY_COLUMNS[col] for col in columns if col in KEY_COLUMNS and KEY_COLUMNS[col] in df.columns]
+    df['Power'] = df['Power'].where(df['Power'] != -1)
+
+    agg = {col: 'last' for col in columns if col != key}
+    agg.update(aggregations)
+    if 'Probed ESSIDs' in agg:
+        agg['Probed ESSIDs'] = _union_probes
+
+    merged = df.groupby(key, sort=False, as_index=False).agg(agg)
+    merged['Power'] = merged['Power'].fillna(-1).astype('int64')
+    return merged[columns]
+
+
+class CaptureMerger:
+    """
+    Running merge of the access points and clients of many captures.
+
+    Parsed captures are buffered and folded into the accumulated tables every
+    `batch_size` files, so memory is bounded by the number of distinct BSSIDs
+    and stations plus one batch, not by the total number of rows on disk.
+    """
+
+    def __init__(self, batch_size=16):
+        self.batch_size = batch_size
+        self.ap_df = None
+        self.clients_df = None
+        self._pending = []
+
+    def add(self, ap_df, clients_df):
+        self._pending.append((ap_df, clients_df))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        ap_frames = [ap_df for ap_df, _ in self._pending]
+        client_frames = [clients_df for _, clients_df in self._pending]
+        if self.ap_df is not None:
+            ap_frames.insert(0, self.ap_df)
+            client_frames.insert(0, self.clients_df)
+        self._pending = []
+
+        self.ap_df = _merge_frames(ap_frames, 'BSSID', AP_COLUMNS, AP_AGGREGATIONS)
+        self.clients_df = _merge_frames(client_frames, 'Station MAC', CLIENT_COLUMNS, CLIENT_AGGREGATIONS)
+
+    def result(self):
+        self.flush()
+        if self.ap_df is None:
+            raise ValueError("No captures were merged.")
+        return self.ap_df, self.clients_df
+
+
+def merge_captures(pattern, max_workers=None, batch_size=16):
+    """
+    Parse many airodump-ng captures in parallel and merge them by BSSID/Station MAC.
+
+    Parameters
+    ----------
+    pattern : str
+        Directory or glob pattern of the captures.
+    max_workers : int or None
+        Number of worker processes. Defaults to the number of CPUs.
+    batch_size : int
+        Number of parsed captures folded into the merged tables at once.
+
+    Returns
+    -------
+    tuple of DataFrame
+        The merged access points and clients DataFrames.
+    """
+    paths = resolve_capture_paths(pattern)
+    merger = CaptureMerger(batch_size=batch_size)
+
+    if len(paths) == 1 or max_workers == 1:
+        for path in paths:
+            merger.add(*parse_airodump_csv(path))
+        return merger.result()
+
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Keep a bounded window of captures in flight so parsed frames never pile up
+        window = 2 * max_workers
+        pending_paths = iter(paths)
+        in_flight = {executor.submit(parse_airodump_csv, path) for path in islice(pending_paths, window)}
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                merger.add(*future.result())
+                in_flight.update(executor.submit(parse_airodump_csv, path) for path in islice(pending_paths, 1))
+
+    return merger.result()
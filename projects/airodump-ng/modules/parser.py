@@ -0,0 +1,192 @@
+import os
+import time
+import resource
+import pandas as pd
+
+from .mackeys import add_mac_keys
+
+AP_HEADER = 'BSSID, First time seen, Last time seen, channel, Speed, Privacy, Cipher, Authentication, Power, # beacons, # IV, LAN IP, ID-length, ESSID, Key'
+CLIENT_HEADER = 'Station MAC, First time seen, Last time seen, Power, # packets, BSSID, Probed ESSIDs'
+
+AP_COLUMNS = [col.strip() for col in AP_HEADER.split(',')]
+CLIENT_COLUMNS = [col.strip() for col in CLIENT_HEADER.split(',')]
+
+# Integer columns and the value used when airodump-ng leaves them empty
+AP_INT_COLUMNS = {'channel': -1, 'Speed': -1, 'Power': -1, '# beacons': 0, '# IV': 0, 'ID-length': 0}
+CLIENT_INT_COLUMNS = {'Power': -1, '# packets': 0}
+DATETIME_COLUMNS = ['First time seen', 'Last time seen']
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Kept as written by airodump-ng: an AP without key has ' ', which score_essid_key does not count as empty
+UNSTRIPPED_COLUMNS = ['Key']
+# Key of an AP without key as airodump-ng writes it, used by the other backends too
+NO_KEY = ' '
+
+
+def split_ap_line(line):
+    """
+    Split a raw access point line into its 15 fields.
+
+    ESSIDs may contain commas (e.g. 'movistar2,4GHZ_45B630'), so every field
+    between ID-length and Key is joined back into the ESSID.
+    """
+    fields = line.split(',')
+    if len(fields) < len(AP_COLUMNS):
+        return None
+    return fields[:13] + [','.join(fields[13:-1]), fields[-1]]
+
+
+def split_client_line(line):
+    """Split a raw client line into its 7 fields, keeping every probed ESSID."""
+    fields = line.split(',')
+    if len(fields) < len(CLIENT_COLUMNS):
+        return None
+    return fields[:6] + [','.join(fields[6:])]
+
+
+def rows_to_frame(rows, columns, int_columns):
+    """
+    Build a typed DataFrame from raw split rows.
+
+    Whitespace is stripped column by column with vectorized string ops (except
+    UNSTRIPPED_COLUMNS), the timestamps are parsed once and the numeric
+    columns are cast to int64.
+    The MAC columns get their integer key column (see mackeys.KEY_COLUMNS).
+    """
+    df = pd.DataFrame(rows, columns=columns)
+    for col in columns:
+        if col not in UNSTRIPPED_COLUMNS:
+            df[col] = df[col].str.strip()
+
+    for col in DATETIME_COLUMNS:
+        df[col] = pd.to_datetime(df[col], format=DATETIME_FORMAT, errors='coerce')
+
+    for col, default in int_columns.items():
+        # Speed may carry QoS/short preamble suffixes such as '54e.'
+        values = df[col].str.extract(r'(-?\d+)', expand=False)
+        df[col] = pd.to_numeric(values, errors='coerce').fillna(default).astype('int64')
+
+    if 'LAN IP' in df.columns:
+        df['LAN IP'] = df['LAN IP'].str.replace(' ', '', regex=False)
+
+    return add_mac_keys(df)
+
+
+def iter_section_lines(csv_path):
+    """
+    Stream the non-empty data lines of an airodump-ng CSV with their section.
+
+    Yields ('ap', line) or ('clients', line) tuples. When the client header is
+    reached a (None, header) marker is yielded first, so callers can tell a
+    complete file from one that is being rewritten by airodump-ng.
+    """
+    current = None
+    with open(csv_path, 'r', encoding='utf-8', errors='replace') as file:
+        for line in file:
+            line = line.rstrip('\r\n')
+            if not line.strip():
+                continue
+            if line.startswith('BSSID,'):
+                current = 'ap'
+                continue
+            if line.startswith('Station MAC,'):
+                current = 'clients'
+                yield None, line
+                continue
+            if current is not None:
+                yield current, line
+
+
+def parse_airodump_csv(csv_path, chunksize=100000):
+    """
+    Parse an airodump-ng CSV in a single streaming pass.
+
+    The file is read line by line; the section boundary is detected on the fly
+    and each line is routed to the access point or client section. Rows are
+    buffered and converted to typed DataFrames every `chunksize` rows so peak
+    memory does not grow with the raw text of the whole file.
+
+    Parameters
+    ----------
+    csv_path : str
+        Path to the airodump-ng CSV file.
+    chunksize : int
+        Number of raw rows buffered before they are converted to a DataFrame.
+
+    Returns
+    -------
+    tuple of DataFrame
+        The access points and clients DataFrames.
+    """
+    sections = {
+        'ap': {'rows': [], 'chunks': [], 'split': split_ap_line, 'columns': AP_COLUMNS, 'ints': AP_INT_COLUMNS},
+        'clients': {'rows': [], 'chunks': [], 'split': split_client_line, 'columns': CLIENT_COLUMNS, 'ints': CLIENT_INT_COLUMNS},
+    }
+    found_clients = False
+
+    for section_name, line in iter_section_lines(csv_path):
+        if section_name is None:
+            found_clients = True
+            continue
+        section = sections[section_name]
+        fields = section['split'](line)
+        if fields is None:
+            continue
+        section['rows'].append(fields)
+        if len(section['rows']) >= chunksize:
+            section['chunks'].append(rows_to_frame(section['rows'], section['columns'], section['ints']))
+            section['rows'] = []
+
+    if not found_clients:
+        raise ValueError("Section for the clients dataframe not found.")
+
+    frames = []
+    for section in sections.values():
+        if section['rows'] or not section['chunks']:
+            section['chunks'].append(rows_to_frame(section['rows'], section['columns'], section['ints']))
+        frames.append(pd.concat(section['chunks'], ignore_index=True) if len(section['chunks']) > 1 else section['chunks'][0])
+
+    return frames[0], frames[1]
+
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark_parser(paths, repeat=3):
+    """
+    Time `parse_airodump_csv` on each path.
+
+    :param paths: Iterable of airodump-ng CSV paths.
+    :param repeat: Number of runs per file, the best one is reported.
+    :return: A list of dictionaries with the throughput and peak RSS per file.
+    """
+    results = []
+    for path in paths:
+        size = os.path.getsize(path)
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ap_df, clients_df = parse_airodump_csv(path)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results.append({
+            'path': path,
+            'bytes': size,
+            'access_points': len(ap_df),
+            'clients': len(clients_df),
+            'seconds': best,
+            'bytes_per_sec': size / best if best else float('inf'),
+            'peak_rss_mb': peak_rss_mb(),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    # Throughput and peak RSS on the sample captures. Run as `python -m modules.parser`
+    import glob
+
+    paths = sorted(glob.glob('./data/**/*.csv', recursive=True))
+    for result in benchmark_parser(paths):
+        print(f"{result['path']}: {result['access_points']} APs, {result['clients']} clients, "
+              f"{result['bytes_per_sec'] / 1e6:.2f} MB/s, peak RSS {result['peak_rss_mb']:.1f} MB")
@@ -0,0 +1,262 @@
+import os
+import mmap
+import time
+import struct
+from collections import Counter, defaultdict
+
+PCAP_MAGIC = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e-6),
+    b'\xa1\xb2\xc3\xd4': ('>', 1e-6),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e-9),
+    b'\xa1\xb2\x3c\x4d': ('>', 1e-9),
+}
+
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_PRISM = 119
+LINKTYPE_RADIOTAP = 127
+
+FRAME_MANAGEMENT = 0
+FRAME_DATA = 2
+SUBTYPE_PROBE_REQUEST = 4
+SUBTYPE_PROBE_RESPONSE = 5
+SUBTYPE_BEACON = 8
+
+EAPOL_SNAP = b'\xaa\xaa\x03\x00\x00\x00\x88\x8e'
+EAPOL_KEY = 3
+KEY_INFO_PAIRWISE = 0x0008
+KEY_INFO_INSTALL = 0x0040
+KEY_INFO_ACK = 0x0080
+KEY_INFO_MIC = 0x0100
+
+# Message pairs from which the PSK can be cracked (ANonce + SNonce/MIC)
+CRACKABLE_PAIRS = [{1, 2}, {2, 3}, {3, 4}]
+
+
+def format_mac(raw):
+    return ':'.join(f'{byte:02X}' for byte in raw)
+
+
+class PcapReader:
+    """
+    Memory-mapped reader for classic libpcap files with 802.11 link types.
+
+    Records are returned as memoryview slices of the mapping, so no frame is
+    copied unless the caller asks for it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.size = len(self._mmap)
+
+        magic = self._mmap[:4]
+        if magic not in PCAP_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a pcap file (pcapng is not supported).")
+        self._endian, self._ts_resolution = PCAP_MAGIC[magic]
+        self._record_header = struct.Struct(self._endian + 'IIII')
+        self.linktype = struct.unpack_from(self._endian + 'I', self._mmap, 20)[0] & 0xFFFF
+        if self.linktype not in (LINKTYPE_IEEE802_11, LINKTYPE_PRISM, LINKTYPE_RADIOTAP):
+            self.close()
+            raise ValueError(f"Unsupported pcap link type {self.linktype}, an 802.11 capture is required.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def _header_length(self, view):
+        if self.linktype == LINKTYPE_RADIOTAP:
+            return struct.unpack_from('<H', view, 2)[0] if len(view) >= 4 else len(view)
+        if self.linktype == LINKTYPE_PRISM:
+            return struct.unpack_from('<I', view, 4)[0] if len(view) >= 8 else len(view)
+        return 0
+
+    def frames(self):
+        """
+        Iterate over the 802.11 frames of the capture.
+
+        :return: A generator of (timestamp, memoryview) tuples, the view starts at the 802.11 header.
+        """
+        view = memoryview(self._mmap)
+        unpack_record = self._record_header.unpack_from
+        offset = 24
+        end = self.size
+        try:
+            while offset + 16 <= end:
+                ts_sec, ts_frac, captured, _ = unpack_record(view, offset)
+                offset += 16
+                if offset + captured > end:
+                    break  # truncated last record, airodump-ng was still writing
+                frame = view[offset:offset + captured]
+                offset += captured
+                header_length = self._header_length(frame)
+                yield ts_sec + ts_frac * self._ts_resolution, frame[header_length:]
+        finally:
+            view.release()
+
+
+def _ssid(frame, offset):
+    """Return the SSID information element found at `offset`, or None."""
+    if len(frame) >= offset + 2 and frame[offset] == 0:
+        length = frame[offset + 1]
+        return bytes(frame[offset + 2:offset + 2 + length]).decode('utf-8', errors='replace')
+    return None
+
+
+def eapol_message(key_info, key_data_length):
+    """Number (1-4) of a 4-way handshake message from its Key Information field."""
+    if not key_info & KEY_INFO_PAIRWISE:
+        return None  # group key handshake
+    if key_info & KEY_INFO_ACK:
+        return 3 if key_info & KEY_INFO_MIC and key_info & KEY_INFO_INSTALL else 1
+    if key_info & KEY_INFO_MIC:
+        # M2 carries the station RSN IE, M4 has no key data
+        return 2 if key_data_length else 4
+    return None
+
+
+class HandshakeIndex:
+    """
+    Per-BSSID index of beacons, probes and EAPOL 4-way handshake messages.
+
+    MAC addresses are kept as raw 6-byte keys while indexing and are only
+    formatted as strings when the results are exported.
+    """
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+        self.beacons = Counter()  # BSSID -> beacon count
+        self.ssids = {}  # BSSID -> SSID announced in beacons/probe responses
+        self.probe_responses = Counter()  # BSSID -> probe response count
+        self.probe_requests = defaultdict(set)  # station -> probed SSIDs
+        self.eapol = defaultdict(set)  # (BSSID, station) -> handshake message numbers
+
+    def add_frame(self, frame):
+        self.frames += 1
+        self.bytes += len(frame)
+        if len(frame) < 24:
+            return
+
+        fc, flags = frame[0], frame[1]
+        frame_type = (fc >> 2) & 0x3
+        subtype = fc >> 4
+
+        if frame_type == FRAME_MANAGEMENT:
+            if subtype == SUBTYPE_BEACON or subtype == SUBTYPE_PROBE_RESPONSE:
+                bssid = bytes(frame[16:22])
+                if subtype == SUBTYPE_BEACON:
+                    self.beacons[bssid] += 1
+                else:
+                    self.probe_responses[bssid] += 1
+                if bssid not in self.ssids:
+                    # 24 byte header + timestamp (8) + interval (2) + capabilities (2)
+                    ssid = _ssid(frame, 36)
+                    if ssid:
+                        self.ssids[bssid] = ssid
+            elif subtype == SUBTYPE_PROBE_REQUEST:
+                ssid = _ssid(frame, 24)
+                if ssid:
+                    self.probe_requests[bytes(frame[10:16])].add(ssid)
+
+        elif frame_type == FRAME_DATA and not flags & 0x40:
+            self._add_data_frame(frame, subtype, flags)
+
+    def _add_data_frame(self, frame, subtype, flags):
+        to_ds, from_ds = flags & 0x1, flags & 0x2
+        if to_ds and from_ds:
+            return  # WDS bridge, not a client/AP exchange
+
+        header_length = 24
+        if subtype & 0x8:  # QoS data
+            header_length += 2
+            if flags & 0x80:  # HT control field
+                header_length += 4
+
+        if frame[header_length:header_length + 8] != EAPOL_SNAP:
+            return
+        eapol = header_length + 8
+        if len(frame) < eapol + 99 or frame[eapol + 1] != EAPOL_KEY:
+            return
+
+        key_info = struct.unpack_from('>H', frame, eapol + 5)[0]
+        key_data_length = struct.unpack_from('>H', frame, eapol + 97)[0]
+        message = eapol_message(key_info, key_data_length)
+        if message is None:
+            return
+
+        if to_ds:
+            bssid, station = frame[4:10], frame[10:16]
+        elif from_ds:
+            bssid, station = frame[10:16], frame[4:10]
+        else:
+            bssid, station = frame[16:22], (frame[10:16] if message in (2, 4) else frame[4:10])
+        self.eapol[(bytes(bssid), bytes(station))].add(message)
+
+    def handshake_bssids(self):
+        """BSSIDs (formatted) for which at least one station completed a crackable message pair."""
+        return {
+            format_mac(bssid)
+            for (bssid, _), messages in self.eapol.items()
+            if any(pair <= messages for pair in CRACKABLE_PAIRS)
+        }
+
+    def summary(self):
+        """
+        Per-BSSID summary of the capture.
+
+        :return: A list of dictionaries with beacons, probe responses, EAPOL messages and handshake status.
+        """
+        bssids = set(self.beacons) | set(self.probe_responses) | {bssid for bssid, _ in self.eapol}
+        handshakes = self.handshake_bssids()
+        rows = []
+        for bssid in bssids:
+            messages = set().union(*(m for (b, _), m in self.eapol.items() if b == bssid))
+            mac = format_mac(bssid)
+            rows.append({
+                'BSSID': mac,
+                'ESSID': self.ssids.get(bssid, ''),
+                'beacons': self.beacons[bssid],
+                'probe_responses': self.probe_responses[bssid],
+                'eapol_messages': sorted(messages),
+                'Handshake_Captured': mac in handshakes,
+            })
+        return rows
+
+
+def index_pcap(path):
+    """
+    Stream a pcap capture and build its HandshakeIndex.
+
+    :param path: Path to a .cap/.pcap file with an 802.11, radiotap or prism link type.
+    :return: A HandshakeIndex.
+    """
+    index = HandshakeIndex()
+    with PcapReader(path) as reader:
+        for _, frame in reader.frames():
+            index.add_frame(frame)
+            frame.release()
+    return index
+
+
+if __name__ == "__main__":
+    # Run as `python -m modules.pcap [CAPTURE.cap]`
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else './handshake-sample/file-handshake-01.cap'
+    size = os.path.getsize(path)
+
+    start = time.perf_counter()
+    index = index_pcap(path)
+    elapsed = time.perf_counter() - start
+
+    print(f"{path}: {index.frames} frames, {size / elapsed / 1e6:.2f} MB/s, {index.frames / elapsed:,.0f} frames/s")
+    for row in sorted(index.summary(), key=lambda row: -row['beacons']):
+        print(row)
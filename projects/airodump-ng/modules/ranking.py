@@ -0,0 +1,124 @@
+import numpy as np
+from sortedcontainers import SortedList
+
+from .scoring import LEVEL_LABELS, level_edges
+
+
+def top_n_positions(scores, top_n):
+    """
+    Positions of the `top_n` highest scores, highest first, without sorting everything.
+
+    np.argpartition selects the candidates in O(n); only those are then sorted.
+    Ties keep their original order, as a stable sort_values would.
+
+    :param scores: 1-D array-like of scores.
+    :param top_n: Number of positions to return.
+    :return: An integer array of positions into `scores`.
+    """
+    scores = np.asarray(scores, dtype=float)
+    if top_n is None or top_n >= len(scores):
+        return np.argsort(-scores, kind='stable')
+    if top_n <= 0:
+        return np.array([], dtype=np.intp)
+    candidates = np.argpartition(-scores, top_n - 1)[:top_n]
+    # Include every tie of the cut-off score so the stable order is preserved
+    threshold = scores[candidates].min()
+    candidates = np.flatnonzero(scores >= threshold)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:top_n]
+
+
+class VulnerabilityRanking:
+    """
+    Persistent ranked index of access points by Vulnerability_Score.
+
+    Backed by a SortedList of (-score, BSSID) keys plus a BSSID -> score dict,
+    so inserting, updating and removing an access point cost O(log n) and
+    top(n) / rank(bssid) do not need to re-sort the survey.
+    """
+
+    def __init__(self, scores=None):
+        self._order = SortedList()
+        self._scores = {}
+        if scores is not None:
+            self.update(scores)
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __contains__(self, bssid):
+        return bssid in self._scores
+
+    def upsert(self, bssid, score):
+        """Insert an access point or move it to its new score."""
+        old = self._scores.get(bssid)
+        if old is not None:
+            if old == score:
+                return
+            self._order.remove((-old, bssid))
+        self._scores[bssid] = score
+        self._order.add((-score, bssid))
+
+    def update(self, scores):
+        """
+        Upsert many access points at once.
+
+        :param scores: Mapping or Series of BSSID -> score.
+        """
+        for bssid, score in scores.items():
+            self.upsert(bssid, float(score))
+
+    def remove(self, bssid):
+        score = self._scores.pop(bssid, None)
+        if score is not None:
+            self._order.remove((-score, bssid))
+
+    def score(self, bssid):
+        return self._scores.get(bssid)
+
+    def max_score(self):
+        return -self._order[0][0] if self._order else None
+
+    def rank(self, bssid):
+        """1-based rank of an access point (1 = most vulnerable), or None if unknown."""
+        score = self._scores.get(bssid)
+        if score is None:
+            return None
+        return self._order.index((-score, bssid)) + 1
+
+    def __iter__(self):
+        """Iterate over (BSSID, score) from the most to the least vulnerable."""
+        for negative_score, bssid in self._order:
+            yield bssid, -negative_score
+
+    def top(self, n=None):
+        """
+        The `n` most vulnerable access points with their level.
+
+        :param n: Number of access points, None for all of them.
+        :return: A list of (BSSID, score, level) tuples.
+        """
+        max_score = self.max_score()
+        keys = self._order if n is None else self._order.islice(0, n)
+        return [(bssid, -negative_score, self.level(-negative_score, max_score)) for negative_score, bssid in keys]
+
+    def level(self, score, max_score=None):
+        """Vulnerability level of `score`, with the same bins as vulnerability_levels."""
+        max_score = self.max_score() if max_score is None else max_score
+        return score_level(score, max_score)
+
+
+def score_level(score, max_score):
+    """
+    Label of a single score with the pd.cut bins used by vulnerability_levels.
+
+    Bins are right-closed with the lowest one including 0, so the label is the
+    first upper edge that is >= score.
+    """
+    if max_score is None:
+        return None
+    edges = level_edges(max_score)
+    if score < 0 or score > edges[-1]:
+        return None
+    position = int(np.searchsorted(edges[1:], score, side='left'))
+    return LEVEL_LABELS[min(position, len(LEVEL_LABELS) - 1)]
@@ -0,0 +1,146 @@
+import re
+import numpy as np
+import pandas as pd
+from common import tracing
+
+COMMON_ESSIDS = ['default', 'linksys', 'netgear', 'dlink', 'tplink']
+LEVEL_LABELS = ['Zero', 'Very Low', 'Low', 'Medium', 'High', 'Very High', 'Critical']
+
+
+def _text(df, col):
+    return df[col].fillna('').astype(str)
+
+
+def _contains(series, token):
+    return series.str.contains(token, regex=False).to_numpy()
+
+
+def score_privacy_cipher(df):
+    """Vectorized version of AirodumpHandler.score_privacy_cipher."""
+    privacy = _text(df, 'Privacy')
+    wep, wpa, wpa2, opn = (_contains(privacy, token) for token in ('WEP', 'WPA', 'WPA2', 'OPN'))
+    score = np.select([wep, wpa & ~wpa2, wpa, opn], [10, 7, 5, 10], default=0)
+
+    cipher = _text(df, 'Cipher')
+    score -= np.select([_contains(cipher, 'CCMP'), _contains(cipher, 'TKIP')], [2, 1], default=0)
+    score += _contains(_text(df, 'Authentication'), 'PSK')
+    return np.maximum(score, 0)
+
+
+def score_power(df):
+    """Vectorized version of AirodumpHandler.score_power."""
+    power = df['Power'].to_numpy(dtype=float)
+    return np.select([power > -50, power > -70], [4, 2], default=1)
+
+
+def score_visibility_duration(df):
+    """Vectorized version of AirodumpHandler.score_visibility_duration, timestamps are parsed once per column."""
+    first_seen = pd.to_datetime(df['First time seen'])
+    last_seen = pd.to_datetime(df['Last time seen'])
+    duration = (last_seen - first_seen).dt.total_seconds().to_numpy()
+    return np.minimum(duration / 3600, 5)  # Máximo 5 puntos por duración
+
+
+def score_speed(df):
+    """Vectorized version of AirodumpHandler.score_speed."""
+    speed = df['Speed'].astype(int).to_numpy()
+    return np.select([speed <= 54, speed <= 150], [4, 2], default=1)
+
+
+def score_iv_beacons(df):
+    """Vectorized version of AirodumpHandler.score_iv_beacons."""
+    iv_score = np.minimum(df['# IV'].to_numpy() / 1000, 5)  # Máximo 5 puntos
+    beacon_score = np.minimum(df['# beacons'].to_numpy() / 1000, 3)  # Máximo 3 puntos
+    return iv_score + beacon_score
+
+
+def score_essid_key(df):
+    """Vectorized version of AirodumpHandler.score_essid_key."""
+    essid = _text(df, 'ESSID').str.lower()
+    common = essid.str.contains('|'.join(map(re.escape, COMMON_ESSIDS)), regex=True).to_numpy()
+    empty_key = (df['Key'] == '').to_numpy()
+    return np.where(common, 3, 0) + np.where(empty_key, 2, 0)
+
+
+# Same order as the original row-wise scoring so the float sums are identical
+SCORE_COMPONENTS = [
+    ('privacy_cipher', score_privacy_cipher),
+    ('power', score_power),
+    ('visibility_duration', score_visibility_duration),
+    ('speed', score_speed),
+    ('iv_beacons', score_iv_beacons),
+    ('essid_key', score_essid_key),
+]
+
+
+def vulnerability_scores(df):
+    """
+    Compute the Vulnerability_Score of every access point with columnar operations.
+
+    :param df: Access points DataFrame as produced by AirodumpHandler.process_csv.
+    :return: A float Series aligned with df.index.
+    """
+    total = np.zeros(len(df))
+    for name, component in SCORE_COMPONENTS:
+        with tracing.span(f"score.{name}"):
+            total = total + component(df)
+    return pd.Series(total, index=df.index, name='Vulnerability_Score')
+
+
+def level_edges(max_score):
+    """
+    Bin edges of the vulnerability levels, relative to the highest score.
+
+    Without a positive highest score (no candidates, or all of them scored 0)
+    the edges are those of a highest score of 1, so a score of 0 is 'Zero'.
+    """
+    max_score = max_score if max_score > 0 else 1
+    return [0, max_score*0.1, max_score*0.2, max_score*0.4, max_score*0.6, max_score*0.8, max_score, max_score*1.2]
+
+
+def vulnerability_levels(scores, max_score=None):
+    """
+    Bin the scores into vulnerability levels relative to the highest score.
+
+    :param scores: Series of Vulnerability_Score values.
+    :param max_score: Score the bins are relative to. Defaults to scores.max().
+    :return: A categorical Series with the level labels.
+    """
+    max_score = scores.max() if max_score is None else max_score
+    return pd.cut(scores, bins=level_edges(max_score), labels=LEVEL_LABELS, include_lowest=True)
+
+
+def reference_scores(df):
+    """Row-wise scores computed with the original AirodumpHandler static methods."""
+    from airohandler import AirodumpHandler
+
+    scores = pd.Series(0, index=df.index)
+    scores += df.apply(AirodumpHandler.score_privacy_cipher, axis=1)
+    scores += df['Power'].apply(AirodumpHandler.score_power)
+    scores += df.apply(AirodumpHandler.score_visibility_duration, axis=1)
+    scores += df['Speed'].apply(AirodumpHandler.score_speed)
+    scores += df.apply(AirodumpHandler.score_iv_beacons, axis=1)
+    scores += df.apply(AirodumpHandler.score_essid_key, axis=1)
+    return scores
+
+
+if __name__ == "__main__":
+    # Row-wise vs columnar scoring time on the sample captures, tests/test_scoring.py checks they match.
+    # Run as `python -m modules.scoring`
+    import glob
+    import time
+
+    from .parser import parse_airodump_csv
+
+    for path in sorted(glob.glob('./data/**/*.csv', recursive=True)):
+        ap_df, _ = parse_airodump_csv(path)
+
+        start = time.perf_counter()
+        expected = reference_scores(ap_df)
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scores = vulnerability_scores(ap_df)
+        vectorized_time = time.perf_counter() - start
+
+        print(f"{path}: {len(ap_df)} APs, row-wise {reference_time * 1000:.1f} ms, vectorized {vectorized_time * 1000:.1f} ms")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# airohandler and the modules package are imported from the airodump-ng directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
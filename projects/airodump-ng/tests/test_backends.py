@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+from modules.backends import load_capture
+from modules.scoring import score_essid_key, vulnerability_scores
+
+CAPTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'handshake-sample', 'file-handshake-01')
+BACKENDS = ['.csv', '.kismet.netxml', '.kismet.csv', '.log.csv']
+
+
+def scores_by_bssid(ap_df, score=vulnerability_scores):
+    return dict(zip(ap_df['BSSID'], score(ap_df)))
+
+
+def test_csv_and_netxml_score_the_same():
+    # Both files carry every field the scores use
+    csv_df, _ = load_capture(CAPTURE + '.csv')
+    netxml_df, _ = load_capture(CAPTURE + '.kismet.netxml')
+    assert scores_by_bssid(csv_df) == scores_by_bssid(netxml_df)
+
+
+@pytest.mark.parametrize('extension', BACKENDS)
+def test_missing_key_scores_as_in_the_csv(extension):
+    # The kismet CSV and the log do not record the authentication or the cipher, but the Key is scored alike
+    ap_df, _ = load_capture(CAPTURE + extension)
+    csv_df, _ = load_capture(CAPTURE + '.csv')
+    assert scores_by_bssid(ap_df, score_essid_key) == scores_by_bssid(csv_df, score_essid_key)
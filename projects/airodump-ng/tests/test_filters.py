@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from modules.parser import parse_airodump_csv
+from modules.filters import compile_filters, keep_mask, reference_mask
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'airodump_sample-01.csv')
+
+
+@pytest.fixture(scope='module')
+def ap_df():
+    return parse_airodump_csv(SAMPLE)[0]
+
+
+# reference_mask uses str.contains, which warns about the capture groups
+@pytest.mark.filterwarnings('ignore:This pattern is interpreted as a regular expression')
+@pytest.mark.parametrize('exclude_essid', [
+    ['(?P<a>vtr)', '(?P<a>movistar)'],
+    [r'(\w)\1', 'wifi'],
+    ['(?i)VTR', '(a)?(?(1)b|c)'],
+    ['^$', 'vtr|movistar', 'corp-(guest)?'],
+])
+def test_keep_mask_matches_per_pattern_filters(ap_df, exclude_essid):
+    kwargs = {'exclude_protocol': ['OPN'], 'exclude_bssid': ['B0:EC:DD:71:BB:48'], 'exclude_essid': exclude_essid}
+    assert (keep_mask(ap_df, **kwargs).to_numpy() == reference_mask(ap_df, **kwargs)).all()
+
+
+def test_duplicate_group_names_are_compiled_separately():
+    pipeline = compile_filters(exclude_essid=['(?P<a>foo)', '(?P<a>bar)'])
+    assert pipeline.essid_regex is None and len(pipeline.essid_extra) == 2
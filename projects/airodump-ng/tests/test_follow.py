@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from airohandler import AirodumpHandler
+from modules.follow import CaptureFollower
+from modules.parser import AP_COLUMNS, CLIENT_COLUMNS, iter_section_lines
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'airodump_sample-01.csv')
+RANKED_COLUMNS = ['BSSID', 'Client_Count', 'Vulnerability_Score', 'Vulnerability_level']
+
+
+@pytest.fixture(scope='module')
+def sample_lines():
+    ap_lines, client_lines = [], []
+    for section, line in iter_section_lines(SAMPLE):
+        if section == 'ap':
+            ap_lines.append(line)
+        elif section == 'clients':
+            client_lines.append(line)
+    return ap_lines, client_lines
+
+
+def write_capture(path, ap_lines, client_lines):
+    # Same layout as airodump-ng (and simulate_capture), replaced atomically
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as file:
+        file.write('\r\n' + ', '.join(AP_COLUMNS) + '\r\n')
+        file.writelines(line + '\r\n' for line in ap_lines)
+        file.write('\r\n' + ', '.join(CLIENT_COLUMNS) + '\r\n')
+        file.writelines(line + '\r\n' for line in client_lines)
+        file.write('\r\n')
+    os.replace(f"{path}.tmp", path)
+
+
+def ranked_rows(df):
+    return sorted(map(tuple, df[RANKED_COLUMNS].astype(str).to_numpy().tolist()))
+
+
+def full_parse_rows(path, **filters):
+    handler = AirodumpHandler(path)
+    handler.process_csv()
+    return ranked_rows(handler.top_n_vulnerables(top_n=None, **filters))
+
+
+@pytest.mark.parametrize('filters', [{}, {'client_n': 2}, {'exclude_protocol': ['OPN'], 'essid_key': True}])
+def test_follow_matches_a_full_parse_at_every_step(tmp_path, sample_lines, filters):
+    ap_lines, client_lines = sample_lines
+    path = str(tmp_path / 'capture-01.csv')
+    follower = CaptureFollower(path, top_n=None, **filters)
+    steps = 4
+    for step in range(1, steps + 1):
+        write_capture(path, ap_lines[:len(ap_lines) * step // steps], client_lines[:len(client_lines) * step // steps])
+        assert follower.refresh() is not None
+        assert ranked_rows(follower.leaderboard(len(ap_lines))) == full_parse_rows(path, **filters)
+
+    # Rows that change or disappear between two rewrites
+    changed = [line.replace(' WPA2', ' WEP ', 1) for line in ap_lines[::3]] + ap_lines[1::3]
+    write_capture(path, changed, client_lines[::2])
+    assert follower.refresh() is not None
+    assert ranked_rows(follower.leaderboard(len(ap_lines))) == full_parse_rows(path, **filters)
+
+
+def test_unchanged_capture_is_not_refreshed(tmp_path, sample_lines):
+    path = str(tmp_path / 'capture-01.csv')
+    write_capture(path, *sample_lines)
+    follower = CaptureFollower(path)
+    assert follower.refresh() is not None
+    assert follower.refresh() is None
@@ -0,0 +1,44 @@
+import os
+import glob
+
+import pandas as pd
+import pytest
+
+from airohandler import AirodumpHandler
+from modules.parser import parse_airodump_csv
+from modules.ranking import score_level
+from modules.scoring import reference_scores, vulnerability_levels, vulnerability_scores
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+HANDSHAKE = os.path.join(os.path.dirname(DATA_DIR), 'handshake-sample', 'file-handshake-01')
+SAMPLES = sorted(glob.glob(os.path.join(DATA_DIR, '**', 'airodump_sample-0*.csv'), recursive=True))
+
+
+@pytest.mark.parametrize('path', SAMPLES, ids=os.path.basename)
+def test_vulnerability_scores_match_row_wise_scoring(path):
+    ap_df, _ = parse_airodump_csv(path)
+    assert len(ap_df)
+    assert vulnerability_scores(ap_df).equals(reference_scores(ap_df).astype(float))
+
+
+@pytest.mark.parametrize('path', SAMPLES, ids=os.path.basename)
+def test_key_without_value_is_not_scored_as_empty(path):
+    # airodump-ng writes ' ' for an AP without key, the original reader never counted it as ''
+    ap_df, _ = parse_airodump_csv(path)
+    assert not (ap_df['Key'] == '').any()
+
+
+@pytest.mark.parametrize('max_score', [0, float('nan')])
+def test_levels_without_a_positive_max_score(max_score):
+    assert vulnerability_levels(pd.Series([0.0, 0.0]), max_score=max_score).tolist() == ['Zero', 'Zero']
+    assert vulnerability_levels(pd.Series([], dtype=float)).tolist() == []
+    assert score_level(0, max_score) == 'Zero'
+
+
+@pytest.mark.parametrize('extension, client_n', [('.csv', 100), ('.log.csv', None), ('.kismet.csv', None)])
+def test_top_n_vulnerables_without_candidates(extension, client_n):
+    handler = AirodumpHandler(HANDSHAKE + extension)
+    handler.process_csv()
+    top = handler.top_n_vulnerables(top_n=5, client_n=client_n)
+    assert top.empty
+    assert {'Vulnerability_Score', 'Vulnerability_level'} <= set(top.columns)
@@ -0,0 +1,48 @@
+"""
+airodump-ng benchmarks: AirodumpHandler.process_csv and top_n_vulnerables on
+a synthetic capture, the client/AP graph, AP position estimation from its GPS survey and area
+queries on the spatial index. Run from projects/airodump-ng (see run.py).
+"""
+import os
+from harness import run, best_of, record
+from generators import write_airodump_csv, write_log_csv
+
+
+def benchmarks(size, repeat, tmp_dir):
+    from airohandler import AirodumpHandler
+
+    n_aps, n_clients = size // 4, size - size // 4
+    path = write_airodump_csv(os.path.join(tmp_dir, "synthetic-01.csv"), n_aps, n_clients, seed=0)
+    results = {}
+
+    def process():
+        handler = AirodumpHandler(path)
+        handler.process_csv()
+        return handler
+
+    seconds, handler = best_of(process, repeat)
+    record(results, "airodump.process_csv", seconds, n_aps + n_clients, "rows", bytes=os.path.getsize(path))
+
+    seconds, top = best_of(lambda: handler.top_n_vulnerables(top_n=30, client_n=1, essid_key=True, exclude_essid=["iphone"]), repeat)
+    record(results, "airodump.top_n_vulnerables", seconds, n_aps, "access points", top_n=len(top))
+
+    seconds, graph = best_of(handler.survey_graph, repeat)
+    record(results, "airodump.survey_graph", seconds, n_clients, "stations", probes=graph.station_essids.n_edges)
+
+    from modules.geo import SpatialIndex
+
+    log_path = os.path.join(tmp_dir, "synthetic-01.log.csv")
+    truth = write_log_csv(log_path, handler.ap_df['BSSID'].tolist(), sightings_per_ap=20, seed=0)
+    seconds, positions = best_of(lambda: handler.add_positions(log_path), repeat)
+    record(results, "airodump.estimate_positions", seconds, len(truth) * 20, "sightings", located=len(positions))
+
+    index = SpatialIndex(handler.top_n_vulnerables(top_n=None))
+    center = positions[['Latitude', 'Longitude']].median()
+    queries = 200
+    seconds, found = best_of(lambda: [index.top_n_within_radius(center['Latitude'], center['Longitude'], 2000, top_n=10) for _ in range(queries)], repeat)
+    record(results, "airodump.top_n_within_radius", seconds, queries, "queries", found=len(found[-1]))
+    return results
+
+
+if __name__ == "__main__":
+    run(benchmarks, __doc__)
@@ -0,0 +1,67 @@
+"""
+Proxy checker benchmarks: parsing a synthetic proxy list and checking
+proxies against local stub HTTP/SOCKS servers with injected latency and
+dead endpoints, through the asyncio and the threaded paths. Run from
+projects/checkers (see run.py).
+"""
+import os
+from harness import run, best_of, record
+from generators import write_proxy_csv
+
+STUB_LATENCY = 0.02
+STUBS_PER_PROTOCOL = 4
+DEAD_PORT = 1  # One dead endpoint per protocol next to the live stubs: 1 check in 5 fails
+THREADED_WORKERS = 10
+
+
+def benchmarks(size, repeat, tmp_dir):
+    from modules.stubs import StubServers
+    from modules.proxy_table import load_proxy_table
+    from modules.proxy_checker import ProxyChecker
+
+    results = {}
+    path = write_proxy_csv(os.path.join(tmp_dir, "proxies.csv"), size, seed=0)
+    seconds, table = best_of(lambda: load_proxy_table(path, cache_path=False), repeat)
+    record(results, "checkers.parse_proxy_list", seconds, len(table.ip), "proxies")
+    load_proxy_table(path)  # Writes the binary cache
+    seconds, table = best_of(lambda: load_proxy_table(path), repeat)
+    record(results, "checkers.load_proxy_table_cached", seconds, len(table.ip), "proxies")
+
+    # Checking is bound by the stub latency, a slice of the list is enough
+    n_checks = min(size // 10, 4000)
+    n_threaded = min(n_checks, 400)
+    failure_rate = 1 / (STUBS_PER_PROTOCOL + 1)
+    with StubServers() as stubs:
+        url = f"http://127.0.0.1:{stubs.start('target', latency=STUB_LATENCY)}/"
+        endpoints = {protocol: [('127.0.0.1', stubs.start(protocol, latency=STUB_LATENCY)) for _ in range(STUBS_PER_PROTOCOL)] + [('127.0.0.1', DEAD_PORT)]
+                     for protocol in ('http', 'https', 'socks4', 'socks5')}
+        path = write_proxy_csv(os.path.join(tmp_dir, "stub-proxies.csv"), n_checks, seed=0, endpoints=endpoints)
+        threaded_path = write_proxy_csv(os.path.join(tmp_dir, "stub-proxies-threaded.csv"), n_threaded, seed=0, endpoints=endpoints)
+
+        def check_async():
+            checker = ProxyChecker(path, timeout=5, test_url=url, store_path=':memory:')
+            checker.analyze_proxies_async(concurrency=1000)
+            return checker.results_df
+
+        def check_threaded():
+            checker = ProxyChecker(threaded_path, timeout=5, test_url=url, store_path=':memory:')
+            checker.analyze_proxies_parallel(max_workers=THREADED_WORKERS)
+            return checker.results_df
+
+        seconds, checked = best_of(check_async, repeat)
+        record(results, "checkers.analyze_proxies_async", seconds, len(checked), "checks",
+               success_ratio=float(checked['status'].mean()), latency=STUB_LATENCY, failure_rate=failure_rate)
+        seconds, threaded = best_of(check_threaded, repeat)
+        record(results, "checkers.analyze_proxies_parallel", seconds, len(threaded), "checks",
+               success_ratio=float(threaded['status'].mean()), latency=STUB_LATENCY, failure_rate=failure_rate, workers=THREADED_WORKERS)
+
+    # Every endpoint is either live or dead, so both paths must give each one the same verdict
+    def verdicts(results_df):
+        return results_df.groupby(['protocol', 'port'])['status'].mean()
+    if not verdicts(checked).equals(verdicts(threaded)):
+        raise ValueError("The threaded and asyncio paths disagree on the stub proxies")
+    return results
+
+
+if __name__ == "__main__":
+    run(benchmarks, __doc__)
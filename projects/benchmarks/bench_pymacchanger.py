@@ -0,0 +1,43 @@
+"""
+PyMAChanger benchmarks: opening the OUI vendor index, one vendor lookup per
+MAC and the bulk lookup on a synthetic MAC population. Run from
+projects/pymacchanger (see run.py).
+"""
+import os
+from harness import run, best_of, record
+from generators import mac_population
+
+
+def benchmarks(size, repeat, tmp_dir):
+    from oui_index import OUIIndex, build_index
+    from mac_inventory import lookup_vendors, load_chipsets
+
+    results = {}
+    path = os.path.join(tmp_dir, "oui.idx")
+    seconds, count = best_of(lambda: build_index(path=path), repeat)
+    record(results, "pymacchanger.build_index", seconds, count, "prefixes")
+
+    def open_index():
+        index = OUIIndex(path)
+        index.get("00:00:0C:00:00:00")
+        return index
+
+    seconds, index = best_of(open_index, repeat)
+    record(results, "pymacchanger.open_index", seconds)
+
+    macs = mac_population(size, seed=0)
+    seconds, _ = best_of(lambda: [index.get(mac) for mac in macs], repeat)
+    record(results, "pymacchanger.vendor_lookup", seconds, len(macs), "MACs")
+
+    chipsets = load_chipsets()
+    seconds, vendors = best_of(lambda: lookup_vendors(macs, index, chipsets), repeat)
+    record(results, "pymacchanger.bulk_vendor_lookup", seconds, len(macs), "MACs", known=int(vendors['vendor'].notna().sum()))
+
+    seconds, _ = best_of(lambda: [index.random_prefix() for _ in range(10000)], repeat)
+    record(results, "pymacchanger.random_vendor", seconds, 10000, "prefixes")
+    index.close()
+    return results
+
+
+if __name__ == "__main__":
+    run(benchmarks, __doc__)
@@ -0,0 +1,163 @@
+"""
+Synthetic inputs for the benchmarks: airodump-ng CSV captures and GPS
+surveys (.log.csv), proxy lists
+in the proxies-advanced.csv format and MAC address populations. Every
+generator is seeded, so the same size and seed always give the same data.
+"""
+import math
+import random
+from datetime import datetime, timedelta
+
+AP_HEADER = ("BSSID, First time seen, Last time seen, channel, Speed, Privacy, Cipher, Authentication, Power, "
+             "# beacons, # IV, LAN IP, ID-length, ESSID, Key")
+CLIENT_HEADER = "Station MAC, First time seen, Last time seen, Power, # packets, BSSID, Probed ESSIDs"
+PRIVACY = (("WPA2", "CCMP", "PSK"), ("WPA2 WPA", "CCMP TKIP", "PSK"), ("WPA", "TKIP", "PSK"), ("WEP", "WEP", ""),
+           ("OPN", "", ""), ("WPA3 WPA2", "CCMP", "SAE PSK"), ("WPA2", "CCMP", "MGT"))
+PRIVACY_WEIGHTS = (50, 15, 5, 3, 7, 10, 10)
+ESSID_PREFIXES = ("VTR-", "HUAWEI-", "LIB-", "Depto ", "TP-Link_", "iphone de ", "Casa ", "FAMILIA ", "MOVISTAR_", "")
+PROTOCOLS = ("http", "https", "socks4", "socks5")
+LOG_HEADER = "LocalTime, GPSTime, ESSID, BSSID, Power, Security, Latitude, Longitude, Latitude Error, Longitude Error, Type"
+METRES_PER_DEGREE = 111195.0
+ENDPOINTS = ("aws_NA", "ora_UK", "ora_JP", "ms_HK")
+# A few real OUIs, so part of the synthetic MACs have a known vendor
+COMMON_OUIS = (0x00000C, 0x001B63, 0x3C5AB4, 0xB0C554, 0xC005C2, 0xE45740, 0x342CC4, 0x90173F, 0xF8AF05, 0x001A11)
+
+
+def _time(base, seconds):
+    return (base + timedelta(seconds=seconds)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def random_mac(rng, randomized_ratio=0.3, ouis=COMMON_OUIS):
+    """
+    Random unicast MAC: locally administered (randomized) with probability
+    `randomized_ratio`, otherwise under one of `ouis` or a random OUI.
+    """
+    if rng.random() < randomized_ratio:
+        first = (rng.getrandbits(8) | 0x02) & 0xFE
+        value = first << 40 | rng.getrandbits(40)
+    elif ouis and rng.random() < 0.7:
+        value = rng.choice(ouis) << 24 | rng.getrandbits(24)
+    else:
+        value = (rng.getrandbits(24) & 0xFCFFFF) << 24 | rng.getrandbits(24)
+    digits = f"{value:012X}"
+    return ':'.join(digits[i:i + 2] for i in range(0, 12, 2))
+
+
+def mac_population(n, seed=0, randomized_ratio=0.3, ouis=COMMON_OUIS):
+    """List of `n` MAC addresses mixing known vendors, unknown OUIs and randomized MACs."""
+    rng = random.Random(seed)
+    return [random_mac(rng, randomized_ratio, ouis) for _ in range(n)]
+
+
+def airodump_lines(n_aps, n_clients, seed=0, associated_ratio=0.6):
+    """
+    Lines of a synthetic airodump-ng CSV, in the same layout as the
+    captures in airodump-ng/data (CRLF line ends, leading blank line).
+    A fraction of the clients is associated to one of the generated APs.
+    """
+    rng = random.Random(seed)
+    base = datetime(2023, 11, 17, 20, 0, 0)
+    bssids = []
+    yield ""
+    yield AP_HEADER
+    for _ in range(n_aps):
+        bssid = random_mac(rng, randomized_ratio=0.05)
+        bssids.append(bssid)
+        privacy, cipher, auth = rng.choices(PRIVACY, PRIVACY_WEIGHTS)[0]
+        first = rng.randrange(3600)
+        essid = f"{rng.choice(ESSID_PREFIXES)}{rng.randrange(10 ** 7)}" if rng.random() < 0.85 else ""
+        yield (f"{bssid}, {_time(base, first)}, {_time(base, first + rng.randrange(3600))}, {rng.choice((1, 6, 11, 36, 44, 149)):2d}, "
+               f"{rng.choice((54, 130, 270, 360, 400, 866)):3d}, {privacy}, {cipher}, {auth}, {rng.randint(-95, -30):3d}, "
+               f"{rng.randrange(5000):8d}, {rng.randrange(500):8d},   0.  0.  0.  0, {len(essid):3d}, {essid}, ")
+    yield ""
+    yield CLIENT_HEADER
+    for _ in range(n_clients):
+        first = rng.randrange(3600)
+        associated = bssids and rng.random() < associated_ratio
+        probed = ','.join(f"{rng.choice(ESSID_PREFIXES)}{rng.randrange(1000)}" for _ in range(rng.choice((0, 0, 1, 2))))
+        yield (f"{random_mac(rng)}, {_time(base, first)}, {_time(base, first + rng.randrange(3600))}, {rng.randint(-95, -1):3d}, "
+               f"{rng.randrange(5000):8d}, {rng.choice(bssids) if associated else '(not associated)'},{probed}")
+    yield ""
+
+
+def write_airodump_csv(path, n_aps, n_clients, seed=0):
+    """Write a synthetic airodump-ng CSV with `n_aps` access points and `n_clients` clients."""
+    with open(path, 'w', newline='') as f:
+        for line in airodump_lines(n_aps, n_clients, seed):
+            f.write(line + "\r\n")
+    return path
+
+
+def log_lines(bssids, sightings_per_ap=20, seed=0, center=(-33.45, -70.66), area_m=20000, no_fix_ratio=0.05):
+    """
+    Lines of a synthetic .log.csv GPS survey: every AP of `bssids` is placed
+    at random in a square of `area_m` metres around `center` and seen
+    `sightings_per_ap` times within 150 m, with a log-distance path loss power.
+    A fraction of the sightings has no GPS fix (0.000000 coordinates).
+
+    :return: (lines, {bssid: (latitude, longitude)} true positions)
+    """
+    rng = random.Random(seed)
+    base = datetime(2023, 11, 18, 0, 0, 0)
+    lat_scale = area_m / METRES_PER_DEGREE
+    lon_scale = lat_scale / math.cos(math.radians(center[0]))
+    truth = {bssid: (center[0] + (rng.random() - 0.5) * lat_scale, center[1] + (rng.random() - 0.5) * lon_scale) for bssid in bssids}
+    lines = [LOG_HEADER]
+    for i, (bssid, (lat, lon)) in enumerate(truth.items()):
+        for j in range(sightings_per_ap):
+            distance, bearing = rng.uniform(5, 150), rng.uniform(0, 2 * math.pi)
+            power = max(-99, min(-1, round(-30 - 30 * math.log10(distance) + rng.gauss(0, 4))))
+            if rng.random() < no_fix_ratio:
+                fix = "0.000000,0.000000,0.000,0.000"
+            else:
+                fix = (f"{lat + distance * math.cos(bearing) / METRES_PER_DEGREE:.6f},"
+                       f"{lon + distance * math.sin(bearing) / METRES_PER_DEGREE / math.cos(math.radians(lat)):.6f},3.000,3.000")
+            lines.append(f"{_time(base, i + j)},{_time(base, i + j)},survey,{bssid},{power}, WPA2 ,{fix},AP")
+    return lines, truth
+
+
+def write_log_csv(path, bssids, sightings_per_ap=20, seed=0, **kwargs):
+    """Write a synthetic .log.csv GPS survey of `bssids` and return the true AP positions."""
+    lines, truth = log_lines(bssids, sightings_per_ap, seed, **kwargs)
+    with open(path, 'w', newline='') as f:
+        f.write("\r\n".join(lines) + "\r\n")
+    return truth
+
+
+def proxy_rows(n, seed=0, endpoints=None):
+    """
+    Rows of a synthetic proxies-advanced.csv list.
+
+    :param n: Number of proxies.
+    :param endpoints: Optional {protocol: [(ip, port), ...]} of local stub servers the proxies point to.
+                      By default the proxies get random public IPs.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        protocol = PROTOCOLS[i % len(PROTOCOLS)] if endpoints else rng.choice(PROTOCOLS)
+        if endpoints:
+            ip, port = endpoints[protocol][i // len(PROTOCOLS) % len(endpoints[protocol])]
+        else:
+            ip = f"{rng.randint(1, 223)}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randint(1, 254)}"
+            port = rng.choice((80, 1080, 3128, 4145, 4153, 8080, 9050))
+        performance = ', '.join(
+            f"{endpoint}=EndpointServerData(ping={rng.randrange(2000)}, connections=ConnectionAttempts(success={rng.randrange(50)}, "
+            f"fail={rng.randrange(200)}), uptime={rng.randrange(100)}.0%, visibleIp=null)" for endpoint in ENDPOINTS)
+        rows.append({
+            'ip': ip, 'port': port, 'username': '', 'password': '',
+            'protocols': f"[ProtocolDataType(type={protocol}, port={port}, tls={str(rng.random() < 0.3).lower()}, autoRead=null)]",
+            'ping': '', 'detected': 'true', 'organisation': f"Org {rng.randrange(1000)}", 'country': 'Nowhere', 'isocode': 'ZZ',
+            'latitude': rng.uniform(-90, 90), 'longitude': rng.uniform(-180, 180), 'asn': f"AS{rng.randrange(65536)}",
+            'connections': f"PerformanceConnectData({performance})", 'uptime': '',
+            'dateAdded': '2023-04-15 02:35:45.0', 'lastTested': '2023-04-15 02:35:46.0', 'lastSuccess': '', 'detection': '', 'provider': '',
+        })
+    return rows
+
+
+def write_proxy_csv(path, n, seed=0, endpoints=None):
+    """Write a synthetic proxy list readable by ProxyChecker / load_proxy_table."""
+    import pandas as pd
+
+    pd.DataFrame(proxy_rows(n, seed, endpoints)).to_csv(path, index=False)
+    return path
@@ -0,0 +1,63 @@
+"""
+Helpers shared by the bench_*.py scripts: best-of-N timing, result records
+and the command line every script accepts.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+
+# Number of records (APs + clients, proxies, MACs) per suite size
+SIZES = {"small": 10000, "medium": 100000, "large": 1000000}
+
+
+def best_of(function, repeat=3):
+    """
+    Run `function` `repeat` times.
+
+    :return: (best time in seconds, value returned by the last run).
+    """
+    best, value = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def record(results, name, seconds, items=None, unit="items", **extra):
+    """Add a benchmark result: its time, and its throughput when it processed `items` things."""
+    results[name] = {"seconds": seconds, **extra}
+    if items is not None:
+        results[name].update({"items": items, "unit": unit, "rate": items / seconds if seconds else float("inf")})
+
+
+def run(benchmarks, description):
+    """
+    Command line of a bench_*.py script, run from the directory of the tool it measures.
+
+    :param benchmarks: Function (size, repeat, tmp_dir) -> {name: result} (see record()).
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--size", choices=list(SIZES), default="small", help="Suite size. Default: small.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark, the best one is kept. Default: 3.")
+    args = parser.parse_args()
+
+    # The tools import their own `modules` package relative to their directory
+    sys.path.insert(0, os.getcwd())
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = benchmarks(SIZES[args.size], args.repeat, tmp_dir)
+    for result in results.values():
+        result.setdefault("peak_rss_mb", peak_rss_mb())
+    json.dump(results, sys.stdout, indent=2)
+    print()
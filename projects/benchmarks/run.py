@@ -0,0 +1,122 @@
+"""
+Run the benchmark suite and compare it with a stored baseline.
+
+Each tool is measured in its own process, from its own directory (the
+airodump-ng and checkers tools both have a `modules` package):
+
+    python benchmarks/run.py --size small --save-baseline      # from projects/
+    python benchmarks/run.py --size small                      # compare with it
+
+Results are written as JSON. A benchmark slower than the baseline by more
+than --tolerance is reported as a regression and the exit status is 1.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECTS_DIR = os.path.dirname(BENCH_DIR)
+# Suite -> (bench script, directory of the tool it measures)
+SUITES = {
+    "airodump": ("bench_airodump.py", "airodump-ng"),
+    "checkers": ("bench_checkers.py", "checkers"),
+    "pymacchanger": ("bench_pymacchanger.py", "pymacchanger"),
+}
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+DEFAULT_BASELINE = os.path.join(DEFAULT_RESULTS_DIR, "baseline.json")
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECTS_DIR, stderr=subprocess.DEVNULL).decode().strip()
+    except (subprocess.CalledProcessError, OSError):
+        return None
+
+
+def run_suite(name, size, repeat):
+    """Run one bench script in the directory of its tool and return its results."""
+    script, tool_dir = SUITES[name]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [BENCH_DIR, os.environ.get("PYTHONPATH")])), TQDM_DISABLE="1")
+    completed = subprocess.run([sys.executable, os.path.join(BENCH_DIR, script), "--size", size, "--repeat", str(repeat)],
+                               cwd=os.path.join(PROJECTS_DIR, tool_dir), env=env, stdout=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"The {name} benchmarks failed with exit status {completed.returncode}.")
+    return json.loads(completed.stdout)
+
+
+def compare(results, baseline, tolerance, min_delta=0.001):
+    """
+    Compare the timings with a baseline. A benchmark regresses when it is
+    more than `tolerance` slower and at least `min_delta` seconds slower, so
+    sub-millisecond timings do not flag noise.
+
+    :return: A list of (name, baseline seconds, seconds, ratio, regressed) for the benchmarks present in both.
+    """
+    rows = []
+    for name, result in results["benchmarks"].items():
+        reference = baseline["benchmarks"].get(name)
+        if reference is None or not reference["seconds"]:
+            continue
+        ratio = result["seconds"] / reference["seconds"]
+        regressed = ratio > 1 + tolerance and result["seconds"] - reference["seconds"] >= min_delta
+        rows.append((name, reference["seconds"], result["seconds"], ratio, regressed))
+    return rows
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark suite of the airodump-ng, checkers and PyMAChanger tools.")
+    parser.add_argument("--suite", "-s", action="append", choices=list(SUITES), help="Suite to run (repeatable). Default: all.")
+    parser.add_argument("--size", choices=["small", "medium", "large"], default="small", help="Synthetic data size: 10k, 100k or 1M records. Default: small.")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="Runs per benchmark, the best one is kept. Default: 3.")
+    parser.add_argument("--output", "-o", default=None, help="Results JSON. Default: ./benchmarks/results/<size>-<timestamp>.json.")
+    parser.add_argument("--baseline", "-b", default=DEFAULT_BASELINE, help=f"Baseline JSON to compare with. Default: {os.path.relpath(DEFAULT_BASELINE, PROJECTS_DIR)}.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline instead of comparing.")
+    parser.add_argument("--tolerance", "-t", type=float, default=0.2, help="Allowed slowdown before a benchmark counts as a regression (0.2 = 20%%). Default: 0.2.")
+    parser.add_argument("--min-delta", type=float, default=0.001, help="Minimum slowdown in seconds before a benchmark counts as a regression. Default: 0.001.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    results = {
+        "meta": {
+            "size": args.size,
+            "repeat": args.repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "benchmarks": {},
+    }
+    for name in args.suite or list(SUITES):
+        print(f"Running {name} ({args.size})...", file=sys.stderr)
+        results["benchmarks"].update(run_suite(name, args.size, args.repeat))
+
+    for name, result in results["benchmarks"].items():
+        rate = f", {result['rate']:,.0f} {result['unit']}/s" if "rate" in result else ""
+        print(f"{name}: {result['seconds'] * 1000:.3f} ms{rate}")
+
+    os.makedirs(DEFAULT_RESULTS_DIR, exist_ok=True)
+    output = args.baseline if args.save_baseline else args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{args.size}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved {'baseline' if args.save_baseline else 'results'} to {output}")
+
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"]["size"] != args.size:
+            raise SystemExit(f"The baseline was recorded with --size {baseline['meta']['size']}, not {args.size}.")
+        rows = compare(results, baseline, args.tolerance, args.min_delta)
+        print(f"\nCompared with the baseline of {baseline['meta']['timestamp']} (revision {baseline['meta']['revision']}):")
+        for name, before, after, ratio, regressed in rows:
+            print(f"{'REGRESSION ' if regressed else ''}{name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({ratio:.2f}x)")
+        if any(row[-1] for row in rows):
+            sys.exit(1)
@@ -1 +1,7 @@
-#
\ No newline at end of file
+import os
+import sys
+
+# projects/ holds the `common` package shared by the three tools (see common/__init__.py)
+PROJECTS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECTS_DIR not in sys.path:
+    sys.path.append(PROJECTS_DIR)
@@ -1,6 +1,10 @@
 from .proxy_checker import ProxyChecker
+from .writers import ResultWriter
+from .dns_resolver import resolve_domains, read_domains
 from .dns_checker import DNSInfo, set_ipinfo_token
+from common import tracing
 import json
+import time
 from dotenv import load_dotenv
 import argparse
 load_dotenv()
@@ -19,10 +23,16 @@ def main_arguments():
 
     args = parser.parse_args()
 
-    if args.mode == "proxy":
-        run_proxy(args)
-    elif args.mode == "dns":
-        run_dns(args)
+    if getattr(args, "profile", None):
+        tracing.enable()
+    try:
+        if args.mode == "proxy":
+            run_proxy(args)
+        elif args.mode == "dns":
+            run_dns(args)
+    finally:
+        if getattr(args, "profile", None):
+            tracing.dump(args.profile)
 
 def proxy_checker_args(parser):
     # File and basic options
@@ -36,18 +46,36 @@ def proxy_checker_args(parser):
     parser.add_argument("--analyze", action="store_true", help="Analyze the proxies to check their status.")
     parser.add_argument("--parallel", "-p", action="store_true", help="Use parallel requests to analyze proxies. Default: False.")
     parser.add_argument("--max_workers", "-mw", type=int, default=10, help="Number of worker threads for parallel requests. Effective only if --parallel is set. Default: 10.")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Use the asyncio engine to analyze proxies (thousands of checks in flight). Default: False.")
+    parser.add_argument("--concurrency", "-c", type=int, default=500, help="Maximum number of concurrent checks. Effective only if --async is set. Default: 500.")
+    parser.add_argument("--probes", "-k", type=int, default=1, help="Probes per proxy over the same connection, used for the median latency, jitter and success ratio. Default: 1.")
+    parser.add_argument("--need", "-n", type=int, default=None, help="Stop once N working proxies per protocol are found, checking the most likely ones first. Default: check every proxy.")
+    parser.add_argument("--ttl", type=int, default=None, help="Incremental mode: only re-check the proxies whose last stored result is older than TTL seconds. Default: check every proxy.")
+    parser.add_argument("--host_rate", type=float, default=None, help="Maximum connections per second to the same proxy host. Effective only if --async is set. Default: unlimited.")
 
     # Output and display options
+    parser.add_argument("--store", type=str, default="./data/output/proxy-results.sqlite", help="SQLite file where every check result is committed as soon as it finishes, so an interrupted run loses nothing. Default: './data/output/proxy-results.sqlite'.")
+    parser.add_argument("--query", action="store_true", help="Print the online proxies from the result store (filtered by --protocol and --max_latency) without checking.")
+    parser.add_argument("--max_latency", type=float, default=None, help="Maximum latency in seconds for --query. Default: None.")
     parser.add_argument("--display", action="store_true", help="Display the CSV content.")
     parser.add_argument("--save", "-s", action="store_true", help="Save the analyzed CSV. Use it with --analyze.")
-    parser.add_argument("--format", "-fmt", type=str, default="csv", choices=["csv", "json", "txt"], help="Output format for the saved file. Options: 'csv' or 'json'. Default: 'csv'.")
+    parser.add_argument("--format", "-fmt", type=str, default="csv", choices=["csv", "json", "txt"], help="Output format for the saved file, streamed as each check completes. Options: 'csv', 'json' (JSON lines) or 'txt'. Default: 'csv'.")
+    parser.add_argument("--sort", type=str, default=None, choices=["latency", "quality"], help="Sort the saved file by latency (fastest first) or quality score (best first). Default: completion order.")
     parser.add_argument("--keep_online", action="store_true", default=True, help="Keep only the proxies with status == True in the saved CSV. Use it with --save and --analyze. Default: True.")
+    parser.add_argument("--profile", type=str, nargs="?", const="./data/output/proxy-profile.json", default=None, help="Trace the run (spans, counters, latency histograms, allocations) and save it as a Chrome trace JSON with a summary table. Default path: './data/output/proxy-profile.json'.")
     parser.add_argument("--protocol", "-proto", type=str, choices=["http", "https", "socks4", "socks5"], help="Filter proxies by protocol type. Options: 'http', 'https', 'socks4', or 'socks5'. If not set, all protocols are used.")
 
 def dns_checker_args(parser):
     parser.add_argument("--domain", "-d", type=str, default=None, help="Domain or IP address to retrieve DNS and location info. Default: None, which retrieves info for the current machine.")
     parser.add_argument("--token", "-t", type=str, default=None, help="IPINFO_TOKEN for accessing ipinfo.io. This will create/update the .env file.")
     parser.add_argument("--save", action="store_true", help="Save the DNS and location info as a JSON file.")
+    parser.add_argument("--input", "-i", type=str, default=None, help="Batch mode: text file with one domain per line, resolved concurrently (A/AAAA/CNAME/NS) with a cached asyncio resolver.")
+    parser.add_argument("--nameserver", "-ns", type=str, default=None, help="Nameserver (ip or ip:port) used in batch mode. Default: first nameserver of /etc/resolv.conf.")
+    parser.add_argument("--concurrency", "-c", type=int, default=500, help="Maximum number of DNS queries in flight in batch mode. Default: 500.")
+    parser.add_argument("--locate", "-l", type=str, nargs="?", const=True, default=None, help="With a file: batch location mode, one IP address per line, looked up through the location cache, --geo_db and batched ipinfo.io requests. Without a file, with --domain: also locate the IP of the domain (by default the location shown is the one of this machine).")
+    parser.add_argument("--geo_db", type=str, default=None, help="Offline location database (CSV with a 'network' or 'start_ip'/'end_ip' column, or its .npz) checked before ipinfo.io. Default: None.")
+    parser.add_argument("--profile", type=str, nargs="?", const="./data/output/dns-profile.json", default=None, help="Trace the run (spans, counters, latency histograms, allocations) and save it as a Chrome trace JSON with a summary table. Default path: './data/output/dns-profile.json'.")
+    parser.add_argument("--ipinfo_url", type=str, default="https://ipinfo.io", help="Base URL of the ipinfo.io API (e.g. a local stub). Default: 'https://ipinfo.io'.")
 
 def run_proxy(args):
     # Main logic for proxy checker
@@ -55,7 +83,8 @@ def run_proxy(args):
     if args.test:
         args.file = "./data/static/proxies-advanced-test.csv"
 
-    checker = ProxyChecker(args.file, delimiter=args.delimiter, timeout=args.timeout, test_url=args.url)
+    # Results are streamed to the store and output file as they come, no need to keep them in memory
+    checker = ProxyChecker(args.file, delimiter=args.delimiter, timeout=args.timeout, test_url=args.url, store_path=args.store, keep_results=False, probes=args.probes)
 
     if args.display:
         print("-" * 50)
@@ -63,12 +92,10 @@ def run_proxy(args):
         print(checker.df)
         print("-" * 50)
 
-    if args.analyze:
-        if args.parallel:
-            checker.analyze_proxies_parallel(max_workers=args.max_workers)
-        else:
-            checker.analyze_proxies()
+    if args.query:
+        print(checker.query_store(protocol=args.protocol, max_latency=args.max_latency).to_string(index=False))
 
+    writer = None
     if args.save and args.analyze:
         output_path = "./data/output/proxy-checker-output"
         if args.format == "csv":
@@ -78,26 +105,88 @@ def run_proxy(args):
         elif args.format == "txt":
             output_path += ".txt"
 
-
-        checker.save_output(output_path, keep_online=args.keep_online, filter_protocol=args.protocol, file_format=args.format)
+        writer = ResultWriter(output_path, args.format, keep_online=args.keep_online, filter_protocol=args.protocol, sort_by=args.sort)
+        checker.add_writer(writer)
+
+    try:
+        if args.analyze:
+            if args.use_async:
+                checker.analyze_proxies_async(concurrency=args.concurrency, per_host_rate=args.host_rate, need=args.need, ttl=args.ttl)
+            elif args.parallel:
+                checker.analyze_proxies_parallel(max_workers=args.max_workers, need=args.need, ttl=args.ttl)
+            else:
+                checker.analyze_proxies(need=args.need, ttl=args.ttl)
+    finally:
+        if writer is not None:
+            writer.close()
+            print(f"Saved {writer.written} proxies to {writer.path}")
+
+def run_dns_batch(args):
+    domains = read_domains(args.input)
+    writer = ResultWriter("./data/output/dns_batch.jsonl", "jsonl") if args.save else None
+
+    def on_result(result):
+        print(f"{result['domain']}: {', '.join(result['a'] + result['aaaa']) or result['error'] or 'no records'}")
+        if writer is not None:
+            writer.put(result)
+
+    start = time.perf_counter()
+    try:
+        results = resolve_domains(domains, nameserver=args.nameserver, concurrency=args.concurrency, on_result=on_result)
+    finally:
+        if writer is not None:
+            writer.close()
+    resolved = sum(1 for result in results if result['a'] or result['aaaa'])
+    print(f"Resolved {resolved}/{len(results)} domains in {time.perf_counter() - start:.2f}s")
+    if writer is not None:
+        print(f"Saved DNS records to {writer.path}")
+
+def run_locate(args):
+    ips = read_domains(args.locate)
+    dns_info = DNSInfo(geo_db=args.geo_db, ipinfo_url=args.ipinfo_url)
+    start = time.perf_counter()
+    locations = dns_info.get_locations(ips)
+    for ip, details in locations.items():
+        place = ', '.join(str(details[key]) for key in ('city', 'region', 'country') if details.get(key)) if details else None
+        print(f"{ip}: {place or 'unknown'}")
+    located = sum(1 for details in locations.values() if details)
+    print(f"Located {located}/{len(locations)} IPs in {time.perf_counter() - start:.2f}s")
+    if args.save:
+        output_path = "./data/output/locations.jsonl"
+        with ResultWriter(output_path, "jsonl") as writer:
+            for ip, details in locations.items():
+                writer.put({"ip": ip, "location": details})
+        print(f"Saved locations to {output_path}")
 
 def run_dns(args):
     # Main logic for DNS checker
-    if args.token:
+    if args.input:
+        run_dns_batch(args)
+
+    elif isinstance(args.locate, str):
+        run_locate(args)
+
+    elif args.token:
         set_ipinfo_token(args.token)
         print('IPINFO_TOKEN set successfully.')
         
     else:
-        dns_info = DNSInfo(args.domain if args.domain else "duckduckgo.com")
+        dns_info = DNSInfo(args.domain if args.domain else "duckduckgo.com", geo_db=args.geo_db, ipinfo_url=args.ipinfo_url)
         if args.domain:
+            ip_address = dns_info.get_ip_address()
+            # The location of the domain IP is opt-in (--locate), otherwise the one of this machine as before
+            if args.locate:
+                location = dns_info.get_location_info(ip_address) if ip_address else None
+            else:
+                location = dns_info.get_location_info()
             output_data = {
                 "domain": args.domain,
                 "info":{
-                    "ip_address": dns_info.get_ip_address(),
+                    "ip_address": ip_address,
                     "fqdn": dns_info.get_fqdn(),
                     "alias_and_ips": dns_info.get_alias_and_ips(),
                     "name_servers": dns_info.get_name_servers(),
-                    "location": dns_info.get_location_info()
+                    "location": location
                 }
             }
         else:
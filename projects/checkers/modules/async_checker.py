@@ -0,0 +1,411 @@
+import ssl
+import time
+import struct
+import asyncio
+from datetime import datetime
+from urllib.parse import urlsplit, urljoin
+from tqdm import tqdm
+
+from .latency import ProbeTiming, quality_summary, trace_timings, is_working
+from common import tracing
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) checkers/1.0"
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 30  # Same limit as requests
+
+
+class ProxyError(Exception):
+    """The proxy refused or broke the tunnel to the test URL."""
+
+
+async def _read_head(reader):
+    """Read an HTTP status line plus its headers and return (status code, lower-cased headers, HTTP version)."""
+    status_line = await reader.readline()
+    parts = status_line.split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith(b'HTTP/'):
+        raise ProxyError(f"Invalid HTTP response: {status_line[:64]!r}")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line or line in (b'\r\n', b'\n'):
+            return int(parts[1]), headers, parts[0].decode('latin-1')
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_status(reader):
+    """Read an HTTP status line plus its headers and return the status code."""
+    return (await _read_head(reader))[0]
+
+
+async def _read_body(reader, status, headers, version='HTTP/1.1'):
+    """
+    Consume a response body.
+
+    :return: True if the connection can be reused for another request.
+    """
+    if status < 200 or status in (204, 304):
+        pass
+    elif 'chunked' in headers.get('transfer-encoding', '').lower():
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            await reader.readexactly(size + 2)  # Chunk plus CRLF (the last one is the empty trailer line)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    else:
+        await reader.read()  # Body delimited by the end of the connection
+        return False
+    # HTTP/1.1 connections persist unless closed, HTTP/1.0 ones only when asked to
+    connection = headers.get('connection', '').lower()
+    return connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+
+
+class HttpConnector:
+    """
+    HTTP/HTTPS proxies: CONNECT tunnel for https:// targets, absolute-form
+    requests for http:// targets.
+    """
+
+    async def open(self, reader, writer, target):
+        if target.scheme == 'https':
+            authority = f"{target.hostname}:{target.port}".encode('idna')
+            writer.write(b"CONNECT " + authority + b" HTTP/1.1\r\nHost: " + authority + b"\r\n\r\n")
+            await writer.drain()
+            status = await _read_status(reader)
+            if status != 200:
+                raise ProxyError(f"CONNECT refused with status {status}")
+            return False
+        return True  # The request must use the absolute URI
+
+
+class Socks4Connector:
+    """SOCKS4a: the proxy resolves the hostname, so no local DNS lookup is needed."""
+
+    async def open(self, reader, writer, target):
+        writer.write(struct.pack('>BBH', 4, 1, target.port) + b'\x00\x00\x00\x01' + b'\x00'
+                     + target.hostname.encode('idna') + b'\x00')
+        await writer.drain()
+        reply = await reader.readexactly(8)
+        if reply[1] != 0x5A:
+            raise ProxyError(f"SOCKS4 request rejected (0x{reply[1]:02x})")
+        return False
+
+
+class Socks5Connector:
+    """SOCKS5 without authentication, CONNECT by domain name."""
+
+    async def open(self, reader, writer, target):
+        writer.write(b'\x05\x01\x00')
+        await writer.drain()
+        version, method = await reader.readexactly(2)
+        if version != 5 or method != 0:
+            raise ProxyError("SOCKS5 proxy requires authentication")
+
+        host = target.hostname.encode('idna')
+        writer.write(b'\x05\x01\x00\x03' + bytes([len(host)]) + host + struct.pack('>H', target.port))
+        await writer.drain()
+        _, reply, _, atyp = await reader.readexactly(4)
+        if reply != 0:
+            raise ProxyError(f"SOCKS5 request rejected (0x{reply:02x})")
+        # Skip the bound address
+        if atyp == 1:
+            await reader.readexactly(4 + 2)
+        elif atyp == 4:
+            await reader.readexactly(16 + 2)
+        else:
+            await reader.readexactly((await reader.readexactly(1))[0] + 2)
+        return False
+
+
+class Target:
+    """An http(s) URL requested through the proxies: connector target, Host header and request forms."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"Unsupported test URL: {url}")
+        self.url = url
+        self.host = parts.netloc
+        self.hostname = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.tls = parts.scheme == 'https'
+        self.path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        # What the connectors open: the scheme, hostname and explicit port
+        self.parts = parts._replace(netloc=f"{parts.hostname}:{self.port}")
+
+    @property
+    def origin(self):
+        return self.tls, self.hostname, self.port
+
+
+CONNECTORS = {
+    'http': HttpConnector(),
+    'https': HttpConnector(),
+    'socks4': Socks4Connector(),
+    'socks5': Socks5Connector(),
+}
+
+
+class HostRateLimiter:
+    """
+    Spread the checks sent to the same proxy host (many lists expose several
+    ports on one IP) so that at most `rate` connections per second hit it.
+    """
+
+    def __init__(self, rate=None):
+        self.rate = rate
+        self._next_slot = {}
+
+    async def wait(self, host):
+        if not self.rate:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class AsyncProxyChecker:
+    """
+    Check thousands of proxies concurrently from a single thread.
+
+    Every check opens a TCP connection to the proxy, runs the handshake of its
+    protocol (see CONNECTORS), upgrades to TLS for https:// test URLs and sends
+    `probes` GETs over the same connection (keep-alive), recording connect,
+    TLS, time-to-first-byte and total times. Redirects are followed like
+    requests does, and a probe succeeds on the same rule as the threaded
+    checker (latency.is_working). A global semaphore bounds the in-flight
+    checks and a HostRateLimiter the connections per proxy host. The TLS
+    context and the parsed test URL are shared by every check.
+    """
+
+    def __init__(self, test_url="https://www.duckduckgo.com", timeout=5, concurrency=500, per_host_rate=None, probes=1):
+        self.test_url = test_url
+        self.target = Target(test_url)
+        if probes < 1:
+            raise ValueError("The number of probes must be at least 1.")
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.probes = probes
+        self.rate_limiter = HostRateLimiter(per_host_rate)
+        self.ssl_context = ssl.create_default_context()
+
+    @staticmethod
+    def _request(target, absolute, keep_alive=False):
+        return (f"GET {target.url if absolute else target.path} HTTP/1.1\r\nHost: {target.host}\r\nUser-Agent: {USER_AGENT}\r\n"
+                f"Accept: */*\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode('latin-1')
+
+    async def _open(self, ip, port, protocol, target, timing, start):
+        connector = CONNECTORS.get(protocol)
+        if connector is None:
+            raise ValueError(f"Unsupported protocol: {protocol}")
+
+        reader, writer = await asyncio.open_connection(ip, int(port))
+        try:
+            absolute = await connector.open(reader, writer, target.parts)
+            # A redirect to another origin opens a new connection, the timings are those of the first one
+            if timing.connect is None:
+                timing.connect = time.perf_counter() - start
+            if target.tls:
+                tls_start = time.perf_counter()
+                await writer.start_tls(self.ssl_context, server_hostname=target.hostname)
+                if timing.tls is None:
+                    timing.tls = time.perf_counter() - tls_start
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer, absolute
+
+    async def _probe(self, ip, port, protocol, connection, timing, keep_alive):
+        """
+        One GET of the test URL, on `connection` if given, following redirects.
+
+        :return: The connection if it can be reused by the next probe.
+        """
+        start = time.perf_counter()
+        target = self.target
+        for _ in range(MAX_REDIRECTS + 1):
+            if connection is None:
+                connection = await self._open(ip, port, protocol, target, timing, start)
+            reader, writer, absolute = connection
+            try:
+                writer.write(self._request(target, absolute, keep_alive))
+                await writer.drain()
+                status, headers, version = await _read_head(reader)
+                timing.ttfb = time.perf_counter() - start
+                reusable = await _read_body(reader, status, headers, version)
+            except BaseException:
+                writer.close()
+                raise
+            if status not in REDIRECT_STATUSES or 'location' not in headers:
+                break
+            redirect = Target(urljoin(target.url, headers['location']))
+            if not reusable or redirect.origin != target.origin:
+                writer.close()
+                connection = None
+            target = redirect
+        else:
+            if connection is not None:
+                connection[1].close()
+            raise ProxyError(f"More than {MAX_REDIRECTS} redirects")
+        timing.total = time.perf_counter() - start
+        timing.ok = is_working(status)
+        # The next probe requests the test URL again
+        if keep_alive and reusable and target.origin == self.target.origin:
+            return connection
+        writer.close()
+        return None
+
+    async def probe_proxy(self, ip, port, protocol, probes=None):
+        """
+        Probe one proxy `probes` times, reusing the connection while the server keeps it alive.
+
+        Each probe has its own `timeout`; a failed probe drops the connection and the next one reconnects.
+
+        :param ip: Proxy IP address.
+        :param port: Proxy port.
+        :param protocol: 'http', 'https', 'socks4' or 'socks5'.
+        :param probes: Number of probes. Defaults to the checker probes.
+        :return: A list of ProbeTiming.
+        """
+        probes = probes or self.probes
+        timings = []
+        connection = None
+        try:
+            for i in range(probes):
+                timing = ProbeTiming()
+                timings.append(timing)
+                try:
+                    connection = await asyncio.wait_for(
+                        self._probe(ip, port, protocol, connection, timing, keep_alive=i < probes - 1), self.timeout)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ProxyError, ValueError, ssl.SSLError):
+                    timing.ok = False
+                    if connection is not None:
+                        connection[1].close()
+                    connection = None
+        finally:
+            if connection is not None:
+                connection[1].close()
+        trace_timings(timings)
+        return timings
+
+    async def check_proxy(self, ip, port, protocol):
+        """
+        Check one proxy with a single probe.
+
+        :param ip: Proxy IP address.
+        :param port: Proxy port.
+        :param protocol: 'http', 'https', 'socks4' or 'socks5'.
+        :return: True if the test URL answered through the proxy within the timeout.
+        """
+        return (await self.probe_proxy(ip, port, protocol, probes=1))[0].ok
+
+    async def check_many(self, proxies, progress=None, tracker=None, on_result=None, collect=True):
+        """
+        Check (ip, port, protocol) tuples concurrently.
+
+        Checks start in the given order, so a prioritized list is checked
+        most-likely-first. Tasks are only created once the semaphore has a
+        free slot, so memory depends on `concurrency`, not on the list size.
+
+        :param proxies: Iterable of (ip, port, protocol).
+        :param progress: Optional tqdm bar, updated once per finished check.
+        :param tracker: Optional NeedTracker. Protocols with enough working proxies are not checked
+                        anymore and the run stops as soon as every protocol is satisfied.
+        :param on_result: Optional function called with every result as soon as it is available.
+        :param collect: Return the results. Disable it when they are only streamed through on_result.
+        :return: A list of result dictionaries in completion order (empty if collect is False).
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending = set()
+        results = []
+
+        async def worker(ip, port, protocol):
+            try:
+                await self.rate_limiter.wait(ip)
+                summary = quality_summary(await self.probe_proxy(ip, port, protocol))
+            finally:
+                semaphore.release()
+            if progress is not None:
+                progress.update()
+            if tracker is not None:
+                tracker.record(protocol, summary["status"])
+            result = {
+                "ip": ip,
+                "port": port,
+                "status": summary.pop("status"),
+                "protocol": protocol,
+                **summary,
+                "updated_at": datetime.now()
+            }
+            if on_result is not None:
+                on_result(result)
+            if collect:
+                results.append(result)
+
+        for ip, port, protocol in proxies:
+            await semaphore.acquire()
+            if tracker is not None and tracker.done:
+                semaphore.release()
+                break
+            if tracker is not None and tracker.satisfied(protocol):
+                semaphore.release()
+                continue
+            task = asyncio.create_task(worker(ip, port, protocol))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        while pending:
+            if tracker is not None and tracker.done:
+                for task in pending:
+                    task.cancel()
+            await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        return results
+
+    def run(self, proxies, tracker=None, on_result=None, collect=True, desc="Checking proxies asynchronously"):
+        """Blocking wrapper around check_many with a progress bar."""
+        total = len(proxies) if hasattr(proxies, '__len__') else None
+        with tracing.span("proxy.check_many", checks=total, concurrency=self.concurrency), tqdm(total=total, desc=desc) as progress:
+            return asyncio.run(self.check_many(proxies, progress, tracker, on_result, collect))
+
+
+if __name__ == "__main__":
+    # Throughput of the threaded and asyncio paths against local stub proxies.
+    # Run as `python -m modules.async_checker`
+    import tempfile
+    import pandas as pd
+
+    from .stubs import StubServers
+    from .proxy_checker import ProxyChecker
+
+    # Every protocol gets a live stub and a dead port, so both paths must agree on which checks pass
+    n_proxies, latency, dead_port = 400, 0.05, 1
+    with StubServers() as stubs, tempfile.TemporaryDirectory() as tmp_dir:
+        url = f"http://127.0.0.1:{stubs.start('target', latency=latency)}/"
+        rows = []
+        for protocol in CONNECTORS:
+            for port in (stubs.start(protocol, latency=latency), dead_port):
+                rows += [{'ip': '127.0.0.1', 'port': port, 'protocols': f"[ProtocolDataType(type={protocol}, port={port}, tls=false, autoRead=null)]"}] * (n_proxies // len(CONNECTORS) // 2)
+        csv_path = f"{tmp_dir}/stub-proxies.csv"
+        pd.DataFrame(rows).to_csv(csv_path, index=False)
+
+        def success_ratios(checker):
+            return checker.results_df.groupby(['protocol', 'port'])['status'].mean().rename('success ratio')
+
+        threaded = ProxyChecker(csv_path, test_url=url, store_path=':memory:')
+        start = time.perf_counter()
+        threaded.analyze_proxies_parallel(max_workers=10)
+        threaded_rate = len(threaded.df) / (time.perf_counter() - start)
+
+        asynchronous = ProxyChecker(csv_path, test_url=url, store_path=':memory:')
+        start = time.perf_counter()
+        asynchronous.analyze_proxies_async(concurrency=1000)
+        async_rate = len(asynchronous.df) / (time.perf_counter() - start)
+
+        print(pd.concat({'threaded': success_ratios(threaded), 'asyncio': success_ratios(asynchronous)}, axis=1).to_string())
+        assert success_ratios(threaded).equals(success_ratios(asynchronous)), "the threaded and asyncio paths disagree"
+        print(f"threaded (10 workers): {threaded_rate:.0f} checks/s, asyncio (concurrency 1000): {async_rate:.0f} checks/s")
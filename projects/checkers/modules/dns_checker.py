@@ -1,24 +1,44 @@
 import socket
 import ipinfo
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
+from common import tracing
+from .location import LocationService, LocationCache, PrefixDatabase, IpinfoProvider, IPINFO_URL
 
 load_dotenv("projects/checkers/modules/.env")
 
+@lru_cache(maxsize=None)
+def get_ipinfo_handler(token):
+    """Handler de ipinfo compartido por todas las instancias con el mismo token."""
+    return ipinfo.getHandler(token)
+
+@lru_cache(maxsize=None)
+def get_location_service(token, geo_db=None, ipinfo_url=IPINFO_URL):
+    """
+    Servicio de ubicación compartido: caché persistente (LRU + TTL), base de
+    prefijos local opcional (geo_db) y ipinfo.io por lotes para el resto.
+    """
+    offline = PrefixDatabase.load(geo_db) if geo_db else None
+    remote = IpinfoProvider(token, base_url=ipinfo_url) if token or ipinfo_url != IPINFO_URL else None
+    return LocationService(LocationCache(), offline=offline, remote=remote)
+
 class DNSInfo:
-    def __init__(self, domain=None):
+    def __init__(self, domain=None, geo_db=None, ipinfo_url=IPINFO_URL):
         self.domain = domain
         self.ipinfo_token = os.environ.get('IPINFO_TOKEN')
-        if self.ipinfo_token is None:
+        if self.ipinfo_token is None and geo_db is None and ipinfo_url == IPINFO_URL:
             raise ValueError("IPINFO_TOKEN is not set. Please provide it using the --token argument.")
-        self.ipinfo_handler = ipinfo.getHandler(self.ipinfo_token)
+        self.ipinfo_handler = get_ipinfo_handler(self.ipinfo_token) if self.ipinfo_token else None
+        self.location_service = get_location_service(self.ipinfo_token, geo_db, ipinfo_url)
 
     def get_ip_address(self):
         """Obtiene la dirección IP asociada al dominio."""
-        try:
-            return socket.gethostbyname(self.domain)
-        except socket.gaierror:
-            return None
+        with tracing.span("dns.gethostbyname", domain=self.domain):
+            try:
+                return socket.gethostbyname(self.domain)
+            except socket.gaierror:
+                return None
 
     def get_fqdn(self):
         """Obtiene el nombre de dominio totalmente calificado."""
@@ -62,8 +82,25 @@ class DNSInfo:
             }
 
     def get_location_info(self, ip=None):
-        """Obtiene la información de ubicación de la dirección IP proporcionada usando ipinfo.io."""
-        return self.ipinfo_handler.getDetails(ip_address=ip).details
+        """
+        Obtiene la información de ubicación de la dirección IP proporcionada.
+        Sin IP consulta la IP pública propia en ipinfo.io; con IP pasa por el
+        caché y la base de prefijos local antes de ir a ipinfo.io.
+        """
+        if ip is None:
+            if self.ipinfo_handler is None:
+                raise ValueError("IPINFO_TOKEN is required to look up the own IP location.")
+            with tracing.span("location.own_ip"):
+                return self.ipinfo_handler.getDetails().details
+        return self.get_locations([ip])[ip]
+
+    def get_locations(self, ips):
+        """Obtiene la ubicación de muchas IPs (diccionario ip -> detalles o None), en lotes de hasta 1000 por petición."""
+        with tracing.span("location.lookup_many", ips=len(ips)):
+            locations = self.location_service.lookup_many(ips)
+        with tracing.span("location.cache.save"):
+            self.location_service.save()
+        return locations
 
 def set_ipinfo_token(token):
     """Sets the IPINFO_TOKEN in a .env file."""
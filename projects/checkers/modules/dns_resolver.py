@@ -0,0 +1,370 @@
+import os
+import json
+import time
+import random
+import struct
+import asyncio
+import ipaddress
+from common import tracing
+
+DEFAULT_CACHE_PATH = "./data/output/dns-cache.json"
+DEFAULT_NAMESERVER = "1.1.1.1"
+
+TYPE_A, TYPE_NS, TYPE_CNAME, TYPE_SOA, TYPE_AAAA = 1, 2, 5, 6, 28
+TYPE_NAMES = {TYPE_A: "a", TYPE_NS: "ns", TYPE_CNAME: "cname", TYPE_AAAA: "aaaa"}
+# One pass per name: the CNAME chain comes back with the A/AAAA answers
+QUERY_TYPES = (TYPE_A, TYPE_AAAA, TYPE_NS)
+CLASS_IN = 1
+NEGATIVE_TTL = 300  # Upper bound for caching NXDOMAIN / empty answers
+MAX_TTL = 24 * 60 * 60
+
+
+class DNSError(Exception):
+    """Malformed DNS message or failed query."""
+
+
+def encode_name(name):
+    labels = [label for label in name.rstrip('.').split('.') if label]
+    encoded = b''
+    for label in labels:
+        raw = label.encode('idna')
+        if len(raw) > 63:
+            raise DNSError(f"Label too long in {name!r}")
+        encoded += bytes([len(raw)]) + raw
+    return encoded + b'\x00'
+
+
+def build_query(txid, name, qtype):
+    """DNS query message with recursion desired."""
+    return struct.pack('>HHHHHH', txid, 0x0100, 1, 0, 0, 0) + encode_name(name) + struct.pack('>HH', qtype, CLASS_IN)
+
+
+def decode_name(message, offset):
+    """Decode a (possibly compressed) name. Returns (name, offset after the name)."""
+    labels = []
+    end = None
+    for _ in range(128):  # Bounded to survive compression loops
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | message[offset + 1]
+        elif length == 0:
+            return '.'.join(labels), (end if end is not None else offset + 1)
+        else:
+            labels.append(message[offset + 1:offset + 1 + length].decode('ascii', 'replace'))
+            offset += 1 + length
+    raise DNSError("Compression loop in DNS name")
+
+
+def _decode_rdata(message, rtype, offset, length):
+    if rtype == TYPE_A and length == 4:
+        return '.'.join(map(str, message[offset:offset + 4]))
+    if rtype == TYPE_AAAA and length == 16:
+        return str(ipaddress.IPv6Address(bytes(message[offset:offset + 16])))
+    if rtype in (TYPE_NS, TYPE_CNAME):
+        return decode_name(message, offset)[0]
+    if rtype == TYPE_SOA:
+        offset = decode_name(message, offset)[1]
+        offset = decode_name(message, offset)[1]
+        return struct.unpack('>IIIII', message[offset:offset + 20])[-1]  # Negative caching TTL
+    return None
+
+
+def parse_response(message):
+    """
+    Parse a DNS response.
+
+    :return: A dictionary with id, rcode, truncated, answers [(name, type, ttl, value)] and negative_ttl.
+    """
+    if len(message) < 12:
+        raise DNSError("DNS message too short")
+    txid, flags, qdcount, ancount, nscount, _ = struct.unpack('>HHHHHH', message[:12])
+    offset = 12
+    try:
+        for _ in range(qdcount):
+            offset = decode_name(message, offset)[1] + 4
+        records = []
+        for _ in range(ancount + nscount):
+            name, offset = decode_name(message, offset)
+            rtype, rclass, ttl, length = struct.unpack('>HHIH', message[offset:offset + 10])
+            offset += 10
+            records.append((name.lower(), rtype, ttl, _decode_rdata(message, rtype, offset, length)))
+            offset += length
+    except (IndexError, struct.error):
+        raise DNSError("Truncated DNS message")
+    answers = records[:ancount]
+    negative_ttl = next((min(ttl, value) for _, rtype, ttl, value in records[ancount:] if rtype == TYPE_SOA and value is not None), None)
+    return {
+        'id': txid,
+        'rcode': flags & 0x000F,
+        'truncated': bool(flags & 0x0200),
+        'answers': answers,
+        'negative_ttl': negative_ttl,
+    }
+
+
+def system_nameserver(resolv_conf="/etc/resolv.conf"):
+    """First IPv4 nameserver of resolv.conf, or DEFAULT_NAMESERVER."""
+    try:
+        with open(resolv_conf, 'r') as file:
+            for line in file:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == 'nameserver' and ':' not in parts[1]:
+                    return parts[1]
+    except OSError:
+        pass
+    return DEFAULT_NAMESERVER
+
+
+class _DNSProtocol(asyncio.DatagramProtocol):
+    def __init__(self, pending):
+        self.pending = pending
+
+    def datagram_received(self, data, addr):
+        if len(data) < 2:
+            return
+        future = self.pending.get(struct.unpack('>H', data[:2])[0])
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        pass
+
+
+class DNSCache:
+    """
+    TTL-respecting cache of (name, type) -> records, kept in memory and saved
+    to a JSON file so later runs reuse the answers that have not expired.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, 'r') as file:
+                now = time.time()
+                self.entries = {key: value for key, value in json.load(file).items() if value[0] > now}
+
+    @staticmethod
+    def _key(name, qtype):
+        return f"{name}/{qtype}"
+
+    def get(self, name, qtype):
+        entry = self.entries.get(self._key(name, qtype))
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self.entries[self._key(name, qtype)]
+            return None
+        return entry[1]
+
+    def set(self, name, qtype, records, ttl):
+        if ttl > 0:
+            self.entries[self._key(name, qtype)] = [time.time() + min(ttl, MAX_TTL), records]
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        now = time.time()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump({key: value for key, value in self.entries.items() if value[0] > now}, file)
+        os.replace(tmp_path, self.path)
+
+
+class AsyncResolver:
+    """
+    Asyncio stub resolver over raw UDP.
+
+    All queries share one UDP socket and are matched to their answers by
+    transaction id. Answers are cached for their TTL (DNSCache), identical
+    queries in flight are sent once, and `concurrency` bounds the queries on
+    the wire. Truncated answers are used as they are (no TCP fallback).
+
+        async with AsyncResolver() as resolver:
+            records = await resolver.resolve("duckduckgo.com")
+    """
+
+    def __init__(self, nameserver=None, port=53, timeout=2.0, retries=2, concurrency=500, cache=None):
+        nameserver = nameserver or system_nameserver()
+        if nameserver.count(':') == 1:  # host:port
+            nameserver, port = nameserver.split(':')
+        self.nameserver = (nameserver, int(port))
+        self.timeout = timeout
+        self.retries = retries
+        self.concurrency = concurrency
+        self.cache = cache if cache is not None else DNSCache(None)
+        self.queries_sent = 0
+        self._pending = {}
+        self._inflight = {}
+        self._transport = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(lambda: _DNSProtocol(self._pending), remote_addr=self.nameserver)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._transport.close()
+
+    def _new_txid(self):
+        while True:
+            txid = random.getrandbits(16)
+            if txid not in self._pending:
+                return txid
+
+    async def _exchange(self, name, qtype):
+        async with self._semaphore:
+            for _ in range(self.retries + 1):
+                txid = self._new_txid()
+                future = asyncio.get_running_loop().create_future()
+                self._pending[txid] = future
+                try:
+                    self._transport.sendto(build_query(txid, name, qtype))
+                    self.queries_sent += 1
+                    tracing.count("dns.queries")
+                    sent = time.perf_counter()
+                    response = parse_response(await asyncio.wait_for(future, self.timeout))
+                    tracing.observe("dns.rtt", time.perf_counter() - sent)
+                    return response
+                except asyncio.TimeoutError:
+                    tracing.count("dns.timeouts")
+                    continue
+                finally:
+                    self._pending.pop(txid, None)
+        raise DNSError(f"No answer for {name} ({TYPE_NAMES.get(qtype, qtype)})")
+
+    async def _query(self, name, qtype):
+        response = await self._exchange(name, qtype)
+        if response['rcode'] not in (0, 3):  # NOERROR / NXDOMAIN are cacheable answers
+            raise DNSError(f"DNS error {response['rcode']} for {name}")
+        records = [(rtype, value) for _, rtype, _, value in response['answers'] if rtype in TYPE_NAMES and value is not None]
+        ttls = [ttl for _, rtype, ttl, _ in response['answers'] if rtype in TYPE_NAMES]
+        ttl = min(ttls) if ttls else min(response['negative_ttl'] or NEGATIVE_TTL, NEGATIVE_TTL)
+        self.cache.set(name, qtype, records, ttl)
+        return records
+
+    async def query(self, name, qtype):
+        """
+        Records of one (name, type): cached, joined to an identical query in flight, or sent.
+
+        :return: A list of (type, value) including the CNAME chain.
+        """
+        name = name.rstrip('.').lower()
+        records = self.cache.get(name, qtype)
+        if records is not None:
+            tracing.count("dns.cache_hits")
+            return records
+        key = (name, qtype)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._query(name, qtype))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await task
+
+    async def resolve(self, name):
+        """
+        A, AAAA, CNAME and NS records of a name, queried concurrently.
+
+        :return: A dictionary with domain, a, aaaa, cname, ns and error (None on success).
+        """
+        result = {'domain': name, 'a': [], 'aaaa': [], 'cname': [], 'ns': [], 'error': None}
+        answers = await asyncio.gather(*(self.query(name, qtype) for qtype in QUERY_TYPES), return_exceptions=True)
+        for answer in answers:
+            if isinstance(answer, Exception):
+                result['error'] = str(answer)
+                continue
+            for rtype, value in answer:
+                values = result[TYPE_NAMES[rtype]]
+                if value not in values:
+                    values.append(value)
+        return result
+
+    async def resolve_many(self, names, on_result=None):
+        """
+        Resolve many names concurrently (duplicates are resolved once).
+
+        :param names: Iterable of domain names.
+        :param on_result: Optional function called with every result as soon as it is available.
+        :return: The list of results, in input order.
+        """
+        async def resolve(name):
+            result = await self.resolve(name)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        return await asyncio.gather(*(resolve(name) for name in names))
+
+
+def resolve_domains(names, nameserver=None, concurrency=500, timeout=2.0, cache_path=DEFAULT_CACHE_PATH, on_result=None):
+    """
+    Blocking helper: resolve a list of domains with a cached AsyncResolver.
+
+    :return: The list of result dictionaries (see AsyncResolver.resolve).
+    """
+    cache = DNSCache(cache_path)
+
+    async def run():
+        async with AsyncResolver(nameserver, timeout=timeout, concurrency=concurrency, cache=cache) as resolver:
+            return await resolver.resolve_many(names, on_result)
+
+    try:
+        with tracing.span("dns.resolve_many", names=len(names), concurrency=concurrency):
+            return asyncio.run(run())
+    finally:
+        with tracing.span("dns.cache.save"):
+            cache.save()
+
+
+def read_domains(path):
+    """Domains of a text file, one per line, skipping blanks and # comments."""
+    with open(path, 'r', encoding='utf-8') as file:
+        return [line.split('#', 1)[0].strip() for line in file if line.split('#', 1)[0].strip()]
+
+
+if __name__ == "__main__":
+    # Batch resolution against a local stub DNS server vs blocking socket calls, tests/test_dns_resolver.py checks the answers.
+    # Run as `python -m modules.dns_resolver`
+    import socket
+    from .stubs import StubServers
+
+    n_domains, n_blocking, latency = 2000, 50, 0.02
+    names = [f"host-{i}.example.test" for i in range(n_domains)]
+    with StubServers() as stubs:
+        port = stubs.start_dns(latency=latency)
+
+        async def run(cache):
+            async with AsyncResolver('127.0.0.1', port, cache=cache) as resolver:
+                results = await resolver.resolve_many(names + names[:500])  # Duplicates are answered from in-flight queries/cache
+                return results, resolver.queries_sent
+
+        cache = DNSCache(None)
+        start = time.perf_counter()
+        results, sent = asyncio.run(run(cache))
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        _, sent_warm = asyncio.run(run(cache))
+        warm = time.perf_counter() - start
+
+        # DNSInfo makes 4 blocking lookups per name (gethostbyname, getfqdn, gethostbyname_ex, getaddrinfo),
+        # one name at a time. libc cannot be pointed at the stub, so a blocking socket sends 4 queries per name instead.
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect(('127.0.0.1', port))
+            start = time.perf_counter()
+            for name in names[:n_blocking]:
+                for qtype in (TYPE_A, TYPE_A, TYPE_A, TYPE_AAAA):
+                    sock.send(build_query(0, name, qtype))
+                    parse_response(sock.recv(4096))
+            blocking = (time.perf_counter() - start) / n_blocking
+
+        print(f"{len(results)} lookups ({n_domains} names): {sent} UDP queries in {cold:.2f}s, "
+              f"cached re-run {warm * 1000:.0f} ms ({sent_warm} queries); "
+              f"4 blocking lookups per name measured at {blocking * 1000:.0f} ms on {n_blocking} names, "
+              f"{blocking * n_domains:.0f}s extrapolated to {n_domains} names")
+        print(results[0])
@@ -0,0 +1,87 @@
+import statistics
+from common import tracing
+
+QUALITY_FIELDS = ("latency", "connect", "tls", "ttfb", "jitter", "success_ratio", "probes", "quality")
+
+
+def is_working(status):
+    """
+    Whether a probe answered with `status` (after following redirects) found a working proxy.
+
+    The single definition used by the threaded and the asyncio checkers.
+    """
+    return status == 200
+
+
+class ProbeTiming:
+    """
+    Timings of one probe through a proxy, in seconds (time.perf_counter).
+
+    connect: TCP connection to the proxy plus its handshake/tunnel (None when the connection was reused).
+    tls: TLS handshake with the test URL through the tunnel (None for http:// URLs or reused connections).
+    ttfb: From the start of the probe to the end of the response head (status line and headers), redirects included.
+    total: From the start of the probe to the end of the response.
+    """
+
+    __slots__ = ("ok", "connect", "tls", "ttfb", "total")
+
+    def __init__(self):
+        self.ok = False
+        self.connect = None
+        self.tls = None
+        self.ttfb = None
+        self.total = None
+
+
+def trace_timings(timings, prefix="proxy"):
+    """Add the probe timings to the tracing histograms (`prefix`.connect/tls/ttfb/total) and ok/failed counters."""
+    if not tracing.enabled():
+        return
+    for timing in timings:
+        for field in ("connect", "tls", "ttfb", "total"):
+            value = getattr(timing, field)
+            if value is not None:
+                tracing.observe(f"{prefix}.{field}", value)
+        tracing.count(f"{prefix}.ok" if timing.ok else f"{prefix}.failed")
+
+
+def jitter(values):
+    """Mean absolute difference between consecutive values (RFC 3550 style), 0 with fewer than two values."""
+    if len(values) < 2:
+        return 0.0
+    return sum(abs(b - a) for a, b in zip(values, values[1:])) / (len(values) - 1)
+
+
+def _median(values):
+    values = [value for value in values if value is not None]
+    return statistics.median(values) if values else None
+
+
+def quality_summary(timings):
+    """
+    Summarize the probes of one proxy.
+
+    The quality score is 100 * success_ratio / (1 + median_total + jitter),
+    with times in seconds: 100 for an always-working instant proxy, halved by
+    one second of latency or jitter, 0 if no probe worked.
+
+    :param timings: List of ProbeTiming.
+    :return: A dictionary with status, latency (median total), connect, tls, ttfb (medians),
+             jitter, success_ratio, probes and quality.
+    """
+    ok = [timing for timing in timings if timing.ok]
+    totals = [timing.total for timing in ok]
+    success_ratio = len(ok) / len(timings) if timings else 0.0
+    latency = _median(totals)
+    spread = jitter(totals)
+    return {
+        "status": bool(ok),
+        "latency": latency,
+        "connect": _median([timing.connect for timing in ok]),
+        "tls": _median([timing.tls for timing in ok]),
+        "ttfb": _median([timing.ttfb for timing in ok]),
+        "jitter": spread if ok else None,
+        "success_ratio": success_ratio,
+        "probes": len(timings),
+        "quality": round(100 * success_ratio / (1 + latency + spread), 2) if ok else 0.0,
+    }
@@ -1,81 +1,201 @@
+import time
 import pandas as pd
 import requests
 from datetime import datetime
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor
+from .async_checker import AsyncProxyChecker
+from .proxy_table import load_proxy_table
+from .scheduler import NeedTracker, schedule
+from .result_store import ResultStore, DEFAULT_STORE_PATH
+from .writers import ResultWriter
+from .latency import ProbeTiming, quality_summary, trace_timings, is_working
+from common import tracing
+
+# requests proxy URL scheme of each protocol, as the asyncio connectors speak them: https proxies are
+# HTTP proxies with CONNECT support, SOCKS proxies resolve the hostname (socks4a, socks5h)
+REQUESTS_PROXY_SCHEMES = {'http': 'http', 'https': 'http', 'socks4': 'socks4a', 'socks5': 'socks5h'}
+
+
+def requests_proxies(ip, port, protocol):
+    """
+    requests `proxies` mapping that sends the test URL through the proxy.
+
+    requests picks the proxy by the scheme of the requested URL, not by the
+    proxy protocol, so both http:// and https:// URLs map to the proxy.
+    """
+    url = f"{REQUESTS_PROXY_SCHEMES.get(protocol, protocol)}://{ip}:{port}"
+    return {'http': url, 'https': url}
+
 
 class ProxyChecker:
-    def __init__(self, csv_path, delimiter=",", timeout=5, test_url="https://www.duckduckgo.com"):
+    def __init__(self, csv_path, delimiter=",", timeout=5, test_url="https://www.duckduckgo.com", store_path=DEFAULT_STORE_PATH, keep_results=True, probes=1):
         self.csv_path = csv_path
-        self.df = pd.read_csv(csv_path, delimiter=delimiter)
+        self.delimiter = delimiter
+        # Parsed once (every protocol of every proxy) and cached next to the CSV
+        with tracing.span("proxy.load_table", path=csv_path):
+            self.table = load_proxy_table(csv_path, delimiter=delimiter)
+        self._df = None
         self.timeout = timeout
         self.test_url = test_url
+        # Probes per proxy, used for the latency median, jitter and success ratio
+        self.probes = probes
         self.protocol_list = ["http", "https", "socks4", "socks5"]
         self.results_df = pd.DataFrame()
+        # Set keep_results=False to only stream the results (store and writers) with flat memory
+        self.keep_results = keep_results
+        self.writers = []
+        # Every check result, also used as the history of the scheduler
+        self.store = ResultStore(store_path)
+        self.tracker = None
 
-    def check_proxy(self, ip, port, protocol):
-        proxies = {
-            protocol: f"{protocol}://{ip}:{port}"
+    @property
+    def df(self):
+        """Raw CSV content, only read when displayed."""
+        if self._df is None:
+            self._df = pd.read_csv(self.csv_path, delimiter=self.delimiter)
+        return self._df
+
+    @tracing.traced("proxy.schedule")
+    def scheduled_checks(self, need=None, ttl=None):
+        """
+        Checks ordered from the most to the least likely to work, without the proxies in backoff.
+
+        :param need: Stop once `need` working proxies per protocol are found (see NeedTracker).
+        :param ttl: Incremental mode: skip the proxies checked less than `ttl` seconds ago.
+        :return: The list of (ip, port, protocol) to check.
+        """
+        checks, skipped = schedule(self.table, self.store)
+        if skipped:
+            print(f"Skipping {skipped} proxies in backoff after consecutive failures.")
+        if ttl is not None:
+            total = len(checks)
+            checks = self.store.stale(checks, ttl)
+            print(f"Skipping {total - len(checks)} proxies checked in the last {ttl} seconds.")
+        self.tracker = NeedTracker(need, {protocol for _, _, protocol in checks})
+        return checks
+
+    def add_writer(self, writer):
+        """Stream every following result to a ResultWriter as soon as its check completes."""
+        self.writers.append(writer)
+
+    def _emit(self, result):
+        self.store.add(result)
+        for writer in self.writers:
+            writer.put(result)
+
+    def probe_proxy(self, ip, port, protocol, probes=None):
+        """
+        Probe a proxy `probes` times through one requests.Session, so the connection is reused.
+
+        requests does not expose connect/TLS times: only ttfb and total are recorded. With stream=True
+        session.get returns once the response head is read, so ttfb is measured from the start of the
+        probe, redirects included, as in the asyncio path.
+
+        :return: A list of ProbeTiming.
+        """
+        proxies = requests_proxies(ip, port, protocol)
+        timings = []
+        with requests.Session() as session:
+            for _ in range(probes or self.probes):
+                timing = ProbeTiming()
+                timings.append(timing)
+                start = time.perf_counter()
+                try:
+                    with session.get(self.test_url, proxies=proxies, timeout=self.timeout, stream=True) as response:
+                        timing.ttfb = time.perf_counter() - start
+                        response.content  # Read the body
+                except Exception:
+                    continue
+                timing.total = time.perf_counter() - start
+                timing.ok = is_working(response.status_code)
+        trace_timings(timings)
+        return timings
+
+    def _timed_check(self, ip, port, protocol):
+        """Probe a proxy and return its result dictionary, streamed to the store and writers right away."""
+        with tracing.span("proxy.check", protocol=protocol):
+            summary = quality_summary(self.probe_proxy(ip, port, protocol))
+        self.tracker.record(protocol, summary["status"])
+        result = {
+            "ip": ip,
+            "port": port,
+            "status": summary.pop("status"),
+            "protocol": protocol,
+            **summary,
+            "updated_at": datetime.now()
         }
-        try:
-            response = requests.get(self.test_url, proxies=proxies, timeout=self.timeout)
-            return response.status_code == 200
-        except:
-            return False
+        self._emit(result)
+        return result
+
+    def _finish(self, results):
+        with tracing.span("store.flush"):
+            self.store.flush()
+        if self.keep_results:
+            self.results_df = pd.concat([self.results_df, pd.DataFrame(results)], ignore_index=True)
+        if self.tracker.need is not None:
+            print(self.tracker.report())
 
-    def analyze_proxies(self):
+    def check_proxy(self, ip, port, protocol):
+        proxies = requests_proxies(ip, port, protocol)
+        with tracing.span("proxy.check", protocol=protocol):
+            try:
+                response = requests.get(self.test_url, proxies=proxies, timeout=self.timeout)
+                ok = is_working(response.status_code)
+            except:
+                ok = False
+        tracing.count("proxy.ok" if ok else "proxy.failed")
+        return ok
+
+    @tracing.traced()
+    def analyze_proxies(self, need=None, ttl=None):
         data_to_append = []
-        for index, row in tqdm(self.df.iterrows(), total=self.df.shape[0], desc="Checking proxies"):
-            protocol = row['protocols'].split(",")[0].split("(")[1].split(",")[0].split("=")[1]
-            ip = row['ip']
-            port = row['port']
-            is_active = self.check_proxy(ip, port, protocol)
-
-            data_to_append.append({
-                "ip": ip,
-                "port": port,
-                "status": is_active,
-                "protocol": protocol,
-                "updated_at": datetime.now()
-            })
-
-        self.results_df = pd.concat([self.results_df, pd.DataFrame(data_to_append)], ignore_index=True)
-
-    def analyze_proxies_parallel(self, max_workers=10):
+        checks = self.scheduled_checks(need, ttl)
+        for ip, port, protocol in tqdm(checks, total=len(checks), desc="Checking proxies"):
+            if self.tracker.done:
+                break
+            if self.tracker.satisfied(protocol):
+                continue
+            result = self._timed_check(ip, port, protocol)
+            if self.keep_results:
+                data_to_append.append(result)
+
+        self._finish(data_to_append)
+
+    @tracing.traced()
+    def analyze_proxies_parallel(self, max_workers=10, need=None, ttl=None):
         """Analyze proxies using parallel requests."""
+        checks = self.scheduled_checks(need, ttl)
 
-        def worker(data):
-            _, row = data
-            protocol = row['protocols'].split(",")[0].split("(")[1].split(",")[0].split("=")[1]
-            ip = row['ip']
-            port = row['port']
-            is_active = self.check_proxy(ip, port, protocol)
-            return {
-                "ip": ip,
-                "port": port,
-                "status": is_active,
-                "protocol": protocol,
-                "updated_at": datetime.now()
-            }
+        def worker(check):
+            ip, port, protocol = check
+            if self.tracker.satisfied(protocol):
+                return None
+            return self._timed_check(ip, port, protocol)
 
+        results = []
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            results = list(tqdm(executor.map(worker, self.df.iterrows()), total=self.df.shape[0], desc="Checking proxies in parallel"))
-
-        self.results_df = pd.concat([self.results_df, pd.DataFrame(results)], ignore_index=True)
-
-    def save_output(self, output_path, keep_online=False, filter_protocol=None, file_format="csv"):
-        df_to_save = self.results_df.copy()
-        if keep_online:
-            df_to_save = df_to_save[df_to_save['status'] == True]
-
-        if filter_protocol in self.protocol_list:
-            df_to_save = df_to_save[df_to_save['protocol'].str.contains(filter_protocol)]
-        
-        if file_format == "csv":
-            df_to_save.to_csv(output_path, index=False, encoding="utf-8", sep=",")
-        elif file_format == "json":
-            df_to_save.to_json(output_path, orient="records", lines=True)
-        elif file_format == "txt":
-            with open(output_path, "w") as f:
-                for index, row in df_to_save.iterrows():
-                    f.write(f"{row['protocol']}://{row['ip']}:{row['port']}\n")
+            for result in tqdm(executor.map(worker, checks), total=len(checks), desc="Checking proxies in parallel"):
+                if result is not None and self.keep_results:
+                    results.append(result)
+
+        self._finish(results)
+
+    @tracing.traced()
+    def analyze_proxies_async(self, concurrency=500, per_host_rate=None, need=None, ttl=None):
+        """Analyze proxies with the asyncio engine, keeping up to `concurrency` checks in flight."""
+        checks = self.scheduled_checks(need, ttl)
+        engine = AsyncProxyChecker(self.test_url, timeout=self.timeout, concurrency=concurrency, per_host_rate=per_host_rate, probes=self.probes)
+        self._finish(engine.run(checks, tracker=self.tracker, on_result=self._emit, collect=self.keep_results))
+
+    def query_store(self, protocol=None, max_latency=None, limit=None):
+        """Online proxies from the result store, fastest first, as a DataFrame."""
+        return pd.DataFrame(self.store.query(protocol, online=True, max_latency=max_latency, limit=limit),
+                            columns=["ip", "port", "protocol", "status", "latency", "last_checked"])
+
+    def save_output(self, output_path, keep_online=False, filter_protocol=None, file_format="csv", sort_by=None):
+        """Write the collected results_df. To stream the results while checking, use add_writer instead."""
+        with ResultWriter(output_path, file_format, keep_online=keep_online,
+                          filter_protocol=filter_protocol if filter_protocol in self.protocol_list else None, sort_by=sort_by) as writer:
+            for result in self.results_df.to_dict("records"):
+                writer.put(result)
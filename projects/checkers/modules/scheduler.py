@@ -0,0 +1,160 @@
+import time
+import threading
+import numpy as np
+
+from .proxy_table import PROTOCOLS
+
+BACKOFF_BASE = 15 * 60  # Seconds skipped after the first failure, doubled on every consecutive one
+BACKOFF_MAX = 24 * 60 * 60
+CSV_PSEUDO_CHECKS = 10  # Weight of the list's own connection attempts against our results
+
+
+def backoff_delay(consecutive_failures, base=BACKOFF_BASE, maximum=BACKOFF_MAX):
+    """Seconds to wait before re-checking a proxy that failed `consecutive_failures` times in a row."""
+    if consecutive_failures <= 0:
+        return 0
+    return min(base * 2 ** (consecutive_failures - 1), maximum)
+
+
+def schedule(table, history=None, now=None, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+    """
+    Order the checks of a ProxyTable from the most to the least likely to work.
+
+    The likelihood is a Beta-smoothed success ratio that combines the
+    connection attempts reported in the list (scaled down to
+    CSV_PSEUDO_CHECKS checks, as they were measured elsewhere and earlier)
+    with our own past results. Ties are broken by the median ping reported by
+    the list. Proxies in exponential backoff after consecutive failures are
+    left out.
+
+    Parameters
+    ----------
+    table : ProxyTable
+        Parsed proxy list.
+    history : ResultStore, optional
+        Results of previous runs.
+    now : float, optional
+        Epoch time used for the backoff. Defaults to time.time().
+    backoff_base, backoff_max : float
+        Backoff after the first failure and its upper bound, in seconds.
+
+    Returns
+    -------
+    tuple
+        (checks, skipped): the ordered list of (ip, port, protocol) and the number of checks in backoff.
+    """
+    now = time.time() if now is None else now
+    proxy = table.protocol_proxy
+    success = table.success.sum(axis=1)[proxy].astype(float)
+    attempts = success + table.fail.sum(axis=1)[proxy]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        csv_successes = np.where(attempts > 0, CSV_PSEUDO_CHECKS * success / attempts, 0)
+        csv_checks = np.where(attempts > 0, CSV_PSEUDO_CHECKS, 0)
+        pings = np.where(table.ping > 0, table.ping, np.nan)[proxy]
+        ping = np.nanmedian(pings, axis=1) if pings.size else np.empty(0)
+    ping = np.where(np.isnan(ping), np.inf, ping)
+
+    ips = table.ip[proxy].tolist()
+    ports = table.protocol_port.tolist()
+    protocols = [PROTOCOLS[code] for code in table.protocol.tolist()]
+
+    own_successes = np.zeros(len(ips))
+    own_checks = np.zeros(len(ips))
+    skip = np.zeros(len(ips), dtype=bool)
+    if history is not None:
+        for i, check in enumerate(zip(ips, ports, protocols)):
+            entry = history.get(*check)
+            if entry is None:
+                continue
+            successes, failures, consecutive, last_checked, _ = entry
+            own_successes[i], own_checks[i] = successes, successes + failures
+            skip[i] = now < last_checked + backoff_delay(consecutive, backoff_base, backoff_max)
+
+    likelihood = (csv_successes + own_successes + 1) / (csv_checks + own_checks + 2)
+    order = np.lexsort((ping, -likelihood))
+    order = order[~skip[order]]
+    return [(ips[i], ports[i], protocols[i]) for i in order.tolist()], int(skip.sum())
+
+
+class NeedTracker:
+    """
+    Count working proxies per protocol for the --need mode and record the time
+    it took to find the first N of each one. Thread-safe, so it can be shared
+    by the threaded and asyncio paths.
+    """
+
+    def __init__(self, need=None, protocols=PROTOCOLS):
+        self.need = need
+        self.protocols = set(protocols)
+        self.found = dict.fromkeys(self.protocols, 0)
+        self.time_to_need = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def satisfied(self, protocol):
+        return self.need is not None and self.found.get(protocol, 0) >= self.need
+
+    @property
+    def done(self):
+        return self.need is not None and all(self.satisfied(protocol) for protocol in self.protocols)
+
+    def record(self, protocol, status):
+        if not status:
+            return
+        with self._lock:
+            self.found[protocol] = self.found.get(protocol, 0) + 1
+            if self.need is not None and self.found[protocol] == self.need:
+                self.time_to_need[protocol] = time.perf_counter() - self._start
+
+    def report(self):
+        """Printable summary of the time-to-first-N metric."""
+        if self.need is None:
+            return ""
+        times = ", ".join(
+            f"{protocol} {self.time_to_need[protocol]:.1f}s" if protocol in self.time_to_need
+            else f"{protocol} not reached ({self.found.get(protocol, 0)} found)"
+            for protocol in sorted(self.protocols)
+        )
+        return f"Time to first {self.need} working proxies: {times}"
+
+
+if __name__ == "__main__":
+    # Time to the first N working proxies, file order vs scheduled order, against local stubs.
+    # Run as `python -m modules.scheduler`
+    import random
+    import pandas as pd
+
+    from .stubs import StubServers
+    from .proxy_table import ProxyTable
+    from .async_checker import AsyncProxyChecker
+
+    n_proxies, need, live_ratio = 2000, 20, 0.05
+    rng = random.Random(0)
+    with StubServers() as stubs:
+        url = f"http://127.0.0.1:{stubs.start('target')}/"
+        live = {protocol: stubs.start(protocol, latency=0.05) for protocol in ('http', 'socks5')}
+        # Dead proxies accept the connection and never answer, burning the whole timeout
+        dead = {protocol: stubs.start(protocol, latency=60) for protocol in ('http', 'socks5')}
+
+        rows = []
+        for i in range(n_proxies):
+            protocol = ('http', 'socks5')[i % 2]
+            alive = rng.random() < live_ratio
+            success = rng.randint(20, 60) if alive else rng.randint(0, 5)
+            endpoint = f"EndpointServerData(ping={rng.randint(100, 900)}, connections=ConnectionAttempts(success={success}, fail={80 - success}), uptime={success / 0.8:.1f}%, visibleIp=null)"
+            rows.append({
+                'ip': '127.0.0.1',
+                'port': (live if alive else dead)[protocol],
+                'protocols': f"[ProtocolDataType(type={protocol}, port={(live if alive else dead)[protocol]}, tls=false, autoRead=null)]",
+                'connections': f"PerformanceConnectData(aws_NA={endpoint}, ora_UK={endpoint}, ora_JP={endpoint}, ms_HK={endpoint})",
+            })
+        table = ProxyTable.from_frame(pd.DataFrame(rows))
+        engine = AsyncProxyChecker(url, timeout=1, concurrency=100)
+
+        file_order = list(table.checks())
+        scheduled, _ = schedule(table)
+        for name, checks in (("file order", file_order), ("scheduled", scheduled)):
+            tracker = NeedTracker(need, ('http', 'socks5'))
+            start = time.perf_counter()
+            results = engine.run(checks, tracker=tracker, desc=name)
+            print(f"{name}: {len(results)} checks in {time.perf_counter() - start:.1f}s. {tracker.report()}")
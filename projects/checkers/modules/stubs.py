@@ -0,0 +1,378 @@
+import json
+import random
+import struct
+import asyncio
+import zlib
+import ipaddress
+import threading
+
+from .dns_resolver import encode_name, TYPE_A, TYPE_AAAA, TYPE_CNAME, TYPE_NS, TYPE_SOA, CLASS_IN
+
+HTTP_OK = b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 2\r\nConnection: close\r\n\r\nOK"
+HTTP_UNAVAILABLE = b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+
+
+async def _pipe(reader, writer):
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _read_headers(reader):
+    lines = []
+    while True:
+        line = await reader.readline()
+        if not line or line in (b'\r\n', b'\n'):
+            return lines
+        lines.append(line)
+
+
+class StubBehaviour:
+    """Latency (seconds) added before answering and probability of failing a request."""
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+
+    async def delay(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def fails(self):
+        return self.failure_rate and self._random.random() < self.failure_rate
+
+
+async def target_handler(reader, writer, behaviour):
+    """
+    Minimal HTTP origin server: answers every request with 200 OK (or 503 on
+    injected failures), keeping the connection alive unless asked to close it.
+    """
+    try:
+        while True:
+            headers = await _read_headers(reader)
+            if not headers:
+                break
+            await behaviour.delay()
+            keep_alive = not any(line.lower().startswith(b'connection: close') for line in headers)
+            response = HTTP_UNAVAILABLE if behaviour.fails() else HTTP_OK
+            writer.write(response if not keep_alive else response.replace(b'Connection: close', b'Connection: keep-alive'))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def http_proxy_handler(reader, writer, behaviour):
+    """HTTP proxy supporting CONNECT tunnels and absolute-form requests."""
+    try:
+        request_line = await reader.readline()
+        headers = await _read_headers(reader)
+        await behaviour.delay()
+        if behaviour.fails():
+            writer.close()
+            return
+
+        method, target, version = request_line.decode('latin-1').split()
+        if method == 'CONNECT':
+            host, port = target.rsplit(':', 1)
+            upstream_reader, upstream_writer = await asyncio.open_connection(host, int(port))
+            writer.write(b"HTTP/1.1 200 Connection established\r\n\r\n")
+            await writer.drain()
+        else:
+            # http://host:port/path -> origin-form request to host:port
+            hostport, _, path = target.split('://', 1)[1].partition('/')
+            host, _, port = hostport.partition(':')
+            upstream_reader, upstream_writer = await asyncio.open_connection(host, int(port or 80))
+            upstream_writer.write(f"{method} /{path} {version}\r\n".encode('latin-1') + b''.join(headers) + b"\r\n")
+        await asyncio.gather(_pipe(reader, upstream_writer), _pipe(upstream_reader, writer))
+    except (ConnectionError, ValueError, OSError):
+        writer.close()
+
+
+async def socks_proxy_handler(reader, writer, behaviour):
+    """SOCKS4/4a and SOCKS5 (no authentication, CONNECT only) proxy."""
+    try:
+        version = (await reader.readexactly(1))[0]
+        await behaviour.delay()
+        fails = behaviour.fails()
+
+        if version == 4:
+            _, port = struct.unpack('>BH', await reader.readexactly(3))
+            address = await reader.readexactly(4)
+            await reader.readuntil(b'\x00')  # user id
+            host = (await reader.readuntil(b'\x00'))[:-1].decode() if address[:3] == b'\x00\x00\x00' else '.'.join(map(str, address))
+            if fails:
+                writer.write(b'\x00\x5b' + b'\x00' * 6)
+                writer.close()
+                return
+            upstream_reader, upstream_writer = await asyncio.open_connection(host, port)
+            writer.write(b'\x00\x5a' + b'\x00' * 6)
+        elif version == 5:
+            methods = await reader.readexactly((await reader.readexactly(1))[0])
+            writer.write(b'\x05\x00' if 0 in methods else b'\x05\xff')
+            _, _, _, atyp = await reader.readexactly(4)
+            if atyp == 1:
+                host = '.'.join(map(str, await reader.readexactly(4)))
+            elif atyp == 3:
+                host = (await reader.readexactly((await reader.readexactly(1))[0])).decode()
+            else:
+                raise ValueError("IPv6 is not supported by the stub")
+            port = struct.unpack('>H', await reader.readexactly(2))[0]
+            if fails:
+                writer.write(b'\x05\x01\x00\x01' + b'\x00' * 6)
+                writer.close()
+                return
+            upstream_reader, upstream_writer = await asyncio.open_connection(host, port)
+            writer.write(b'\x05\x00\x00\x01' + b'\x00' * 6)
+        else:
+            writer.close()
+            return
+        await writer.drain()
+        await asyncio.gather(_pipe(reader, upstream_writer), _pipe(upstream_reader, writer))
+    except (ConnectionError, ValueError, OSError, asyncio.IncompleteReadError):
+        writer.close()
+
+
+def synthetic_zone(name):
+    """
+    Records of the stub DNS server for any name: nx-* names do not exist,
+    www.<name> is a CNAME to <name>, every other name gets a stable A, AAAA
+    and two NS records.
+    """
+    labels = name.split('.')
+    if labels[0].startswith('nx-'):
+        return None
+    if labels[0] == 'www' and len(labels) > 2:
+        return {TYPE_CNAME: ['.'.join(labels[1:])]}
+    digest = zlib.crc32(name.encode())
+    zone = '.'.join(labels[-2:])
+    return {
+        TYPE_A: [f"10.{digest >> 16 & 255}.{digest >> 8 & 255}.{digest & 255}"],
+        TYPE_AAAA: [f"fd00::{digest >> 16:x}:{digest & 0xffff:x}"],
+        TYPE_NS: [f"ns1.{zone}", f"ns2.{zone}"],
+    }
+
+
+def _rdata(rtype, value):
+    if rtype == TYPE_A:
+        return bytes(map(int, value.split('.')))
+    if rtype == TYPE_AAAA:
+        return ipaddress.IPv6Address(value).packed
+    return encode_name(value)
+
+
+def dns_answer(query, zone=synthetic_zone, ttl=300):
+    """Answer a DNS query message, following CNAMEs inside the zone."""
+    txid, = struct.unpack('>H', query[:2])
+    offset, labels = 12, []
+    while query[offset]:
+        labels.append(query[offset + 1:offset + 1 + query[offset]].decode())
+        offset += 1 + query[offset]
+    question = query[12:offset + 5]
+    qtype, = struct.unpack('>H', query[offset + 1:offset + 3])
+    name = '.'.join(labels).lower()
+
+    answers, rcode = [], 0
+    records = zone(name)
+    if records is None:
+        rcode = 3
+    while records is not None:
+        for value in records.get(qtype, []):
+            answers.append((name, qtype, value))
+        if TYPE_CNAME in records and qtype != TYPE_CNAME:
+            target = records[TYPE_CNAME][0]
+            answers.append((name, TYPE_CNAME, target))
+            name, records = target, zone(target)
+        else:
+            break
+
+    body = b''.join(encode_name(owner) + struct.pack('>HHIH', rtype, CLASS_IN, ttl, len(_rdata(rtype, value))) + _rdata(rtype, value)
+                    for owner, rtype, value in answers)
+    authority = b''
+    if not answers:
+        soa = encode_name('ns1.test') + encode_name('hostmaster.test') + struct.pack('>IIIII', 1, 3600, 600, 86400, 60)
+        authority = encode_name('test') + struct.pack('>HHIH', TYPE_SOA, CLASS_IN, ttl, len(soa)) + soa
+    header = struct.pack('>HHHHHH', txid, 0x8180 | rcode, 1, len(answers), 1 if authority else 0, 0)
+    return header + question + body + authority
+
+
+class _StubDNSProtocol(asyncio.DatagramProtocol):
+    def __init__(self, zone, behaviour):
+        self.zone = zone
+        self.behaviour = behaviour
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if self.behaviour.fails():
+            return  # Dropped, the client has to retry
+        response = dns_answer(data, self.zone)
+        asyncio.get_running_loop().call_later(self.behaviour.latency, self.transport.sendto, response, addr)
+
+
+def synthetic_location(ip):
+    """Stable location details for any IP, shaped like an ipinfo.io answer."""
+    digest = zlib.crc32(ip.encode())
+    return {
+        'ip': ip,
+        'city': f"City{digest % 1000}",
+        'region': f"Region{digest % 100}",
+        'country': ('US', 'DE', 'CL', 'JP', 'BR')[digest % 5],
+        'loc': f"{(digest % 18000) / 100 - 90:.4f},{(digest >> 8) % 36000 / 100 - 180:.4f}",
+        'org': f"AS{digest % 65536} Stub Networks",
+        'timezone': 'UTC',
+    }
+
+
+async def ipinfo_handler(reader, writer, behaviour):
+    """
+    Stub of the ipinfo.io API: GET /<ip>[/json] and POST /batch with a JSON
+    list of IPs, answered with synthetic_location() (429 on injected failures).
+    """
+    try:
+        while True:
+            request_line = await reader.readline()
+            headers = await _read_headers(reader)
+            if not request_line:
+                break
+            method, target = request_line.decode().split()[:2]
+            length = next((int(line.split(b':', 1)[1]) for line in headers if line.lower().startswith(b'content-length:')), 0)
+            body = await reader.readexactly(length) if length else b''
+            await behaviour.delay()
+            path = target.split('?', 1)[0].strip('/')
+            status = '200 OK'
+            if behaviour.fails():
+                status, payload = '429 Too Many Requests', {'error': 'rate limited'}
+            elif method == 'POST' and path == 'batch':
+                payload = {ip: synthetic_location(ip) for ip in json.loads(body)}
+            else:
+                payload = synthetic_location(path.split('/')[0])
+            data = json.dumps(payload).encode()
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                         f"Connection: keep-alive\r\n\r\n".encode() + data)
+            await writer.drain()
+    except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+HANDLERS = {
+    'ipinfo': ipinfo_handler,
+    'target': target_handler,
+    'http': http_proxy_handler,
+    'https': http_proxy_handler,
+    'socks4': socks_proxy_handler,
+    'socks5': socks_proxy_handler,
+}
+
+
+class StubServers:
+    """
+    Local stub servers running on an event loop in a background thread.
+
+    Used to test and benchmark the proxy checkers without network access:
+
+        with StubServers() as stubs:
+            target = stubs.start('target', latency=0.05)
+            proxy = stubs.start('socks5', failure_rate=0.2)
+            url = f"http://127.0.0.1:{target}/"
+    """
+
+    def __init__(self, host='127.0.0.1'):
+        self.host = host
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._servers = []
+        self._transports = []
+        self._handlers = set()  # Connection handler tasks, cancelled on stop
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self, kind, latency=0.0, failure_rate=0.0, seed=None):
+        """
+        Start a stub server and return its port.
+
+        :param kind: 'target', 'http', 'https', 'socks4' or 'socks5'.
+        :param latency: Seconds added before every answer.
+        :param failure_rate: Probability (0-1) of failing a request.
+        """
+        behaviour = StubBehaviour(latency, failure_rate, seed)
+        handler = HANDLERS[kind]
+
+        async def handle(reader, writer):
+            task = asyncio.current_task()
+            self._handlers.add(task)
+            try:
+                await handler(reader, writer, behaviour)
+            except asyncio.CancelledError:
+                writer.close()  # Cancelled by stop(): end normally, asyncio logs handler tasks that end cancelled
+            finally:
+                self._handlers.discard(task)
+
+        async def serve():
+            return await asyncio.start_server(handle, self.host, 0, backlog=4096)
+
+        server = asyncio.run_coroutine_threadsafe(serve(), self.loop).result()
+        self._servers.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    def start_dns(self, zone=synthetic_zone, latency=0.0, failure_rate=0.0, seed=None):
+        """
+        Start a UDP stub DNS server and return its port.
+
+        :param zone: Function name -> {record type: [values]} or None for NXDOMAIN.
+        :param latency: Seconds before every answer.
+        :param failure_rate: Probability (0-1) of dropping a query.
+        """
+        behaviour = StubBehaviour(latency, failure_rate, seed)
+
+        async def serve():
+            return await self.loop.create_datagram_endpoint(lambda: _StubDNSProtocol(zone, behaviour), local_addr=(self.host, 0))
+
+        transport, _ = asyncio.run_coroutine_threadsafe(serve(), self.loop).result()
+        self._transports.append(transport)
+        return transport.get_extra_info('sockname')[1]
+
+    def stop(self):
+        """Close the servers, cancel the open connections (and their tunnels) and stop the loop."""
+        async def close():
+            # Let the connections already made start their handler (a few loop iterations:
+            # accept, transport, handler task), then stop accepting and cancel every handler
+            await asyncio.sleep(0.01)
+            for server in self._servers:
+                server.close()
+            for transport in self._transports:
+                transport.close()
+            while self._handlers:
+                handlers = list(self._handlers)
+                for task in handlers:
+                    task.cancel()
+                await asyncio.gather(*handlers, return_exceptions=True)
+            for server in self._servers:
+                await server.wait_closed()
+
+        if self._thread.is_alive():
+            asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop.close()
@@ -0,0 +1,183 @@
+import io
+import csv
+import json
+import queue
+import threading
+from datetime import datetime
+
+FORMATS = ("csv", "json", "jsonl", "txt")
+# Sort keys: fastest / best first, results without a value last
+SORT_KEYS = {
+    "latency": lambda result: (result.get("latency") is None, result.get("latency") or 0),
+    "quality": lambda result: -(result.get("quality") or 0),
+}
+_CLOSE = object()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ResultWriter:
+    """
+    Stream check results to a csv, jsonl ("json" is an alias) or txt file.
+
+    Results are put on a bounded queue as each check completes and a
+    background thread writes them in batches, flushing after every batch so
+    downstream tools can read partial results right away. The queue blocks
+    the checkers when the disk falls behind, so memory stays flat however
+    large the proxy list is. keep_online/filter_protocol are applied in the
+    stream. With `sort_by` ('latency' or 'quality') the accepted results are
+    held until close() and written sorted instead.
+
+        with ResultWriter("./data/output/proxies.txt", "txt", keep_online=True) as writer:
+            writer.put({"ip": "1.2.3.4", "port": 1080, "protocol": "socks5", "status": True})
+    """
+
+    def __init__(self, path, file_format="csv", keep_online=False, filter_protocol=None, batch_size=256, queue_size=1024, sort_by=None):
+        if file_format not in FORMATS:
+            raise ValueError(f"Unsupported output format: {file_format}. Options: {', '.join(FORMATS)}.")
+        if sort_by is not None and sort_by not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort_by}. Options: {', '.join(SORT_KEYS)}.")
+        self.path = path
+        self.file_format = file_format
+        self.keep_online = keep_online
+        self.filter_protocol = filter_protocol
+        self.batch_size = batch_size
+        self.sort_by = sort_by
+        self.written = 0
+        self._held = []
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._fieldnames = None
+        self._error = None
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def accepts(self, result):
+        if self.keep_online and result["status"] is not True:
+            return False
+        if self.filter_protocol and self.filter_protocol not in result["protocol"]:
+            return False
+        return True
+
+    def put(self, result):
+        """Queue a result for writing, blocking while the queue is full."""
+        if self._error is not None:
+            raise self._error
+        if not self.accepts(result):
+            return
+        if self.sort_by is not None:
+            self._held.append(result)
+        else:
+            self._queue.put(result)
+
+    def close(self):
+        """Write the queued results and close the file."""
+        if self._thread.is_alive():
+            if self._held:
+                for result in sorted(self._held, key=SORT_KEYS[self.sort_by]):
+                    self._queue.put(result)
+                self._held = []
+            self._queue.put(_CLOSE)
+            self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            raise self._error
+
+    def _format(self, batch):
+        if self.file_format == "txt":
+            return "".join(f"{result['protocol']}://{result['ip']}:{result['port']}\n" for result in batch)
+        if self.file_format in ("json", "jsonl"):
+            return "".join(json.dumps(result, default=_json_default) + "\n" for result in batch)
+
+        buffer = io.StringIO()
+        if self._fieldnames is None:
+            self._fieldnames = list(batch[0].keys())
+            csv.writer(buffer).writerow(self._fieldnames)
+        csv.DictWriter(buffer, self._fieldnames, extrasaction="ignore").writerows(batch)
+        return buffer.getvalue()
+
+    def _run(self):
+        closing = False
+        while not closing:
+            batch = [self._queue.get()]
+            # Take whatever is already queued, up to batch_size, without waiting for more
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _CLOSE:
+                closing = True
+                batch.pop()
+            if not batch or self._error is not None:
+                continue
+            try:
+                self._file.write(self._format(batch))
+                self._file.flush()
+                self.written += len(batch)
+            except Exception as err:  # Surfaced to the producer on the next put/close
+                self._error = err
+
+
+def write_results(results, path, file_format="csv", keep_online=False, filter_protocol=None, sort_by=None):
+    """
+    Write an iterable of result dictionaries with a ResultWriter.
+
+    :return: The number of results written.
+    """
+    with ResultWriter(path, file_format, keep_online=keep_online, filter_protocol=filter_protocol, sort_by=sort_by) as writer:
+        for result in results:
+            writer.put(result)
+    return writer.written
+
+
+if __name__ == "__main__":
+    # Streamed writer vs the DataFrame copy + iterrows txt path of save_output
+    import os
+    import time
+    import random
+    import tempfile
+    import tracemalloc
+    import pandas as pd
+
+    rng = random.Random(0)
+
+    def results(n):
+        for i in range(n):
+            yield {"ip": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}", "port": rng.choice((80, 1080, 8080)),
+                   "status": rng.random() < 0.3, "protocol": rng.choice(("http", "https", "socks4", "socks5")),
+                   "latency": rng.uniform(0.05, 5), "updated_at": datetime.now()}
+
+    n = 200000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tracemalloc.start()
+        start = time.perf_counter()
+        df = pd.DataFrame(list(results(n)))
+        df_to_save = df.copy()
+        df_to_save = df_to_save[df_to_save['status'] == True]
+        with open(os.path.join(tmp_dir, "old.txt"), "w") as f:
+            for index, row in df_to_save.iterrows():
+                f.write(f"{row['protocol']}://{row['ip']}:{row['port']}\n")
+        old_time = time.perf_counter() - start
+        old_peak = tracemalloc.get_traced_memory()[1]
+        del df, df_to_save
+        tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        written = write_results(results(n), os.path.join(tmp_dir, "new.txt"), "txt", keep_online=True)
+        new_time = time.perf_counter() - start
+        new_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"{n} results, {written} online: DataFrame + iterrows {old_time:.2f}s / {old_peak / 2 ** 20:.0f} MiB peak, "
+              f"streamed writer {new_time:.2f}s / {new_peak / 2 ** 20:.1f} MiB peak")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules package is imported from the checkers directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
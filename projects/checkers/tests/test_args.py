@@ -0,0 +1,60 @@
+import argparse
+
+import pytest
+
+from modules import args as cli
+
+
+class FakeDNSInfo:
+    """DNSInfo without network access, recording the location lookups."""
+    located = []
+
+    def __init__(self, domain=None, geo_db=None, ipinfo_url=None):
+        self.domain = domain
+
+    def get_ip_address(self):
+        return '10.0.0.1'
+
+    def get_fqdn(self):
+        return self.domain
+
+    def get_alias_and_ips(self):
+        return None
+
+    def get_name_servers(self):
+        return None
+
+    def get_location_info(self, ip=None):
+        self.located.append(ip)
+        return {'ip': ip}
+
+
+def dns_args(*argv):
+    parser = argparse.ArgumentParser()
+    cli.dns_checker_args(parser)
+    return parser.parse_args(argv)
+
+
+@pytest.fixture
+def located(monkeypatch):
+    monkeypatch.setattr(cli, 'DNSInfo', FakeDNSInfo)
+    monkeypatch.setattr(FakeDNSInfo, 'located', [])
+    return FakeDNSInfo.located
+
+
+def test_domain_shows_the_own_location_by_default(located):
+    cli.run_dns(dns_args('--domain', 'example.com'))
+    assert located == [None]
+
+
+def test_locate_without_a_file_locates_the_domain_ip(located, monkeypatch):
+    monkeypatch.setattr(cli, 'run_locate', lambda args: pytest.fail("batch location mode without a file"))
+    cli.run_dns(dns_args('--domain', 'example.com', '--locate'))
+    assert located == ['10.0.0.1']
+
+
+def test_locate_with_a_file_is_the_batch_mode(monkeypatch):
+    calls = []
+    monkeypatch.setattr(cli, 'run_locate', calls.append)
+    cli.run_dns(dns_args('--locate', 'ips.txt'))
+    assert [args.locate for args in calls] == ['ips.txt']
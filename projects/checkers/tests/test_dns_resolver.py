@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+
+from modules import dns_resolver
+from modules.dns_resolver import AsyncResolver, DNSCache, QUERY_TYPES
+from modules.stubs import StubServers
+
+STUB_TTL = 300  # TTL of every stub DNS answer
+STUB_NEGATIVE_TTL = 60  # SOA minimum of the stub NXDOMAIN answers
+
+
+@pytest.fixture(scope='module')
+def dns_port():
+    with StubServers() as stubs:
+        yield stubs.start_dns(latency=0.02)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [time.time()]
+    monkeypatch.setattr(dns_resolver.time, 'time', lambda: now[0])
+    return now
+
+
+def resolve_many(port, names, cache):
+    async def run():
+        async with AsyncResolver('127.0.0.1', port, cache=cache) as resolver:
+            return await resolver.resolve_many(names), resolver.queries_sent
+    return asyncio.run(run())
+
+
+def test_identical_queries_in_flight_are_sent_once(dns_port):
+    names = [f"host-{i}.example.test" for i in range(50)]
+    results, sent = resolve_many(dns_port, names * 3, DNSCache(None))
+    assert len(results) == 150
+    assert all(result['a'] and result['error'] is None for result in results)
+    assert sent == len(names) * len(QUERY_TYPES)
+
+
+def test_answers_are_cached_until_their_ttl_expires(dns_port, clock):
+    cache = DNSCache(None)
+    names = ['ttl.example.test', 'www.ttl.example.test']
+    first, sent = resolve_many(dns_port, names, cache)
+    assert sent == len(names) * len(QUERY_TYPES)
+    assert first[1]['cname'] == ['ttl.example.test']
+
+    clock[0] += STUB_TTL - 1
+    cached, sent = resolve_many(dns_port, names, cache)
+    assert sent == 0
+    assert cached == first
+
+    clock[0] += 2
+    _, sent = resolve_many(dns_port, names, cache)
+    assert sent == len(names) * len(QUERY_TYPES)
+
+
+def test_nxdomain_is_cached_for_the_soa_minimum(dns_port, clock):
+    cache = DNSCache(None)
+    first, sent = resolve_many(dns_port, ['nx-ttl.example.test'], cache)
+    assert sent == len(QUERY_TYPES)
+    assert not first[0]['a'] and first[0]['error'] is None
+
+    clock[0] += STUB_NEGATIVE_TTL - 1
+    assert resolve_many(dns_port, ['nx-ttl.example.test'], cache)[1] == 0
+    clock[0] += 2
+    assert resolve_many(dns_port, ['nx-ttl.example.test'], cache)[1] == len(QUERY_TYPES)
+
+
+def test_saved_cache_drops_expired_entries(tmp_path, clock):
+    path = str(tmp_path / 'dns-cache.json')
+    cache = DNSCache(path)
+    cache.set('short.example.test', 1, [[1, '10.0.0.1']], 10)
+    cache.set('long.example.test', 1, [[1, '10.0.0.2']], 1000)
+    cache.set('zero.example.test', 1, [[1, '10.0.0.3']], 0)
+    cache.save()
+
+    clock[0] += 100
+    loaded = DNSCache(path)
+    assert loaded.get('short.example.test', 1) is None
+    assert loaded.get('long.example.test', 1) == [[1, '10.0.0.2']]
+    assert loaded.get('zero.example.test', 1) is None
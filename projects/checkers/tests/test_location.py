@@ -0,0 +1,110 @@
+import ipaddress
+import random
+
+import pandas as pd
+import pytest
+
+from modules.location import IpinfoProvider, LocationCache, LocationService, PrefixDatabase
+from modules.stubs import StubServers, synthetic_location
+
+NETWORKS = [
+    ('10.0.0.0/8', 'A'),
+    ('10.1.0.0/16', 'B'),
+    ('10.1.2.0/24', 'C'),
+    ('10.1.2.128/25', 'D'),
+    ('10.1.2.200/32', 'E'),
+    ('10.2.0.0/16', 'F'),
+    ('192.168.0.0/24', 'G'),
+]
+
+
+def reference_country(ip):
+    """Longest-prefix match by scanning every network."""
+    address = ipaddress.ip_address(ip)
+    matches = [(ipaddress.ip_network(network).prefixlen, country) for network, country in NETWORKS if address in ipaddress.ip_network(network)]
+    return max(matches)[1] if matches else None
+
+
+@pytest.fixture(scope='module')
+def database():
+    return PrefixDatabase.from_frame(pd.DataFrame(NETWORKS, columns=['network', 'country']))
+
+
+@pytest.mark.parametrize('ip, country', [
+    ('10.0.0.0', 'A'), ('10.0.255.255', 'A'), ('10.1.0.0', 'B'), ('10.1.1.255', 'B'), ('10.1.2.0', 'C'),
+    ('10.1.2.127', 'C'), ('10.1.2.128', 'D'), ('10.1.2.199', 'D'), ('10.1.2.200', 'E'), ('10.1.2.201', 'D'),
+    ('10.1.3.0', 'B'), ('10.2.0.1', 'F'), ('10.3.0.0', 'A'), ('10.255.255.255', 'A'), ('11.0.0.0', None),
+    ('192.168.0.7', 'G'), ('192.168.1.0', None), ('::1', None), ('not an ip', None),
+])
+def test_lookup_returns_the_most_specific_network(database, ip, country):
+    assert (database.lookup(ip) or {}).get('country') == country
+
+
+def test_lookup_many_matches_a_longest_prefix_scan(database, tmp_path):
+    rng = random.Random(0)
+    ips = [str(ipaddress.IPv4Address(int(ipaddress.IPv4Address('10.0.0.0')) + rng.getrandbits(18))) for _ in range(2000)]
+    ips += ['10.1.2.200', '9.255.255.255', '192.168.0.255']
+    found = database.lookup_many(ips)
+    assert [(details or {}).get('country') for details in found] == [reference_country(ip) for ip in ips]
+    assert found == [database.lookup(ip) for ip in ips]
+
+    database.save(str(tmp_path / 'prefixes.npz'))
+    assert PrefixDatabase.load(str(tmp_path / 'prefixes.npz')).lookup_many(ips) == found
+
+
+def test_start_end_ranges_are_nested_like_networks():
+    database = PrefixDatabase.from_frame(pd.DataFrame(
+        [('1.0.0.0', '1.0.0.255', 'outer'), ('1.0.0.10', '1.0.0.19', 'inner')], columns=['start_ip', 'end_ip', 'country']))
+    countries = [database.lookup(f"1.0.0.{i}")['country'] for i in (9, 10, 19, 20)]
+    assert countries == ['outer', 'inner', 'inner', 'outer']
+
+
+@pytest.fixture(scope='module')
+def ipinfo_url():
+    with StubServers() as stubs:
+        yield f"http://127.0.0.1:{stubs.start('ipinfo')}"
+
+
+def test_remote_lookups_are_split_in_batches(ipinfo_url):
+    ips = [f"172.16.{i // 256}.{i % 256}" for i in range(250)]
+    remote = IpinfoProvider(base_url=ipinfo_url, batch_size=100)
+    answers = remote.lookup_many(ips)
+    remote.close()
+    assert remote.requests_sent == 3
+    assert set(answers) == set(ips)
+    assert answers[ips[0]]['country'] == synthetic_location(ips[0])['country']
+    assert answers[ips[0]]['latitude'] is not None
+
+
+def test_service_serves_repeated_lookups_from_the_cache(ipinfo_url, tmp_path):
+    cache_path = str(tmp_path / 'location-cache.json')
+    ips = [f"172.17.0.{i}" for i in range(20)]
+    remote = IpinfoProvider(base_url=ipinfo_url)
+    service = LocationService(LocationCache(cache_path), remote=remote)
+    first = service.lookup_many(ips + ips[:5])
+    service.save()
+    assert remote.requests_sent == 1
+
+    second = LocationService(LocationCache(cache_path), remote=remote).lookup_many(ips)
+    remote.close()
+    assert remote.requests_sent == 1
+    assert second == first
+
+
+def test_prefix_cache_key_shares_one_remote_answer(ipinfo_url):
+    remote = IpinfoProvider(base_url=ipinfo_url)
+    service = LocationService(remote=remote, prefix_v4=24)
+    service.lookup('172.18.0.1')
+    service.lookup('172.18.0.2')
+    remote.close()
+    assert remote.requests_sent == 1
+
+
+def test_cache_evicts_the_least_recently_used_entry():
+    cache = LocationCache(None, max_entries=2)
+    cache.set('a', {'country': 'A'})
+    cache.set('b', {'country': 'B'})
+    cache.get('a')
+    cache.set('c', {'country': 'C'})
+    assert cache.get('b') is None
+    assert cache.get('a') == {'country': 'A'}
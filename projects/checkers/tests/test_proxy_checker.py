@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pandas as pd
+import pytest
+
+from modules.async_checker import AsyncProxyChecker, CONNECTORS
+from modules.proxy_checker import ProxyChecker
+from modules.stubs import StubServers
+
+PROTOCOLS = list(CONNECTORS)
+DEAD_PORT = 1  # Nothing listens there: every check through it must fail
+REDIRECT_DELAY = 0.2
+
+
+@pytest.fixture(scope='module')
+def stubs():
+    with StubServers() as servers:
+        yield servers
+
+
+@pytest.fixture(scope='module')
+def test_url(stubs):
+    return f"http://127.0.0.1:{stubs.start('target')}/"
+
+
+@pytest.fixture(scope='module')
+def proxy_ports(stubs):
+    return {protocol: stubs.start(protocol) for protocol in PROTOCOLS}
+
+
+@pytest.fixture
+def threaded(tmp_path, test_url):
+    csv_path = tmp_path / 'proxies.csv'
+    pd.DataFrame([{'ip': '127.0.0.1', 'port': DEAD_PORT,
+                   'protocols': f"[ProtocolDataType(type=http, port={DEAD_PORT}, tls=false, autoRead=null)]"}]).to_csv(csv_path, index=False)
+    return ProxyChecker(str(csv_path), timeout=2, test_url=test_url, store_path=':memory:')
+
+
+@pytest.fixture
+def asynchronous(test_url):
+    return AsyncProxyChecker(test_url=test_url, timeout=2)
+
+
+@pytest.mark.parametrize('protocol', PROTOCOLS)
+def test_dead_proxy_fails_in_both_paths(threaded, asynchronous, protocol):
+    assert not threaded.check_proxy('127.0.0.1', DEAD_PORT, protocol)
+    assert not threaded.probe_proxy('127.0.0.1', DEAD_PORT, protocol)[0].ok
+    assert not asyncio.run(asynchronous.check_proxy('127.0.0.1', DEAD_PORT, protocol))
+
+
+@pytest.mark.parametrize('protocol', PROTOCOLS)
+def test_live_proxy_works_in_both_paths(threaded, asynchronous, proxy_ports, protocol):
+    port = proxy_ports[protocol]
+    assert threaded.check_proxy('127.0.0.1', port, protocol)
+    assert threaded.probe_proxy('127.0.0.1', port, protocol)[0].ok
+    assert asyncio.run(asynchronous.check_proxy('127.0.0.1', port, protocol))
+
+
+@pytest.fixture(scope='module')
+def redirect_url():
+    """HTTP/1.0 origin answering /slow with a redirect to /final after REDIRECT_DELAY seconds."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if urlsplit(self.path).path == '/slow':
+                time.sleep(REDIRECT_DELAY)
+                self.send_response(302)
+                self.send_header('Location', '/final')
+            else:
+                self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/slow"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('protocol', PROTOCOLS)
+def test_redirects_are_followed_in_both_paths(threaded, proxy_ports, redirect_url, protocol):
+    # The HTTP/1.0 origin closes the connection after each answer, the redirect needs a new one
+    threaded.test_url = redirect_url
+    port = proxy_ports[protocol]
+    assert threaded.check_proxy('127.0.0.1', port, protocol)
+    assert asyncio.run(AsyncProxyChecker(test_url=redirect_url, timeout=2).check_proxy('127.0.0.1', port, protocol))
+
+
+@pytest.mark.parametrize('protocol', PROTOCOLS)
+def test_ttfb_is_measured_alike_in_both_paths(threaded, proxy_ports, redirect_url, protocol):
+    # Both paths time the first byte from the start of the probe, redirects included
+    threaded.test_url = redirect_url
+    port = proxy_ports[protocol]
+    threaded_timing, = threaded.probe_proxy('127.0.0.1', port, protocol)
+    async_timing, = asyncio.run(AsyncProxyChecker(test_url=redirect_url, timeout=2).probe_proxy('127.0.0.1', port, protocol))
+    for timing in (threaded_timing, async_timing):
+        assert timing.ok
+        assert REDIRECT_DELAY <= timing.ttfb <= timing.total
@@ -0,0 +1,16 @@
+import sqlite3
+
+from modules.result_store import ResultStore
+
+
+def test_results_are_committed_as_they_are_added(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    store = ResultStore(path)
+    store.add({'ip': '10.0.0.1', 'port': 8080, 'protocol': 'http', 'status': True, 'latency': 0.1})
+    store.add({'ip': '10.0.0.2', 'port': 1080, 'protocol': 'socks5', 'status': False})
+
+    # Read from another connection without flushing or closing, as after a crash
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM checks").fetchone()[0] == 2
+        assert connection.execute("SELECT ip FROM proxies WHERE status = 1").fetchall() == [('10.0.0.1',)]
+    store.close()
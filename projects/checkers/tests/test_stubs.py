@@ -0,0 +1,66 @@
+import socket
+import time
+
+import pytest
+import requests
+
+from modules.proxy_checker import requests_proxies
+from modules.stubs import StubBehaviour, StubServers
+
+PROXY_KINDS = ['http', 'https', 'socks4', 'socks5']
+
+
+@pytest.fixture
+def stubs():
+    with StubServers() as servers:
+        yield servers
+
+
+def statuses(port, n):
+    with requests.Session() as session:
+        return [session.get(f"http://127.0.0.1:{port}/", timeout=2).status_code for _ in range(n)]
+
+
+def test_failure_rate_is_reproducible_with_a_seed(stubs):
+    first = statuses(stubs.start('target', failure_rate=0.2, seed=7), 300)
+    second = statuses(stubs.start('target', failure_rate=0.2, seed=7), 300)
+    assert first == second
+    assert set(first) == {200, 503}
+    assert 0.1 < first.count(503) / len(first) < 0.3
+
+
+@pytest.mark.parametrize('failure_rate, status', [(0.0, 200), (1.0, 503)])
+def test_target_fails_at_the_given_rate(stubs, failure_rate, status):
+    assert statuses(stubs.start('target', failure_rate=failure_rate), 5) == [status] * 5
+
+
+def test_latency_is_added_before_every_answer(stubs):
+    port = stubs.start('target', latency=0.05)
+    start = time.perf_counter()
+    statuses(port, 4)
+    assert time.perf_counter() - start >= 4 * 0.05
+
+
+@pytest.mark.parametrize('kind', PROXY_KINDS)
+def test_failing_proxies_refuse_every_request(stubs, kind):
+    url = f"http://127.0.0.1:{stubs.start('target')}/"
+    live, failing = stubs.start(kind), stubs.start(kind, failure_rate=1.0)
+    assert requests.get(url, proxies=requests_proxies('127.0.0.1', live, kind), timeout=2).status_code == 200
+    with pytest.raises(requests.RequestException):
+        requests.get(url, proxies=requests_proxies('127.0.0.1', failing, kind), timeout=2)
+
+
+def test_stop_closes_the_servers_and_their_connections():
+    with StubServers() as stubs:
+        port = stubs.start('target')
+        connection = socket.create_connection(('127.0.0.1', port))
+    connection.settimeout(2)
+    assert connection.recv(1) == b''  # Closed by the stub, not left hanging
+    connection.close()
+    with pytest.raises(ConnectionRefusedError):
+        socket.create_connection(('127.0.0.1', port), timeout=2)
+
+
+def test_behaviour_without_failure_rate_never_fails():
+    behaviour = StubBehaviour(seed=0)
+    assert not any(behaviour.fails() for _ in range(100))
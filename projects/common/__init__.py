@@ -0,0 +1,9 @@
+"""
+Code shared by airodump-ng, checkers and pymacchanger.
+
+Each tool appends projects/ to sys.path once (the `modules` packages in
+their __init__, pymacchanger.py before its imports) and imports from this
+package, e.g. `from common import tracing`. The path is appended, so it never
+shadows an installed module, and the shared modules are only reachable
+under the `common.` prefix.
+"""
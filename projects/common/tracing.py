@@ -0,0 +1,229 @@
+"""
+Lightweight tracing: named spans, counters and histograms around the hot
+stages of the tools, dumped as a Chrome trace (chrome://tracing, Perfetto)
+with a summary table.
+
+Tracing is off by default. span() then returns a shared no-op context
+manager and count()/observe() return right away, so the instrumentation
+costs one global lookup per call. enable() turns it on, optionally with
+tracemalloc to attribute allocations to the stages.
+
+Shared by airodump-ng, checkers and pymacchanger through the `common`
+package (see common/__init__.py).
+
+    from common import tracing
+
+    with tracing.span("process_csv", path=csv_path):
+        ...
+    tracing.count("rows", len(df))
+    tracing.observe("connect", seconds)
+"""
+import os
+import json
+import time
+import threading
+import tracemalloc
+from functools import wraps
+
+_tracer = None
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start", "memory")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.memory = tracemalloc.get_traced_memory()[0] if self.tracer.allocations else 0
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        allocated = tracemalloc.get_traced_memory()[0] - self.memory if self.tracer.allocations else 0
+        self.tracer.spans.append((self.name, self.start, end - self.start, threading.get_ident(), allocated, self.args))
+        return False
+
+
+class Tracer:
+    """Collected spans (name, start ns, duration ns, thread, allocated bytes, args), counters and histograms."""
+
+    def __init__(self, allocations=False):
+        self.allocations = allocations
+        self.origin = time.perf_counter_ns()
+        self.spans = []
+        self.counters = {}
+        self.counter_events = []
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def count(self, name, value):
+        with self._lock:
+            total = self.counters[name] = self.counters.get(name, 0) + value
+            self.counter_events.append((name, time.perf_counter_ns(), total))
+
+    def observe(self, name, value):
+        self.histograms.setdefault(name, []).append(value)
+
+    def chrome_trace(self):
+        """Trace Event Format dictionary: complete events for spans, counter events for counters."""
+        pid = os.getpid()
+        threads = {}
+        events = []
+        for name, start, duration, thread, allocated, args in self.spans:
+            tid = threads.setdefault(thread, len(threads))
+            if self.allocations:
+                args = dict(args, allocated_bytes=allocated)
+            events.append({"name": name, "ph": "X", "ts": (start - self.origin) / 1000, "dur": duration / 1000,
+                           "pid": pid, "tid": tid, "args": args})
+        for name, timestamp, total in self.counter_events:
+            events.append({"name": name, "ph": "C", "ts": (timestamp - self.origin) / 1000, "pid": pid, "args": {name: total}})
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"counters": self.counters, "histograms": {name: _quantiles(values) for name, values in self.histograms.items()}}}
+
+    def summary(self):
+        """Text table of the time (inclusive of nested spans) and net allocated memory per stage, counters and histograms."""
+        stages = {}
+        for name, _, duration, _, allocated, _ in self.spans:
+            calls, total, longest, memory = stages.get(name, (0, 0, 0, 0))
+            stages[name] = (calls + 1, total + duration, max(longest, duration), memory + allocated)
+        lines = [f"{'stage':<40} {'calls':>8} {'total ms':>11} {'mean ms':>10} {'max ms':>10}" + (f" {'net KiB':>11}" if self.allocations else "")]
+        for name, (calls, total, longest, memory) in sorted(stages.items(), key=lambda item: -item[1][1]):
+            line = f"{name:<40} {calls:>8} {total / 1e6:>11.2f} {total / calls / 1e6:>10.3f} {longest / 1e6:>10.2f}"
+            lines.append(line + (f" {memory / 1024:>11.1f}" if self.allocations else ""))
+        if self.counters:
+            lines.append("")
+            lines += [f"{name:<40} {value:>8}" for name, value in sorted(self.counters.items())]
+        if self.histograms:
+            lines.append("")
+            lines.append(f"{'histogram':<40} {'count':>8} {'p50':>11} {'p95':>10} {'max':>10}")
+            for name, values in sorted(self.histograms.items()):
+                stats = _quantiles(values)
+                lines.append(f"{name:<40} {stats['count']:>8} {stats['p50']:>11.4g} {stats['p95']:>10.4g} {stats['max']:>10.4g}")
+        return "\n".join(lines)
+
+
+def _quantiles(values):
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return {"count": 0, "p50": float("nan"), "p95": float("nan"), "max": float("nan")}
+    return {"count": len(values), "p50": values[len(values) // 2], "p95": values[min(len(values) - 1, int(len(values) * 0.95))], "max": values[-1]}
+
+
+def enable(allocations=True):
+    """Start collecting. With `allocations`, tracemalloc attributes memory to the spans (slower)."""
+    global _tracer
+    if allocations and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _tracer = Tracer(allocations)
+    return _tracer
+
+
+def disable():
+    """Stop collecting and return the Tracer with what was collected (None if tracing was off)."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None and tracer.allocations and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return tracer
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, **args):
+    """Context manager timing a stage. A no-op when tracing is off."""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, args)
+
+
+def traced(name=None):
+    """Decorator wrapping every call of a function in a span (named after the function by default)."""
+    def decorator(function):
+        span_name = name or function.__qualname__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return function(*args, **kwargs)
+            with _Span(tracer, span_name, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1):
+    """Add `value` to a counter."""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+def observe(name, value):
+    """Add a value (e.g. a latency in seconds) to a histogram."""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.observe(name, value)
+
+
+def dump(path, print_summary=True):
+    """
+    Stop tracing, write the Chrome trace to `path` and print the summary table.
+
+    :return: The Tracer, or None if tracing was off.
+    """
+    tracer = disable()
+    if tracer is None:
+        return None
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(tracer.chrome_trace(), f)
+    if print_summary:
+        print(f"\nProfile ({len(tracer.spans)} spans) saved to {path} (open it in chrome://tracing or ui.perfetto.dev)")
+        print(tracer.summary())
+    return tracer
+
+
+if __name__ == "__main__":
+    # Overhead of the instrumentation, disabled and enabled. Run as `python common/tracing.py`
+    def work(i):
+        with span("work"):
+            count("items")
+            return i * 2
+
+    n = 200000
+    start = time.perf_counter()
+    for i in range(n):
+        i * 2
+    bare = (time.perf_counter() - start) / n
+    start = time.perf_counter()
+    for i in range(n):
+        work(i)
+    disabled = (time.perf_counter() - start) / n
+    enable(allocations=False)
+    start = time.perf_counter()
+    for i in range(n):
+        work(i)
+    enabled_cost = (time.perf_counter() - start) / n
+    disable()
+    print(f"per instrumented call: bare {bare * 1e9:.0f} ns, tracing off {disabled * 1e9:.0f} ns, tracing on {enabled_cost * 1e9:.0f} ns")
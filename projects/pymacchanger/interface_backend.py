@@ -0,0 +1,256 @@
+import os
+import re
+import array
+import fcntl
+import errno
+import socket
+import struct
+import subprocess
+
+# ioctls (linux/sockios.h) and ethtool (linux/ethtool.h)
+SIOCGIFFLAGS = 0x8913
+SIOCSIFFLAGS = 0x8914
+SIOCSIFHWADDR = 0x8924
+SIOCGIFHWADDR = 0x8927
+SIOCETHTOOL = 0x8946
+ETHTOOL_GPERMADDR = 0x20
+MAX_ADDR_LEN = 32
+IFF_UP = 0x1
+ARPHRD_ETHER = 1
+IFNAMSIZ = 16
+IFREQ_SIZE = 40
+
+# rtnetlink (linux/netlink.h, linux/rtnetlink.h, linux/if_link.h)
+NETLINK_ROUTE = 0
+NLMSG_ERROR = 2
+RTM_NEWLINK = 16
+RTM_GETLINK = 18
+NLM_F_REQUEST = 0x1
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_OPERSTATE = 16
+IFLA_PERM_ADDRESS = 54
+NLMSGHDR = struct.Struct('=IHHII')
+IFINFOMSG = struct.Struct('=BxHiII')
+RTATTR = struct.Struct('=HH')
+OPERSTATES = ('unknown', 'notpresent', 'down', 'lowerlayerdown', 'testing', 'dormant', 'up')
+
+MAC_PATTERN = re.compile(r"(\w\w:\w\w:\w\w:\w\w:\w\w:\w\w)")
+
+
+def format_mac(data):
+    """'aa:bb:cc:dd:ee:ff' of raw address bytes, None for a missing or all-zero address."""
+    if not data or not any(data):
+        return None
+    return ':'.join(f"{byte:02x}" for byte in data)
+
+
+def parse_mac(mac):
+    """Raw 6 bytes of 'aa:bb:cc:dd:ee:ff' (':' or '-' separators)."""
+    octets = re.split(r'[:\-]', mac)
+    if len(octets) != 6 or not all(re.fullmatch(r'[0-9A-Fa-f]{2}', octet) for octet in octets):
+        raise ValueError(f"Invalid MAC address: {mac}")
+    return bytes(int(octet, 16) for octet in octets)
+
+
+def _ifname(interface):
+    name = interface.encode()
+    if not name or len(name) >= IFNAMSIZ:
+        raise ValueError(f"Invalid interface name: {interface}")
+    return name
+
+
+def _padded(payload):
+    return payload + b'\0' * (-len(payload) % 4)
+
+
+class NetlinkBackend:
+    """
+    In-process interface control: rtnetlink (RTM_GETLINK) to read a link's
+    addresses and state in one round trip, and ioctls (SIOCGIFHWADDR,
+    SIOCSIFHWADDR, SIOCGIFFLAGS/SIOCSIFFLAGS, ETHTOOL_GPERMADDR) to read and
+    change them. Nothing is forked, but changing the MAC requires root or
+    CAP_NET_ADMIN.
+    """
+
+    name = "netlink"
+
+    def __init__(self):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._netlink = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        self._netlink.bind((0, 0))
+        self._sequence = 0
+
+    def close(self):
+        self._socket.close()
+        self._netlink.close()
+
+    def _ioctl(self, request, interface, payload=b''):
+        ifreq = _ifname(interface).ljust(IFNAMSIZ, b'\0') + payload.ljust(IFREQ_SIZE - IFNAMSIZ, b'\0')
+        return fcntl.ioctl(self._socket, request, ifreq)[IFNAMSIZ:]
+
+    def link(self, interface):
+        """
+        Addresses and state of an interface from one RTM_GETLINK request.
+
+        :return: A dictionary with mac, permanent (None if the kernel does not report it), operstate and up.
+        """
+        self._sequence += 1
+        attribute = _padded(RTATTR.pack(RTATTR.size + len(_ifname(interface)) + 1, IFLA_IFNAME) + _ifname(interface) + b'\0')
+        body = IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0) + attribute
+        self._netlink.send(NLMSGHDR.pack(NLMSGHDR.size + len(body), RTM_GETLINK, NLM_F_REQUEST, self._sequence, 0) + body)
+
+        while True:
+            data = self._netlink.recv(65536)
+            offset = 0
+            while offset + NLMSGHDR.size <= len(data):
+                length, msg_type, _, sequence, _ = NLMSGHDR.unpack_from(data, offset)
+                message = data[offset + NLMSGHDR.size:offset + length]
+                offset += length + (-length % 4)
+                if sequence != self._sequence:
+                    continue
+                if msg_type == NLMSG_ERROR:
+                    code = -struct.unpack_from('=i', message)[0]
+                    raise OSError(code, f"{os.strerror(code)}: {interface}")
+                if msg_type == RTM_NEWLINK:
+                    _, _, _, flags, _ = IFINFOMSG.unpack_from(message)
+                    attributes = self._attributes(message[IFINFOMSG.size:])
+                    operstate = attributes.get(IFLA_OPERSTATE, b'\0')[0]
+                    return {
+                        'mac': format_mac(attributes.get(IFLA_ADDRESS)),
+                        'permanent': format_mac(attributes.get(IFLA_PERM_ADDRESS)),
+                        'operstate': OPERSTATES[operstate] if operstate < len(OPERSTATES) else 'unknown',
+                        'up': bool(flags & IFF_UP),
+                    }
+
+    @staticmethod
+    def _attributes(data):
+        attributes, offset = {}, 0
+        while offset + RTATTR.size <= len(data):
+            length, attr_type = RTATTR.unpack_from(data, offset)
+            if length < RTATTR.size:
+                break
+            attributes[attr_type] = data[offset + RTATTR.size:offset + length]
+            offset += length + (-length % 4)
+        return attributes
+
+    def get_mac(self, interface):
+        """Current MAC address (SIOCGIFHWADDR)."""
+        return format_mac(self._ioctl(SIOCGIFHWADDR, interface)[2:8])
+
+    def get_permanent_mac(self, interface):
+        """Permanent (burned-in) MAC address: IFLA_PERM_ADDRESS when the kernel reports it, else ETHTOOL_GPERMADDR."""
+        try:
+            permanent = self.link(interface)['permanent']
+            if permanent:
+                return permanent
+        except OSError:
+            pass
+        request = array.array('B', struct.pack('=II', ETHTOOL_GPERMADDR, MAX_ADDR_LEN) + b'\0' * MAX_ADDR_LEN)
+        self._ioctl(SIOCETHTOOL, interface, struct.pack('P', request.buffer_info()[0]))
+        size = struct.unpack_from('=I', request, 4)[0]
+        return format_mac(request[8:8 + size].tobytes())
+
+    def is_up(self, interface):
+        return bool(struct.unpack_from('h', self._ioctl(SIOCGIFFLAGS, interface))[0] & IFF_UP)
+
+    def set_up(self, interface, up=True):
+        flags = struct.unpack_from('h', self._ioctl(SIOCGIFFLAGS, interface))[0]
+        flags = flags | IFF_UP if up else flags & ~IFF_UP
+        self._ioctl(SIOCSIFFLAGS, interface, struct.pack('h', flags))
+
+    def set_mac(self, interface, mac):
+        """
+        Set the MAC address, taking the link down for the change (as
+        `ifconfig down; hw ether; up` does) and restoring its previous state.
+        """
+        address = parse_mac(mac)
+        was_up = self.is_up(interface)
+        if was_up:
+            self.set_up(interface, False)
+        try:
+            self._ioctl(SIOCSIFHWADDR, interface, struct.pack('=H6s', ARPHRD_ETHER, address))
+        finally:
+            if was_up:
+                self.set_up(interface, True)
+
+
+class SubprocessBackend:
+    """The original `sudo ifconfig` / `sudo ethtool -P` path, used when the netlink backend is unavailable."""
+
+    name = "subprocess"
+
+    def __init__(self):
+        self._sudo = ["sudo"] if os.geteuid() != 0 else []
+
+    def close(self):
+        pass
+
+    def _run_command(self, *args):
+        try:
+            result = subprocess.check_output(self._sudo + list(args))
+            return result.decode("utf-8")
+        except (subprocess.CalledProcessError, OSError):
+            return None
+
+    def _extract_mac(self, raw_output):
+        match = MAC_PATTERN.search(raw_output) if raw_output else None
+        return match.group(0) if match else None
+
+    def get_mac(self, interface):
+        return self._extract_mac(self._run_command("ifconfig", interface))
+
+    def get_permanent_mac(self, interface):
+        return self._extract_mac(self._run_command("ethtool", "-P", interface))
+
+    def set_mac(self, interface, mac):
+        parse_mac(mac)
+        for command in (["ifconfig", interface, "down"],
+                        ["ifconfig", interface, "hw", "ether", mac],
+                        ["ifconfig", interface, "up"]):
+            if subprocess.call(self._sudo + command) != 0:
+                raise OSError(errno.EIO, f"{' '.join(command)} failed")
+
+
+BACKENDS = {"netlink": NetlinkBackend, "subprocess": SubprocessBackend}
+
+
+def get_backend(name="auto"):
+    """
+    Interface backend by name. "auto" uses the netlink backend when running
+    as root (or with CAP_NET_ADMIN) on Linux and falls back to the subprocess one.
+    """
+    if name != "auto":
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown backend: {name}. Options: auto, {', '.join(BACKENDS)}.")
+        return BACKENDS[name]()
+    if hasattr(socket, "AF_NETLINK") and os.geteuid() == 0:
+        try:
+            return NetlinkBackend()
+        except OSError:
+            pass
+    return SubprocessBackend()
+
+
+if __name__ == "__main__":
+    # Read/set/restore cost per backend on a throwaway interface, e.g. a veth pair in a network namespace:
+    #   unshare -n sh -c 'ip link add v0 type veth peer name v1 && python interface_backend.py v0'
+    import sys
+    import time
+    import random
+
+    interface = sys.argv[1] if len(sys.argv) > 1 else 'v0'
+    rounds = 50
+    for name in BACKENDS:
+        backend = get_backend(name)
+        original = backend.get_mac(interface)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            mac = "02:" + ":".join(f"{random.getrandbits(8):02x}" for _ in range(5))
+            backend.set_mac(interface, mac)
+            assert backend.get_mac(interface) == mac
+            backend.get_permanent_mac(interface)
+        elapsed = (time.perf_counter() - start) / rounds
+        backend.set_mac(interface, original)
+        print(f"{name}: {elapsed * 1000:.2f} ms per set + read ({interface} restored to {backend.get_mac(interface)})")
+        backend.close()
@@ -0,0 +1,262 @@
+import re
+import argparse
+import numpy as np
+import pandas as pd
+from oui_index import load_oui_index, format_prefix, PREFIX_BITS
+
+DEFAULT_WIRELESS_LIST_PATH = './data/wireless.list'
+MAC_COLUMNS = ("Station MAC", "BSSID")
+
+# ASCII -> nibble value, 255 for anything that is not a hex digit
+_HEX_VALUES = np.full(256, 255, dtype=np.uint8)
+_HEX_VALUES[np.frombuffer(b'0123456789', dtype=np.uint8)] = np.arange(10)
+_HEX_VALUES[np.frombuffer(b'abcdef', dtype=np.uint8)] = np.arange(10, 16)
+_HEX_VALUES[np.frombuffer(b'ABCDEF', dtype=np.uint8)] = np.arange(10, 16)
+_NIBBLE_WEIGHTS = np.uint64(16) ** np.arange(11, -1, -1, dtype=np.uint64)
+
+
+def _parse_hex(digits):
+    """(n, 12) array of ASCII hex digits -> (uint64 values, valid mask)."""
+    nibbles = _HEX_VALUES[digits]
+    valid = (nibbles != 255).all(axis=1)
+    nibbles[~valid] = 0
+    return nibbles.astype(np.uint64) @ _NIBBLE_WEIGHTS, valid
+
+
+def _as_object_array(macs):
+    """The MACs as an object array. Series, lists and arrays are converted directly, other iterables through a list."""
+    if isinstance(macs, pd.Series):
+        return macs.to_numpy(dtype=object)
+    if not isinstance(macs, (list, tuple, np.ndarray)):
+        macs = list(macs)
+    return np.asarray(macs, dtype=object)
+
+
+def macs_to_int(macs):
+    """
+    Convert MAC addresses to 48-bit integers, vectorized.
+
+    'AA:BB:CC:DD:EE:FF' and 'AA-BB-CC-DD-EE-FF' are parsed straight from a
+    fixed-width byte array, converted once from the strings; other notations
+    ('.' separators, no separators, surrounding blanks) and missing values go
+    through pandas string methods.
+
+    :param macs: Iterable or Series of MAC strings.
+    :return: (uint64 array of the MACs, boolean array of the valid ones). Invalid entries are 0.
+    """
+    text = _as_object_array(macs)
+    try:
+        # None/NaN become b'None'/b'nan', which fail the fast path below
+        raw = text.astype('S18')
+    except (UnicodeEncodeError, ValueError):
+        raw = np.array([str(mac).encode('ascii', errors='replace') for mac in text], dtype='S18')
+    raw = np.frombuffer(raw.tobytes(), dtype=np.uint8).reshape(-1, 18)
+    separators = raw[:, [2, 5, 8, 11, 14]]
+    fast = (raw[:, 17] == 0) & (raw[:, 16] != 0) & ((separators == ord(':')) | (separators == ord('-'))).all(axis=1)
+
+    values = np.zeros(len(text), dtype=np.uint64)
+    valid = np.zeros(len(text), dtype=bool)
+    values[fast], valid[fast] = _parse_hex(raw[fast][:, [0, 1, 3, 4, 6, 7, 9, 10, 12, 13, 15, 16]])
+
+    slow = np.flatnonzero(~fast)
+    if len(slow):
+        digits = pd.Series(text[slow], dtype=object).fillna('').astype(str).str.strip().str.replace(r'[:\-.]', '', regex=True)
+        length_ok = (digits.str.len() == 12).to_numpy()
+        digits = np.frombuffer(digits.where(length_ok, '').str.encode('ascii', errors='replace').to_numpy().astype('S12').tobytes(),
+                               dtype=np.uint8).reshape(-1, 12)
+        values[slow], valid[slow] = _parse_hex(digits)
+        valid[slow] &= length_ok
+        values[slow[~valid[slow]]] = 0
+    return values, valid
+
+
+def load_chipsets(path=DEFAULT_WIRELESS_LIST_PATH):
+    """
+    Chipset hints of wireless.list ('00 02 2D Lucent (WaveLAN, Orinoco...)') as sorted 24-bit keys and hints.
+
+    :return: (uint32 array of OUIs, array of hint strings). Repeated OUIs keep the first hint.
+    """
+    hints = {}
+    with open(path, 'r') as f:
+        for line in f:
+            match = re.match(r'^\s*([0-9A-Fa-f]{2})\s+([0-9A-Fa-f]{2})\s+([0-9A-Fa-f]{2})\s+(.+?)\s*$', line)
+            if match:
+                hints.setdefault(int(''.join(match.groups()[:3]), 16), re.sub(r'\s+', ' ', match.group(4)))
+    keys = np.array(sorted(hints), dtype=np.uint32)
+    return keys, np.array([hints[key] for key in keys.tolist()], dtype=object)
+
+
+def _sorted_join(keys, table_keys):
+    """Position of every key in the sorted table_keys and whether it is there (np.searchsorted join)."""
+    if not len(table_keys):
+        return np.zeros(len(keys), dtype=np.intp), np.zeros(len(keys), dtype=bool)
+    positions = np.searchsorted(table_keys, keys)
+    clipped = np.minimum(positions, len(table_keys) - 1)
+    return clipped, table_keys[clipped] == keys
+
+
+def lookup_vendors(macs, index=None, chipsets=None):
+    """
+    Resolve the vendors of many MAC addresses at once.
+
+    The MACs are converted to integers and matched against each prefix
+    table of the OUI index (MA-S, MA-M, then MA-L) with np.searchsorted, so
+    the cost is a handful of array operations whatever the number of MACs.
+    Only the distinct vendors found are decoded from the index.
+
+    Parameters
+    ----------
+    macs : iterable of str
+        MAC addresses.
+    index : OUIIndex, optional
+        Vendor index, load_oui_index() by default.
+    chipsets : tuple, optional
+        load_chipsets() result, loaded from ./data/wireless.list by default.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per MAC with mac, valid, oui (matched prefix), vendor, vendor_address,
+        locally_administered, multicast, randomized (locally administered unicast) and chipset.
+    """
+    index = load_oui_index() if index is None else index
+    chipsets = load_chipsets() if chipsets is None else chipsets
+    macs = _as_object_array(macs)
+    values, valid = macs_to_int(macs)
+    n = len(values)
+
+    string_ids = np.full(n, -1, dtype=np.int64)
+    prefix_keys = np.zeros(n, dtype=np.uint64)
+    prefix_bits = np.zeros(n, dtype=np.uint8)
+    pending = valid.copy()
+    for bits in PREFIX_BITS:
+        table_keys, table_ids = index.table(bits)
+        table_keys = np.frombuffer(table_keys, dtype=np.uint64 if bits > 32 else np.uint32).astype(np.uint64)
+        keys = values >> np.uint64(48 - bits)
+        positions, found = _sorted_join(keys, table_keys)
+        found &= pending
+        string_ids[found] = np.frombuffer(table_ids, dtype=np.uint32)[positions[found]]
+        prefix_keys[found] = keys[found]
+        prefix_bits[found] = bits
+        pending &= ~found
+
+    # Decode and format each distinct vendor / prefix once, then scatter them back
+    found = string_ids >= 0
+    distinct, inverse = np.unique(string_ids[found], return_inverse=True)
+    decoded = [index.string(string_id).split('\n', 1) for string_id in distinct.tolist()]
+    names = np.full(n, None, dtype=object)
+    addresses = np.full(n, None, dtype=object)
+    names[found] = np.array([name for name, *_ in decoded] + [None], dtype=object)[:-1][inverse]
+    addresses[found] = np.array([' '.join(' '.join(address).split()) or None for _, *address in decoded] + [None], dtype=object)[:-1][inverse]
+    distinct, inverse = np.unique(prefix_keys[found] << np.uint64(8) | prefix_bits[found], return_inverse=True)
+    prefixes = np.full(n, None, dtype=object)
+    prefixes[found] = np.array([format_prefix(key >> 8, key & 255) for key in distinct.tolist()] + [None], dtype=object)[:-1][inverse]
+
+    chipset_keys, chipset_hints = chipsets
+    positions, found = _sorted_join((values >> np.uint64(24)).astype(np.uint32), chipset_keys)
+    found &= valid
+    hints = np.full(n, None, dtype=object)
+    hints[found] = chipset_hints[positions[found]]
+
+    first_octet = (values >> np.uint64(40)).astype(np.uint8)
+    locally_administered = valid & (first_octet & 2 > 0)
+    multicast = valid & (first_octet & 1 > 0)
+    return pd.DataFrame({
+        'mac': macs,
+        'valid': valid,
+        'oui': prefixes,
+        'vendor': names,
+        'vendor_address': addresses,
+        'locally_administered': locally_administered,
+        'multicast': multicast,
+        'randomized': locally_administered & ~multicast,
+        'chipset': hints,
+    })
+
+
+def label_frame(df, columns=None, index=None, chipsets=None):
+    """
+    Add vendor columns for each MAC column of an airodump-ng DataFrame
+    ('<column> vendor', '<column> locally administered', '<column> chipset', ...).
+
+    :param columns: MAC columns, by default the ones of MAC_COLUMNS present in df.
+    :return: A new DataFrame.
+    """
+    columns = [column for column in MAC_COLUMNS if column in df.columns] if columns is None else columns
+    if not columns:
+        raise ValueError(f"No MAC column found. Expected one of: {', '.join(MAC_COLUMNS)}.")
+    index = load_oui_index() if index is None else index
+    chipsets = load_chipsets() if chipsets is None else chipsets
+    labeled = df.copy()
+    for column in columns:
+        if column not in df.columns:
+            raise ValueError(f"Column {column} not found.")
+        vendors = lookup_vendors(df[column], index, chipsets)
+        for field in ('oui', 'vendor', 'locally_administered', 'randomized', 'chipset'):
+            labeled[f"{column} {field.replace('_', ' ')}"] = vendors[field].to_numpy()
+    return labeled
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Resolve the vendors of the MAC addresses of an airodump-ng CSV (airo-clients.csv, airo-access_points.csv) in bulk.")
+
+    parser.add_argument("csv", nargs="?", help="CSV file with MAC address columns.")
+
+    parser.add_argument("-c", "--column", action="append", help="MAC column to resolve (repeatable). Default: 'Station MAC' and/or 'BSSID'.")
+
+    parser.add_argument("-o", "--output", help="Write the labeled CSV to this file. Default: print a vendor summary.")
+
+    parser.add_argument("--top", type=int, default=15, help="Number of vendors shown in the summary. Default: 15.")
+
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Compare the bulk lookup with one lookup per MAC on N random MACs.")
+
+    args = parser.parse_args()
+    if args.csv is None and args.benchmark is None:
+        parser.error("the following arguments are required: csv")
+    return args
+
+
+def benchmark(n):
+    import time
+    import random
+
+    rng = random.Random(0)
+    index = load_oui_index()
+    chipsets = load_chipsets()
+    # Half of the MACs with a registered OUI, like a real survey
+    ouis = [index.random_prefix(rng) for _ in range(n // 2)]
+    macs = [f"{oui}:" + ':'.join(f"{rng.getrandbits(8):02X}" for _ in range(3)) for oui in ouis]
+    macs += [':'.join(f"{rng.getrandbits(8):02X}" for _ in range(6)) for _ in range(n - len(macs))]
+
+    start = time.perf_counter()
+    expected = [index.get(mac) for mac in macs]
+    single = time.perf_counter() - start
+    start = time.perf_counter()
+    vendors = lookup_vendors(macs, index, chipsets)
+    bulk = time.perf_counter() - start
+
+    names = [vendor.split('\n', 1)[0] if vendor else None for vendor in expected]
+    assert names == vendors['vendor'].tolist()
+    print(f"{n} MACs: one lookup per MAC {single:.2f}s, bulk lookup {bulk:.2f}s ({single / bulk:.0f}x); "
+          f"{vendors['vendor'].notna().sum()} with a vendor, {vendors['randomized'].sum()} randomized")
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        raise SystemExit
+
+    df = pd.read_csv(args.csv, skipinitialspace=True)
+    labeled = label_frame(df, args.column)
+
+    if args.output:
+        labeled.to_csv(args.output, index=False)
+        print(f'Labeled {len(labeled)} rows saved to {args.output}')
+    else:
+        for column in args.column or [column for column in MAC_COLUMNS if column in df.columns]:
+            vendor = labeled[f"{column} vendor"]
+            vendor = vendor.where(vendor.notna(), np.where(labeled[f"{column} randomized"], '(randomized)', '(unknown)'))
+            print(f"{column}: {len(labeled)} MACs, {int(labeled[f'{column} randomized'].sum())} randomized")
+            print(vendor.value_counts().head(args.top).to_string())
@@ -0,0 +1,302 @@
+import os
+import sys
+import csv
+import json
+import mmap
+import array
+import random
+import struct
+from bisect import bisect_left
+
+MAGIC = b'OUIX'
+VERSION = 1
+# magic, version, byte order (1 = little endian), MA-L / MA-M / MA-S entries, strings
+HEADER = struct.Struct('<4sHHIIII')
+# Registry -> prefix length in bits
+REGISTRIES = {'MA-L': 24, 'MA-M': 28, 'MA-S': 36}
+PREFIX_BITS = (36, 28, 24)  # Most specific first
+DEFAULT_JSON_PATH = './data/oui.json'
+DEFAULT_INDEX_PATH = './data/oui.idx'
+
+
+def mac_to_int(mac):
+    """
+    48-bit integer of a MAC address ('AA:BB:CC:DD:EE:FF', 'aa-bb-cc-dd-ee-ff', 'aabb.ccdd.eeff' or 'AABBCCDDEEFF').
+    Shorter hex strings (e.g. an OUI) are read as a prefix and padded with zeros.
+    """
+    if isinstance(mac, int):
+        return mac
+    digits = mac.replace(':', '').replace('-', '').replace('.', '')
+    if not digits or len(digits) > 12:
+        raise ValueError(f"Invalid MAC address: {mac}")
+    return int(digits, 16) << 4 * (12 - len(digits))
+
+
+def format_prefix(value, bits):
+    """'AA:BB:CC' (24 bits), 'AA:BB:CC:D' (28 bits) or 'AA:BB:CC:DD:E' (36 bits) of a prefix value."""
+    digits = f"{value:0{bits // 4}X}"
+    return ':'.join(digits[i:i + 2] for i in range(0, len(digits), 2))
+
+
+def read_oui_json(path=DEFAULT_JSON_PATH):
+    """(prefix value, prefix bits, vendor) of oui.json, whose keys are 6 hex digit MA-L assignments."""
+    with open(path, 'r') as f:
+        for key, vendor in json.load(f).items():
+            yield int(key, 16), 4 * len(key), vendor
+
+
+def read_ieee_csv(path):
+    """
+    (prefix value, prefix bits, vendor) of an IEEE registry CSV (oui.csv, mam.csv or oui36.csv,
+    columns Registry, Assignment, Organization Name, Organization Address).
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            bits = REGISTRIES.get(row['Registry'])
+            if bits is None:
+                continue
+            assignment = row['Assignment'].strip()
+            if len(assignment) * 4 != bits:
+                raise ValueError(f"Assignment {assignment} does not match registry {row['Registry']} in {path}.")
+            vendor = row['Organization Name'].strip()
+            address = row.get('Organization Address', '').strip()
+            yield int(assignment, 16), bits, f"{vendor}\n{address}" if address else vendor
+
+
+def build_index(sources=(DEFAULT_JSON_PATH,), path=DEFAULT_INDEX_PATH):
+    """
+    Build the binary OUI index from oui.json and/or IEEE registry CSV files.
+
+    Layout after the header, every section aligned to 8 bytes:
+    sorted MA-L keys (uint32) and their string ids (uint32), the same for
+    MA-M (uint32) and MA-S (uint64 keys), the string offsets (uint32,
+    n_strings + 1) and the UTF-8 blob of interned vendor strings. Later
+    sources override earlier ones for the same prefix.
+
+    :param sources: Paths of .json (oui.json format) or .csv (IEEE format) files.
+    :param path: Output index file.
+    :return: The number of prefixes indexed.
+    """
+    entries = {bits: {} for bits in PREFIX_BITS}
+    for source in sources:
+        rows = read_oui_json(source) if source.endswith('.json') else read_ieee_csv(source)
+        for value, bits, vendor in rows:
+            if bits not in entries:
+                raise ValueError(f"Unsupported prefix length {bits} in {source}.")
+            entries[bits][value] = vendor
+
+    string_ids = {}
+    tables = {}
+    for bits in PREFIX_BITS:
+        keys = array.array('Q' if bits > 32 else 'I', sorted(entries[bits]))
+        ids = array.array('I', (string_ids.setdefault(entries[bits][key], len(string_ids)) for key in keys))
+        tables[bits] = (keys, ids)
+    strings = list(string_ids)
+    blob = bytearray()
+    offsets = array.array('I', [0])
+    for string in strings:
+        blob += string.encode('utf-8')
+        offsets.append(len(blob))
+
+    sections = []
+    for bits in (24, 28, 36):
+        sections.extend(tables[bits])
+    sections.append(offsets)
+    if sys.byteorder != 'little':
+        for section in sections:
+            section.byteswap()
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 1, len(tables[24][0]), len(tables[28][0]), len(tables[36][0]),
+                            len(strings)))
+        for section in sections + [blob]:
+            f.write(b'\0' * (-f.tell() % 8))
+            f.write(section.tobytes() if isinstance(section, array.array) else section)
+    os.replace(tmp_path, path)
+    return sum(len(keys) for keys, _ in tables.values())
+
+
+class OUIIndex:
+    """
+    Memory-mapped OUI vendor index written by build_index().
+
+    Opening it only maps the file, so startup costs nothing whatever the
+    size of the registry, and only the pages touched by a lookup are read.
+    Lookups are a binary search per prefix length, most specific first
+    (MA-S 36 bits, MA-M 28 bits, MA-L 24 bits), and a random vendor is a
+    random index into the MA-L keys.
+
+        index = OUIIndex('./data/oui.idx')
+        index.get('00:00:0C:12:34:56')  # 'CISCO SYSTEMS, INC.\\n...'
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, little_endian, n24, n28, n36, n_strings = HEADER.unpack_from(self._mmap)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a version {VERSION} OUI index.")
+            if little_endian != (sys.byteorder == 'little'):
+                raise ValueError(f"{path} was built for another byte order.")
+            view = memoryview(self._mmap)
+            offset = HEADER.size
+            sections = []
+            for fmt, count in (('I', n24), ('I', n24), ('I', n28), ('I', n28), ('Q', n36), ('I', n36), ('I', n_strings + 1)):
+                offset += -offset % 8
+                size = struct.calcsize(fmt) * count
+                sections.append(view[offset:offset + size].cast(fmt))
+                offset += size
+            offset += -offset % 8
+            self._blob = view[offset:]
+            self._views = sections + [self._blob, view]
+        except Exception:
+            self.close()
+            raise
+        self._tables = {24: (sections[0], sections[1]), 28: (sections[2], sections[3]), 36: (sections[4], sections[5])}
+        self._offsets = sections[6]
+
+    def __len__(self):
+        return sum(len(keys) for keys, _ in self._tables.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for view in getattr(self, '_views', []):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def string(self, string_id):
+        """Vendor string (name and address lines) of a string id."""
+        return bytes(self._blob[self._offsets[string_id]:self._offsets[string_id + 1]]).decode('utf-8')
+
+    def lookup(self, mac):
+        """
+        Longest-prefix match of a MAC address.
+
+        :param mac: MAC address (string in any usual notation or 48-bit integer).
+        :return: (prefix, bits, vendor), e.g. ('00:1B:C5:00:0', 36, '...'), or None.
+        """
+        value = mac_to_int(mac)
+        for bits in PREFIX_BITS:
+            keys, ids = self._tables[bits]
+            key = value >> (48 - bits)
+            position = bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                return format_prefix(key, bits), bits, self.string(ids[position])
+        return None
+
+    def table(self, bits):
+        """Sorted keys and string ids of one prefix length (24, 28 or 36), as memoryviews over the file."""
+        return self._tables[bits]
+
+    def get(self, mac, default=None):
+        """Vendor of a MAC address (name and address lines separated by newlines), or `default`."""
+        found = self.lookup(mac)
+        return found[2] if found else default
+
+    def __contains__(self, mac):
+        return self.lookup(mac) is not None
+
+    def random_prefix(self, rng=random):
+        """A random MA-L prefix ('AA:BB:CC'), uniform over the registered vendors' OUIs."""
+        keys, _ = self._tables[24]
+        if not len(keys):
+            raise ValueError(f"{self.path} has no MA-L prefixes.")
+        return format_prefix(keys[rng.randrange(len(keys))], 24)
+
+
+def load_oui_index(path=DEFAULT_INDEX_PATH, sources=(DEFAULT_JSON_PATH,)):
+    """
+    Open the OUI index, (re)building it first when it is missing, unreadable
+    or older than its sources. An index rebuilt with extra IEEE CSV files
+    (build_index) is kept until oui.json changes.
+    """
+    sources = [source for source in sources if os.path.exists(source)]
+    if os.path.exists(path) and all(os.path.getmtime(source) <= os.path.getmtime(path) for source in sources):
+        try:
+            return OUIIndex(path)
+        except (ValueError, struct.error):
+            pass
+    if not sources:
+        raise ValueError(f"No OUI index at {path} and no source to build it from.")
+    build_index(sources, path)
+    return OUIIndex(path)
+
+
+if __name__ == "__main__":
+    # Startup, lookup and random vendor: json.load of oui.json vs the memory-mapped index
+    import time
+    import tempfile
+    import tracemalloc
+
+    rng = random.Random(0)
+    macs = [f"{rng.getrandbits(48):012X}" for _ in range(100000)]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(DEFAULT_JSON_PATH, 'r') as f:
+        oui_data = json.load(f)
+    json_startup = time.perf_counter() - start
+    json_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    expected = [oui_data.get(mac[:6]) for mac in macs]
+    json_lookup = (time.perf_counter() - start) / len(macs)
+    start = time.perf_counter()
+    for _ in range(100):
+        random.choice(list(oui_data.keys()))
+    json_random = (time.perf_counter() - start) / 100
+    del oui_data
+    tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'oui.idx')
+        start = time.perf_counter()
+        count = build_index((DEFAULT_JSON_PATH,), path)
+        build = time.perf_counter() - start
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        index = OUIIndex(path)
+        index_startup = time.perf_counter() - start
+        index_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        start = time.perf_counter()
+        found = [index.get(mac) for mac in macs]
+        index_lookup = (time.perf_counter() - start) / len(macs)
+        start = time.perf_counter()
+        for _ in range(100000):
+            index.random_prefix(rng)
+        index_random = (time.perf_counter() - start) / 100000
+        assert found == expected
+        size = os.path.getsize(path)
+
+        # MA-M / MA-S blocks inside an MA-L prefix
+        ieee = os.path.join(tmp_dir, 'mam.csv')
+        with open(ieee, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Registry', 'Assignment', 'Organization Name', 'Organization Address'])
+            writer.writerow(['MA-M', '0000001', 'Block 28', 'Somewhere'])
+            writer.writerow(['MA-S', '000000123', 'Block 36', 'Elsewhere'])
+        build_index((DEFAULT_JSON_PATH, ieee), path)
+        index.close()
+        with OUIIndex(path) as index:
+            assert index.lookup('00:00:00:1F:00:00')[:2] == ('00:00:00:1', 28)
+            assert index.get('00:00:00:1F:00:00') == 'Block 28\nSomewhere'
+            assert index.lookup('00:00:00:12:3F:FF')[:2] == ('00:00:00:12:3', 36)
+            assert index.lookup('00:00:00:22:00:00')[:2] == ('00:00:00', 24)
+
+    print(f"{count} OUIs, index built in {build:.2f}s ({size / 2 ** 20:.2f} MiB)")
+    print(f"startup: json.load {json_startup * 1000:.0f} ms / {json_memory / 2 ** 20:.1f} MiB, "
+          f"index {index_startup * 1000:.2f} ms / {index_memory / 2 ** 10:.1f} KiB")
+    print(f"lookup: dict {json_lookup * 1e6:.2f} us, index {index_lookup * 1e6:.2f} us; "
+          f"random vendor: list(keys) {json_random * 1e6:.0f} us, index {index_random * 1e6:.2f} us")
@@ -1,46 +1,58 @@
+import os
+import sys
 import re
-import json
 import random
-import subprocess
 import argparse
+from oui_index import load_oui_index, build_index, DEFAULT_INDEX_PATH, DEFAULT_JSON_PATH
+from interface_backend import get_backend, SubprocessBackend
+
+# projects/ holds the `common` package shared by the three tools (see common/__init__.py)
+PROJECTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECTS_DIR not in sys.path:
+    sys.path.append(PROJECTS_DIR)
+from common import tracing
 
 class PyMAChanger:
-    def __init__(self, interface):
+    def __init__(self, interface, backend="auto"):
         self.interface = interface
         self.OUI_DATA, self.WIRELESS_LIST_LINES = self.load_data()
+        # In-process netlink/ioctl backend when possible, `sudo ifconfig`/`ethtool` otherwise (see interface_backend.py)
+        self.backend = get_backend(backend)
 
     @staticmethod
     def load_data():
-        with open('./data/oui.json', 'r') as f:
-            OUI_DATA = json.load(f)
+        # Memory-mapped vendor index, built from oui.json on first use (see oui_index.py)
+        with tracing.span("oui.load"):
+            OUI_DATA = load_oui_index()
     
-        with open('./data/wireless.list', 'r') as f:
+        with tracing.span("wireless_list.load"), open('./data/wireless.list', 'r') as f:
             WIRELESS_LIST_LINES = f.readlines()
 
         return OUI_DATA, WIRELESS_LIST_LINES
 
-    def _run_command(self, *args):
+    def _backend_call(self, method, *args):
         try:
-            result = subprocess.check_output(list(args))
-            return result.decode("utf-8")
-        except subprocess.CalledProcessError as e:
-            return None
+            with tracing.span(f"backend.{method}", backend=type(self.backend).__name__):
+                return getattr(self.backend, method)(self.interface, *args)
+        except PermissionError:
+            # No CAP_NET_ADMIN for the in-process backend: go through sudo instead
+            if isinstance(self.backend, SubprocessBackend):
+                raise
+            tracing.count("backend.fallbacks")
+            self.backend = SubprocessBackend()
+            with tracing.span(f"backend.{method}", backend="SubprocessBackend"):
+                return getattr(self.backend, method)(self.interface, *args)
 
     def _set_interface_mac(self, mac_address):
         try:
-            subprocess.call(["sudo", "ifconfig", self.interface, "down"])
-            subprocess.call(["sudo", "ifconfig", self.interface, "hw", "ether", mac_address])
-            subprocess.call(["sudo", "ifconfig", self.interface, "up"])
+            self._backend_call("set_mac", mac_address)
             return True
-        except Exception as e:
+        except (OSError, ValueError) as e:
             return False
 
-    def _extract_mac_details(self, raw_output):
-        mac_address_search = re.search(r"(\w\w:\w\w:\w\w:\w\w:\w\w:\w\w)", raw_output)
-        if mac_address_search:
-            mac = mac_address_search.group(0)
-            oui_part = mac.replace(":", "").upper()[:6]
-            manufacturer_details = self.OUI_DATA.get(oui_part, "Unknown Manufacturer\nUnknown Address").split("\n")
+    def _mac_details(self, mac):
+        if mac:
+            manufacturer_details = self.OUI_DATA.get(mac, "Unknown Manufacturer\nUnknown Address").split("\n")
             manufacturer_name = manufacturer_details[0]
             manufacturer_address = " ".join(manufacturer_details[1:]).strip()
             return {
@@ -53,14 +65,17 @@ class PyMAChanger:
         return None
 
     def _get_mac_details(self, mode="current"):
-        if mode == "current":
-            result = self._run_command("sudo", "ifconfig", self.interface)
-        elif mode == "permanent":
-            result = self._run_command("sudo", "ethtool", "-P", self.interface)
-        else:
+        try:
+            if mode == "current":
+                mac = self._backend_call("get_mac")
+            elif mode == "permanent":
+                mac = self._backend_call("get_permanent_mac")
+            else:
+                return None
+        except OSError as e:
             return None
 
-        return self._extract_mac_details(result) if result else None
+        return self._mac_details(mac)
 
     def _generate_random_mac_suffix(self):
         return ":{:02x}:{:02x}:{:02x}".format(random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
@@ -121,8 +136,8 @@ class PyMAChanger:
             new_mac = f"{oui_part}{self._generate_random_mac_suffix()}"
 
         elif option == 2:
-            oui_part = random.choice(list(self.OUI_DATA.keys()))
-            new_mac = f"{':'.join([oui_part[i:i+2] for i in range(0, 6, 2)])}{self._generate_random_mac_suffix()}"
+            oui_part = self.OUI_DATA.random_prefix()
+            new_mac = f"{oui_part}{self._generate_random_mac_suffix()}"
 
         elif option == 3:
             new_mac = self._generate_random_mac()
@@ -142,7 +157,7 @@ class PyMAChanger:
     def parse_arguments():
         parser = argparse.ArgumentParser(description="Change and manage MAC addresses")
 
-        parser.add_argument("-i", "--interface", required=True, help="Specify the network interface to work with.")
+        parser.add_argument("-i", "--interface", help="Specify the network interface to work with.")
 
         parser.add_argument("-s", "--show", action="store_true", help="Show the current and permanent MAC addresses of the specified interface.")
 
@@ -156,19 +171,50 @@ class PyMAChanger:
 
         parser.add_argument("-m", "--mac", type=str, help="Custom MAC address to use with option 4 for setting a specific MAC address.")
 
-        return parser.parse_args()
+        parser.add_argument("-b", "--backend", choices=["auto", "netlink", "subprocess"], default="auto", help="How to read and set the MAC: 'netlink' (in-process rtnetlink/ioctl, needs root), "
+                                                                                 "'subprocess' (sudo ifconfig/ethtool) or 'auto' (netlink when running as root). Default: auto.")
+
+        parser.add_argument("-u", "--update-index", nargs="*", metavar="CSV", help="Rebuild the vendor index (./data/oui.idx) from ./data/oui.json plus the given IEEE registry CSV files "
+                                                                                 "(oui.csv, mam.csv, oui36.csv) for MA-M/MA-S block assignments.")
+
+        parser.add_argument("--profile", nargs="?", const="./data/profile.json", default=None, help="Trace the run (index load, backend calls) to a Chrome trace JSON file and print a summary. "
+                                                                                 "Optional path, default: './data/profile.json'.")
+
+        args = parser.parse_args()
+        if args.update_index is None and not args.interface:
+            parser.error("the following arguments are required: -i/--interface")
+        return args
 
 
 if __name__ == "__main__":
     args = PyMAChanger.parse_arguments()
+    if args.profile:
+        tracing.enable()
+
+    if args.update_index is not None:
+        with tracing.span("oui.build_index", sources=len(args.update_index) + 1):
+            count = build_index([DEFAULT_JSON_PATH] + args.update_index, DEFAULT_INDEX_PATH)
+        print(f'Vendor index rebuilt with {count} prefixes')
+        if not args.interface:
+            if args.profile:
+                tracing.dump(args.profile)
+            raise SystemExit
 
-    pymac = PyMAChanger(args.interface)
+    pymac = PyMAChanger(args.interface, backend=args.backend)
+    status = 0
 
     if args.show:
         print(pymac.show())
     elif args.restore:
-        pymac.restore()
-        print(pymac.show())
-        print(f'MAC successfully restored for {args.interface}')
+        if pymac.restore():
+            print(pymac.show())
+            print(f'MAC successfully restored for {args.interface}')
+        else:
+            print(f'Could not restore the MAC of {args.interface}: no permanent MAC or the change failed', file=sys.stderr)
+            status = 1
     elif args.set:
-        print(pymac.set(option=args.set, custom_mac=args.mac if args.mac else None))
\ No newline at end of file
+        print(pymac.set(option=args.set, custom_mac=args.mac if args.mac else None))
+
+    if args.profile:
+        tracing.dump(args.profile)
+    raise SystemExit(status)